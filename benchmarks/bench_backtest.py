@@ -0,0 +1,104 @@
+"""
+回测收益计算性能基准
+
+在 (交易日 × 股票) 的模拟收盘价和均线交叉信号上，对比原有的逐行循环与
+src/backtest/vectorized.py 的向量化实现，并检查两者结果一致：
+    loop     逐只股票按 iloc 逐行计算收益（原有实现），股票数较多时只计时前 --loop-symbols 只再按比例折算
+    series   逐只股票调用 strategy_returns
+    panel    对整个 (时间 × 股票) 矩阵调用一次 strategy_returns
+另外给出 carry=True（持仓保持到下一个信号）的面板耗时。
+
+用法：
+    python benchmarks/bench_backtest.py --symbols 1000 --years 20
+    python benchmarks/bench_backtest.py --json result.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from src.backtest.vectorized import positions_from_signals, strategy_returns
+from src.indicators import crossover_sweep
+
+def make_data(symbols: int, days: int, seed: int = 0):
+    """几何随机游走的收盘价面板和 5/20 日均线交叉信号"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    index = pd.bdate_range('2000-01-03', periods=days)
+    columns = [f'{i:06d}' for i in range(1, symbols + 1)]
+    signal = np.column_stack([crossover_sweep(close[:, j], [5], [20])[:, 0] for j in range(symbols)])
+    return (pd.DataFrame(close, index=index, columns=columns),
+            pd.DataFrame(signal.astype(np.int64), index=index, columns=columns))
+
+def loop_returns(close: pd.Series, position: pd.Series) -> pd.Series:
+    """原有的逐行实现"""
+    returns = pd.Series(index=close.index)
+    returns.iloc[0] = 0
+    for i in range(1, len(close)):
+        daily_return = (close.iloc[i] / close.iloc[i-1] - 1)
+        returns.iloc[i] = daily_return * position.iloc[i-1]
+    return returns
+
+def run(symbols: int, years: int, loop_symbols: int, size: float = 0.1) -> dict:
+    days = years * 252
+    close, signal = make_data(symbols, days)
+    position = positions_from_signals(signal, size)
+    sample = list(close.columns[:min(loop_symbols, symbols)])
+
+    start = time.perf_counter()
+    expected = {code: loop_returns(close[code], position[code]) for code in sample}
+    loop_seconds = (time.perf_counter() - start) * symbols / len(sample)
+
+    start = time.perf_counter()
+    for code in close.columns:
+        strategy_returns(close[code], positions_from_signals(signal[code], size))
+    series_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = strategy_returns(close, positions_from_signals(signal, size))
+    panel_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    strategy_returns(close, positions_from_signals(signal, size, carry=True))
+    carry_seconds = time.perf_counter() - start
+
+    identical = all(np.array_equal(result[code].to_numpy(), values.to_numpy()) for code, values in expected.items())
+    results = {
+        'loop_seconds': round(loop_seconds, 4),
+        'loop_sampled_symbols': len(sample),
+        'series_seconds': round(series_seconds, 4),
+        'panel_seconds': round(panel_seconds, 4),
+        'carry_panel_seconds': round(carry_seconds, 4),
+        'series_speedup': round(loop_seconds / series_seconds, 1),
+        'panel_speedup': round(loop_seconds / panel_seconds, 1),
+        'identical': identical,
+    }
+    print(f"逐行循环 {loop_seconds:>9.3f}s（按 {len(sample)} 只折算）")
+    print(f"逐只向量化 {series_seconds:>7.3f}s  加速 {results['series_speedup']}x")
+    print(f"整个面板 {panel_seconds:>9.3f}s  加速 {results['panel_speedup']}x")
+    print(f"整个面板（carry） {carry_seconds:.3f}s")
+    print(f"结果与逐行循环逐位一致: {identical}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='回测收益计算性能基准')
+    parser.add_argument('--symbols', type=int, default=1000, help='股票数量')
+    parser.add_argument('--years', type=int, default=20, help='年数（每年252个交易日）')
+    parser.add_argument('--loop-symbols', type=int, default=20, help='逐行循环实际计时的股票数')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于对比不同版本')
+    args = parser.parse_args()
+
+    print(f"股票数 {args.symbols}，年数 {args.years}")
+    results = run(args.symbols, args.years, args.loop_symbols)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
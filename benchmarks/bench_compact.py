@@ -0,0 +1,87 @@
+"""
+紧凑数据类型内存基准
+
+在全市场规模的模拟行情上对比默认类型与紧凑类型（见 src/utils/dtypes.py）的内存占用，
+并给出紧凑结果相对 float64 结果的最大误差：
+    bars        长表日线（code、date、OHLCV），与 DatabaseManager 批量读取的格式相同
+    panel       (字段, 股票代码) 宽面板
+    指标        calculate_panel 与 calculate_panel(compact=True) 的结果
+
+用法：
+    python benchmarks/bench_compact.py --symbols 5000 --days 750
+    python benchmarks/bench_compact.py --json result.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from bench_indicators import make_panel
+from src.data.bar_store import to_wide_panel
+from src.indicators import MovingAverage, RSI, MACD, BollingerBands, KDJ
+from src.utils.dtypes import compact_bars, memory_report
+
+def make_bars(panel: pd.DataFrame) -> pd.DataFrame:
+    """把模拟面板展开为长表，停牌日不在表中，代码为字符串、成交量为float64"""
+    close = panel['close']
+    valid = close.notna().to_numpy()
+    rows, cols = np.nonzero(valid.T)
+    bars = {'code': close.columns.to_numpy(dtype=object)[rows],
+            'date': close.index.to_numpy()[cols]}
+    bars['open'] = close.to_numpy().T[valid.T]
+    for field in ('high', 'low', 'close', 'volume'):
+        bars[field] = panel[field].to_numpy().T[valid.T]
+    return pd.DataFrame(bars)
+
+def max_error(original, compact) -> float:
+    """紧凑结果与 float64 结果的最大相对误差"""
+    expected = original.to_numpy(dtype='float64')
+    got = compact.to_numpy(dtype='float64')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return float(np.nanmax(np.abs(got - expected) / np.abs(expected), initial=0.0))
+
+def run(symbols: int, days: int, suspend: float) -> dict:
+    panel = make_panel(symbols, days, suspend)
+    bars = make_bars(panel)
+    pairs = {
+        'bars': (bars, compact_bars(bars)),
+        'panel': (to_wide_panel(bars, ['open', 'high', 'low', 'close', 'volume']),
+                  to_wide_panel(bars, ['open', 'high', 'low', 'close', 'volume'], 'float32')),
+    }
+    errors = {'bars': max_error(bars[['open', 'high', 'low', 'close']],
+                                pairs['bars'][1][['open', 'high', 'low', 'close']])}
+    errors['panel'] = max_error(pairs['panel'][0], pairs['panel'][1])
+    for indicator in [MovingAverage(20), RSI(14), MACD(), BollingerBands(20, 2), KDJ()]:
+        name = str(indicator)
+        pairs[name] = (indicator.calculate_panel(panel), indicator.calculate_panel(panel, compact=True))
+        errors[name] = max_error(*pairs[name])
+
+    report = memory_report(pairs)
+    report['max_rel_error'] = pd.Series(errors)
+    total = report[['original_mb', 'compact_mb']].sum()
+    report.loc['total'] = [total['original_mb'], total['compact_mb'],
+                           total['compact_mb'] / total['original_mb'], np.nan]
+    print(report.to_string(float_format='{:.4g}'.format))
+    return report.to_dict(orient='index')
+
+def main():
+    parser = argparse.ArgumentParser(description='紧凑数据类型内存基准')
+    parser.add_argument('--symbols', type=int, default=5000, help='股票数量')
+    parser.add_argument('--days', type=int, default=750, help='交易日数')
+    parser.add_argument('--suspend', type=float, default=0.02, help='停牌日比例')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于对比不同版本')
+    args = parser.parse_args()
+
+    print(f"股票数 {args.symbols}，交易日数 {args.days}，停牌比例 {args.suspend}")
+    results = run(args.symbols, args.days, args.suspend)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+数据层性能基准
+
+使用离线模拟数据测量 StockDataManager 端到端吞吐量，不需要网络：
+    cold_fetch   空库时逐只获取日线（数据源请求 + 写库 + 读取）
+    warm_read    清空进程内缓存后再次获取（只读本地存储）
+    memory_read  再次获取（命中进程内LRU缓存）
+    bulk_save    直接向日线存储批量写入
+    panel_long   一次读取全部股票的长表
+    panel_wide   一次读取全部股票的 (date × 股票代码) 收盘价面板
+
+用法：
+    python benchmarks/bench_data_layer.py --symbols 500 --days 750
+    python benchmarks/bench_data_layer.py --backend parquet --json result.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from src.config import settings
+from src.data.db_manager import DatabaseManager
+from src.data.manager import StockDataManager
+from src.data.models import create_db_engine
+from src.data.synthetic import SyntheticStockDataFetcher
+
+def timed(results, name, rows, func):
+    """执行 func 并记录耗时和每秒行数"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    results[name] = {
+        'seconds': round(elapsed, 4),
+        'rows': rows,
+        'rows_per_sec': round(rows / elapsed) if elapsed > 0 else None
+    }
+    print(f"{name:<12} {elapsed:>9.3f}s {rows:>10} 行 {results[name]['rows_per_sec'] or 0:>12} 行/秒")
+
+def run(symbols: int, days: int, backend: str, latency: float, workdir: str) -> dict:
+    settings.PARQUET_DIR = os.path.join(workdir, 'parquet')
+    fetcher = SyntheticStockDataFetcher(n_symbols=symbols, latency=latency)
+    db = DatabaseManager(create_db_engine(os.path.join(workdir, 'bench.db')))
+    manager = StockDataManager(bar_backend=backend,
+                               bar_cache_dir=os.path.join(workdir, 'bar_cache'),
+                               fetcher=fetcher,
+                               db=db)
+
+    # 使用已结束的历史区间，避免触发实时行情的短缓存
+    end = pd.Timestamp('2023-12-29')
+    dates = pd.bdate_range(end=end, periods=days)
+    start_date, end_date = dates[0].strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
+    codes = fetcher.symbols
+    rows = symbols * days
+
+    def read_all():
+        for code in codes:
+            manager.get_stock_daily(code, start_date, end_date)
+
+    results = {}
+    timed(results, 'cold_fetch', rows, read_all)
+    manager.memory_cache.clear()
+    timed(results, 'warm_read', rows, read_all)
+    timed(results, 'memory_read', rows, read_all)
+
+    frames = [fetcher.get_stock_daily(code, start_date, end_date) for code in codes]
+    # 写入不同的代码，避免与已有数据冲突
+    timed(results, 'bulk_save', rows, lambda: [
+        manager.bar_store.save_stock_daily(f'9{code[1:]}', df)
+        for code, df in zip(codes, frames)
+    ])
+    timed(results, 'panel_long', rows, lambda: manager.get_stock_daily_panel(
+        codes, start_date, end_date))
+    timed(results, 'panel_wide', rows, lambda: manager.get_stock_daily_panel(
+        codes, start_date, end_date, columns=['close'], layout='wide'))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='数据层性能基准')
+    parser.add_argument('--symbols', type=int, default=200, help='股票数量')
+    parser.add_argument('--days', type=int, default=500, help='每只股票的交易日数')
+    parser.add_argument('--backend', default='sqlite', choices=['sqlite', 'parquet'],
+                        help='日线存储后端')
+    parser.add_argument('--latency', type=float, default=0.0, help='模拟数据源延迟（秒）')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于对比不同版本')
+    args = parser.parse_args()
+
+    print(f"股票数 {args.symbols}，交易日数 {args.days}，后端 {args.backend}")
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args.symbols, args.days, args.backend, args.latency, workdir)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
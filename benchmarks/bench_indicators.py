@@ -0,0 +1,99 @@
+"""
+面板指标性能基准
+
+在 (交易日 × 股票) 的模拟行情面板上，对比逐只股票调用 calculate
+与 calculate_panel 一次计算全部股票的耗时，并检查两者结果一致：
+    loop    逐只股票去掉停牌日后调用 calculate
+    panel   calculate_panel 一次计算整个面板
+
+用法：
+    python benchmarks/bench_indicators.py --symbols 5000 --days 750
+    python benchmarks/bench_indicators.py --json result.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from src.indicators import MovingAverage, RSI, MACD, WilderRSI, BollingerBands, ATR, KDJ, OBV
+
+def make_panel(symbols: int, days: int, suspend: float, seed: int = 0) -> pd.DataFrame:
+    """几何随机游走的 (字段, 股票代码) 面板，按 suspend 的比例随机设为停牌（NaN）"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (days, symbols)), axis=0))
+    high = close * (1 + np.abs(rng.normal(0, 0.01, (days, symbols))))
+    low = close * (1 - np.abs(rng.normal(0, 0.01, (days, symbols))))
+    volume = rng.integers(1, 100000, (days, symbols)).astype('float64')
+    suspended = rng.random((days, symbols)) < suspend
+    index = pd.bdate_range('2020-01-01', periods=days)
+    columns = [f'{i:06d}' for i in range(1, symbols + 1)]
+    fields = {}
+    for name, values in [('close', close), ('high', high), ('low', low), ('volume', volume)]:
+        values[suspended] = np.nan
+        fields[name] = pd.DataFrame(values, index=index, columns=columns)
+    return pd.concat(fields, axis=1)
+
+def loop(indicator, panel: pd.DataFrame) -> dict:
+    """逐只股票计算，结果按代码保存"""
+    fields = {name: panel[name] for name in panel.columns.get_level_values(0).unique()}
+    return {code: indicator.calculate(pd.DataFrame({name: frame[code] for name, frame in fields.items()}).dropna())
+            for code in fields['close'].columns}
+
+def max_error(indicator, panel: pd.DataFrame, expected: dict, result) -> float:
+    """面板结果与逐只计算结果的最大绝对误差"""
+    error = 0.0
+    for code, values in expected.items():
+        if isinstance(values, pd.DataFrame):
+            got = pd.DataFrame({name: result[name][code] for name in values.columns})
+        else:
+            got = result[code]
+        diff = np.abs(got.loc[values.index].to_numpy() - values.to_numpy())
+        error = max(error, np.nanmax(diff, initial=0.0))
+    return float(error)
+
+def run(symbols: int, days: int, suspend: float) -> dict:
+    panel = make_panel(symbols, days, suspend)
+    results = {}
+    for indicator in [MovingAverage(20), MovingAverage(20, 'EMA'), RSI(14), MACD(),
+                      WilderRSI(14), BollingerBands(20, 2), ATR(14), KDJ(), OBV()]:
+        start = time.perf_counter()
+        expected = loop(indicator, panel)
+        loop_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = indicator.calculate_panel(panel)
+        panel_seconds = time.perf_counter() - start
+
+        name = str(indicator)
+        results[name] = {
+            'loop_seconds': round(loop_seconds, 4),
+            'panel_seconds': round(panel_seconds, 4),
+            'speedup': round(loop_seconds / panel_seconds, 1) if panel_seconds > 0 else None,
+            'max_error': max_error(indicator, panel, expected, result)
+        }
+        print(f"{name:<48} 逐只 {loop_seconds:>8.3f}s  面板 {panel_seconds:>8.3f}s  "
+              f"加速 {results[name]['speedup']:>6}x  误差 {results[name]['max_error']:.2e}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='面板指标性能基准')
+    parser.add_argument('--symbols', type=int, default=5000, help='股票数量')
+    parser.add_argument('--days', type=int, default=750, help='交易日数')
+    parser.add_argument('--suspend', type=float, default=0.02, help='停牌日比例')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于对比不同版本')
+    args = parser.parse_args()
+
+    print(f"股票数 {args.symbols}，交易日数 {args.days}，停牌比例 {args.suspend}")
+    results = run(args.symbols, args.days, args.suspend)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
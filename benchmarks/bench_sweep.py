@@ -0,0 +1,102 @@
+"""
+多周期均线扫描性能基准
+
+在一条模拟收盘价序列上，对比逐个周期调用 MovingAverage.calculate 与
+sweep 模块一次计算全部周期的耗时，并检查结果一致：
+    sma     周期 2..250 的简单移动平均
+    ema     周期 2..250 的指数移动平均
+    cross   短周期 × 长周期 全部组合的均线交叉信号（与 ma_crossover 策略条件一致）
+
+用法：
+    python benchmarks/bench_sweep.py --days 5000 --min-window 2 --max-window 250
+    python benchmarks/bench_sweep.py --json result.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from src.indicators import MovingAverage
+from src.indicators.sweep import sma_sweep, ema_sweep, crossover_sweep
+
+def make_close(days: int, seed: int = 0) -> pd.Series:
+    """几何随机游走收盘价"""
+    rng = np.random.default_rng(seed)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    return pd.Series(close, index=pd.bdate_range('2000-01-01', periods=days))
+
+def loop_crossover(close: pd.Series, pairs) -> dict:
+    """逐个组合按 ma_crossover 策略的条件计算交叉信号"""
+    data = pd.DataFrame({'close': close})
+    averages = {}
+    signals = {}
+    for fast, slow in pairs:
+        for window in (fast, slow):
+            if window not in averages:
+                averages[window] = MovingAverage(window).calculate(data)
+        s, l = averages[fast], averages[slow]
+        signal = pd.Series(0, index=close.index, dtype='int8')
+        signal[(s > l) & (s.shift(1) <= l.shift(1))] = 1
+        signal[(s < l) & (s.shift(1) >= l.shift(1))] = -1
+        signals[(fast, slow)] = signal
+    return signals
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run(days: int, min_window: int, max_window: int, fast_max: int) -> dict:
+    close = make_close(days)
+    data = pd.DataFrame({'close': close})
+    windows = list(range(min_window, max_window + 1))
+    results = {}
+
+    for name, ma_type, sweep in [('sma', 'SMA', sma_sweep), ('ema', 'EMA', ema_sweep)]:
+        expected, loop_seconds = timed(
+            lambda: {w: MovingAverage(w, ma_type).calculate(data) for w in windows})
+        result, sweep_seconds = timed(sweep, close, windows)
+        error = max(float(np.nanmax(np.abs(result[w] - expected[w]), initial=0.0)) for w in windows)
+        results[name] = {'loop_seconds': loop_seconds, 'sweep_seconds': sweep_seconds, 'max_error': error}
+
+    fast = [w for w in windows if w <= fast_max]
+    pairs = [(f, s) for f in fast for s in windows if f < s]
+    expected, loop_seconds = timed(loop_crossover, close, pairs)
+    result, sweep_seconds = timed(crossover_sweep, close, fast, windows)
+    mismatches = sum(int((result[pair] != expected[pair]).sum()) for pair in pairs)
+    results['cross'] = {'pairs': len(pairs), 'loop_seconds': loop_seconds,
+                        'sweep_seconds': sweep_seconds, 'mismatches': mismatches}
+
+    for name, r in results.items():
+        r['loop_seconds'] = round(r['loop_seconds'], 4)
+        r['sweep_seconds'] = round(r['sweep_seconds'], 4)
+        r['speedup'] = round(r['loop_seconds'] / r['sweep_seconds'], 1) if r['sweep_seconds'] > 0 else None
+        check = (f"误差 {r['max_error']:.2e}" if 'max_error' in r else
+                 f"组合 {r['pairs']}  不一致 {r['mismatches']}")
+        print(f"{name:<6} 逐个 {r['loop_seconds']:>8.3f}s  扫描 {r['sweep_seconds']:>8.3f}s  "
+              f"加速 {r['speedup']:>6}x  {check}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='多周期均线扫描性能基准')
+    parser.add_argument('--days', type=int, default=5000, help='交易日数')
+    parser.add_argument('--min-window', type=int, default=2, help='最小周期')
+    parser.add_argument('--max-window', type=int, default=250, help='最大周期')
+    parser.add_argument('--fast-max', type=int, default=20, help='交叉组合中短周期的上限')
+    parser.add_argument('--json', help='把结果写入JSON文件，便于对比不同版本')
+    args = parser.parse_args()
+
+    print(f"交易日数 {args.days}，周期 {args.min_window}..{args.max_window}")
+    results = run(args.days, args.min_window, args.max_window, args.fast_max)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'params': vars(args), 'results': results}, f, indent=2)
+
+if __name__ == '__main__':
+    main()
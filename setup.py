@@ -23,5 +23,5 @@ setup(
         "pyyaml==6.0.1",
         "python-multipart==0.0.9"
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.9",
 ) 
\ No newline at end of file
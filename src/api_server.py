@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 import akshare as ak
 import pandas as pd
@@ -51,8 +52,8 @@ async def get_stock_data_api(code: str, start_date: str, end_date: str):
         start = datetime.strptime(start_date, "%Y%m%d")
         end = datetime.strptime(end_date, "%Y%m%d")
         
-        # 获取股票数据
-        df = get_stock_data(code, start, end)
+        # 获取股票数据（akshare为同步接口，放到线程池执行以免阻塞事件循环）
+        df = await run_in_threadpool(get_stock_data, code, start, end)
         
         if df is None:
             return Response(content="获取数据失败", status_code=400)
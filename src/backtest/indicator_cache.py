@@ -0,0 +1,208 @@
+"""
+指标结果缓存
+
+策略配置中的指标是一段向 data 写入新列的代码。不同策略、重复回测经常计算
+相同的指标，这里按内容寻址缓存指标代码写入的列：
+    键 = 规范化后的代码 + 数据索引的指纹 + 所读取的输入列的内容指纹
+规范化在语法树上进行：去掉注释和格式差异，把 params['x'] 替换为参数值，
+把读取和写入的列名分别替换为按出现顺序编号的占位符（列的内容由输入指纹区分）。
+因此列名、参数名不同但计算相同的指标（如 ma_crossover 的 short_ma 和示例策略的
+ma_fast）共用同一个缓存条目。
+
+输入列的指纹只在回测开始时按数据内容计算一次；指标写入的列的指纹由其缓存键
+派生，后续指标读取这些列时不需要重新哈希。索引的指纹总是计入键，不读取任何列的
+指标（如 data['one'] = 1）在不同股票、不同日期区间上不会共用结果。
+"""
+import ast
+import hashlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from ..config import settings
+from ..data.cache import LRUCache
+
+def _digest(*parts: Any) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+# fingerprint 结果中索引指纹的键
+INDEX_DIGEST = '__index__'
+
+def fingerprint(data: pd.DataFrame) -> Dict[str, str]:
+    """按内容（含索引）计算每一列的指纹，索引本身的指纹保存在 INDEX_DIGEST 键下"""
+    index = pd.util.hash_pandas_object(data.index, index=False).to_numpy().tobytes()
+    digests = {
+        column: _digest(index, str(data[column].dtype),
+                        pd.util.hash_pandas_object(data[column], index=False).to_numpy().tobytes())
+        for column in data.columns
+    }
+    digests[INDEX_DIGEST] = _digest(index, len(data))
+    return digests
+
+def _column_key(node: ast.AST) -> Optional[str]:
+    """data['列名'] 形式的下标返回列名，其他返回None"""
+    if (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+            and node.value.id == 'data' and isinstance(node.slice, ast.Constant)
+            and isinstance(node.slice.value, str)):
+        return node.slice.value
+    return None
+
+class _Normalizer(ast.NodeTransformer):
+    """代入参数值、把列名替换为占位符，并记录读取的输入列和写入的输出列"""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = params
+        self.outputs: List[str] = []
+        self.inputs: List[str] = []
+        self.cacheable = True
+
+    def visit_Assign(self, node: ast.Assign):
+        # 先处理右侧，data['x'] = data['x'] * 2 中右侧的 x 是输入列
+        node.value = self.visit(node.value)
+        node.targets = [self.visit(target) for target in node.targets]
+        return node
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        column = _column_key(node.target)
+        if column is not None and column not in self.outputs and column not in self.inputs:
+            self.inputs.append(column)
+        node.value = self.visit(node.value)
+        node.target = self.visit(node.target)
+        return node
+
+    def visit_Subscript(self, node: ast.Subscript):
+        if (isinstance(node.value, ast.Name) and node.value.id == 'params'
+                and isinstance(node.slice, ast.Constant) and node.slice.value in self.params):
+            value = self.params[node.slice.value]
+            if isinstance(value, (int, float, str, bool)) or value is None:
+                return ast.copy_location(ast.Constant(value), node)
+            self.cacheable = False
+            return node
+        column = _column_key(node)
+        if column is None:
+            return self.generic_visit(node)
+        if isinstance(node.ctx, ast.Del):
+            self.cacheable = False
+            return node
+        if isinstance(node.ctx, ast.Store) and column not in self.outputs:
+            self.outputs.append(column)
+        if column in self.outputs:
+            node.slice = ast.Constant(f'__out{self.outputs.index(column)}__')
+        else:
+            if column not in self.inputs:
+                self.inputs.append(column)
+            node.slice = ast.Constant(f'__in{self.inputs.index(column)}__')
+        return node
+
+    def visit_Name(self, node: ast.Name):
+        # 除 data['列名'] 之外使用 data（如 data.loc、len(data)、重新赋值）时无法确定输入输出
+        if node.id == 'data':
+            self.cacheable = False
+        return node
+
+def normalize(code: str, params: Dict[str, Any]) -> Optional[Tuple[str, List[str], List[str]]]:
+    """规范化指标代码
+
+    Returns:
+        (规范化后的代码, 读取的输入列, 写入的输出列)；无法安全缓存时返回None
+    """
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return None
+    normalizer = _Normalizer(params or {})
+    tree = normalizer.visit(tree)
+    if not normalizer.cacheable or not normalizer.outputs:
+        return None
+    text = ast.dump(tree, annotate_fields=False)
+    # 参数访问未全部代入（如 params.get）时，把全部参数计入键
+    if "Name('params'" in text:
+        text += repr(sorted((params or {}).items()))
+    return text, normalizer.inputs, normalizer.outputs
+
+class IndicatorCache:
+    """按内容寻址的指标列缓存，容量受条目数和字节数限制（LRU淘汰）"""
+
+    def __init__(self,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_entries: 最大条目数，默认读取配置 BLACKX_INDICATOR_CACHE_MAX_ENTRIES
+            max_bytes: 最大总字节数，默认读取配置 BLACKX_INDICATOR_CACHE_MAX_BYTES
+        """
+        self.cache = LRUCache(
+            max_entries=settings.INDICATOR_CACHE_MAX_ENTRIES if max_entries is None else max_entries,
+            max_bytes=settings.INDICATOR_CACHE_MAX_BYTES if max_bytes is None else max_bytes)
+        self._normalized: Dict[Tuple[str, str], Any] = {}
+
+    def _normalize(self, code: str, params: Dict[str, Any]):
+        key = (code, repr(sorted((params or {}).items())))
+        if key not in self._normalized:
+            self._normalized[key] = normalize(code, params)
+        return self._normalized[key]
+
+    def run(self,
+            data: pd.DataFrame,
+            digests: Dict[str, str],
+            code: str,
+            params: Dict[str, Any],
+            execute: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+        """计算一个指标，命中缓存时直接写入缓存的列
+
+        Args:
+            data: 当前数据，命中时原地写入输出列
+            digests: 当前数据各列的指纹（见 fingerprint），写入的输出列的指纹会更新到其中
+            code: 指标代码
+            params: 指标参数
+            execute: 未命中或无法缓存时执行指标代码的函数，返回执行后的数据
+
+        Returns:
+            计算指标后的数据
+        """
+        normalized = self._normalize(code, params)
+        if (normalized is None or INDEX_DIGEST not in digests
+                or any(c not in digests for c in normalized[1])):
+            data = execute(data)
+            # 无法缓存的指标可能修改任意列和索引，之后的指纹不再可信
+            digests.clear()
+            return data
+
+        text, inputs, outputs = normalized
+        key = _digest(text, digests[INDEX_DIGEST], *[digests[c] for c in inputs])
+        cached = self.cache.get(key)
+        if cached is None:
+            data = execute(data)
+            if not all(column in data.columns for column in outputs):
+                # 指标代码执行出错，不缓存
+                for column in outputs:
+                    digests.pop(column, None)
+                return data
+            self.cache.put(key, pd.DataFrame(
+                {f'__out{i}__': data[column] for i, column in enumerate(outputs)}))
+        else:
+            for i, column in enumerate(outputs):
+                data[column] = cached[f'__out{i}__']
+        for i, column in enumerate(outputs):
+            digests[column] = _digest(key, i)
+        return data
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """按缓存键读取输出列，未命中时返回None"""
+        return self.cache.get(key)
+
+    def put(self, key: str, outputs: pd.DataFrame):
+        """按缓存键写入输出列"""
+        self.cache.put(key, outputs)
+
+    def stats(self) -> Dict[str, int]:
+        """命中、未命中、淘汰等统计信息"""
+        return self.cache.stats()
+
+    def clear(self):
+        self.cache.clear()
+
+# 进程内共享的默认缓存，多次创建 StrategyEngine（如 Streamlit 每次点击回测）时复用
+default_indicator_cache = IndicatorCache()
@@ -0,0 +1,235 @@
+"""
+指标依赖图
+
+策略配置中的每个指标是图中的一个节点，声明输入、输出和参数：
+    - name: "短期均线"
+      indicator: ma              # 注册的指标名，见 src/indicators/registry.py
+      inputs: {close: close}     # 可选，指标字段 -> 数据列或前面指标的输出列
+      params: {window: 5}
+      outputs: short_ma          # 一个列名、按输出顺序的列表，或 {指标输出: 列名}
+旧格式的 code 指标同样是节点，输入输出列由 indicator_cache.normalize 分析代码得到。
+
+节点按 (指标名或规范化代码, 参数, 输入来源) 标识，与写入的列名无关，所有策略的节点
+合并为一张图后相同的计算只保留一个。输入列解析为同一策略中排在前面、最后写入该列的
+节点输出，没有则为原始数据列，因此节点总在它依赖的节点之后加入，加入顺序即拓扑顺序。
+每份数据对每个节点只计算一次，结果同时按内容写入 IndicatorCache，多次回测之间复用。
+含有无法分析的代码（见 normalize）的策略不加入图，由调用方按原方式逐个执行。
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..indicators.registry import calculate_outputs, get_indicator, indicator_inputs, indicator_outputs
+from .indicator_cache import INDEX_DIGEST, IndicatorCache, _digest, normalize
+
+# 节点输入来源：原始数据列为 (None, 列名)，其他节点的输出为 (节点标识, 输出名)
+Source = Tuple[Optional[str], str]
+
+def _execute_code(code: str, local_vars: Dict):
+    try:
+        exec(code, {'np': np, 'pd': pd}, local_vars)
+    except Exception as e:
+        print(f"执行代码时出错: {e}")
+
+def _params_key(params: Optional[Dict[str, Any]]) -> str:
+    return repr(sorted((params or {}).items()))
+
+class IndicatorNode:
+    """依赖图中的一个指标节点"""
+
+    def __init__(self,
+                 key: str,
+                 kind: str,
+                 spec: str,
+                 params: Dict[str, Any],
+                 inputs: List[Tuple[str, Source]],
+                 outputs: List[str],
+                 label: str,
+                 code: Optional[str] = None,
+                 columns: Optional[List[str]] = None):
+        """
+        Args:
+            key: 节点标识
+            kind: 'indicator'（注册的指标）或 'code'（指标代码）
+            spec: 指标名或规范化后的代码
+            params: 参数
+            inputs: [(字段, 来源)]，code 节点的字段即代码读取的列名
+            outputs: 输出名，code 节点为 __out0__、__out1__ ...
+            label: 第一个声明该节点的指标名称，用于输出错误信息
+            code: code 节点的原始代码
+            columns: code 节点代码写入的列名，与 outputs 一一对应
+        """
+        self.key = key
+        self.kind = kind
+        self.spec = spec
+        self.params = params
+        self.inputs = inputs
+        self.outputs = outputs
+        self.label = label
+        self.code = code
+        self.columns = columns
+
+    def content_key(self, index_digest: str, digests: List[str]) -> str:
+        """按数据索引和输入列内容计算缓存键，code 节点与 IndicatorCache.run 的键一致"""
+        if self.kind == 'code':
+            return _digest(self.spec, index_digest, *digests)
+        return _digest('indicator', self.spec, _params_key(self.params), index_digest,
+                       *[(field, digest) for (field, _), digest in zip(self.inputs, digests)])
+
+class IndicatorGraph:
+    """多个策略共用的指标依赖图"""
+
+    def __init__(self):
+        self.nodes: Dict[str, IndicatorNode] = {}
+        # 策略 -> 按配置顺序的 [(列名, 来源)]
+        self.strategies: Dict[str, List[Tuple[str, Source]]] = {}
+        self.declared = 0
+        self.stats: Dict[str, int] = {}
+
+    def _build_node(self, indicator: Dict, visible: Dict[str, Source]):
+        """由一个指标配置创建节点，返回 (节点, [(输出名, 列名)])，无法分析时返回 (None, [])"""
+        params = indicator.get('params') or {}
+        label = indicator.get('name', indicator.get('indicator', ''))
+        if 'indicator' in indicator:
+            inputs = [(field, visible.get(column, (None, column)))
+                      for field, column in indicator_inputs(indicator)]
+            outputs = indicator_outputs(indicator)
+            key = _digest('indicator', indicator['indicator'], _params_key(params), inputs)
+            node = IndicatorNode(key, 'indicator', indicator['indicator'], params, inputs,
+                                 list(get_indicator(indicator['indicator'])[2]), label)
+            return node, outputs
+        if 'code' in indicator:
+            normalized = normalize(indicator['code'], params)
+            if normalized is None:
+                return None, []
+            text, columns_in, columns_out = normalized
+            inputs = [(column, visible.get(column, (None, column))) for column in columns_in]
+            outputs = [f'__out{i}__' for i in range(len(columns_out))]
+            # 列名已替换为占位符，按来源区分输入
+            key = _digest('code', text, [source for _, source in inputs])
+            node = IndicatorNode(key, 'code', text, params, inputs, outputs, label,
+                                 code=indicator['code'], columns=columns_out)
+            return node, list(zip(outputs, columns_out))
+        raise ValueError(f"指标 {label} 缺少 indicator 或 code")
+
+    def add_strategy(self, name: str, indicators: List[Dict]) -> bool:
+        """把一个策略的指标加入图
+
+        Returns:
+            是否加入；含有无法分析的代码时返回False，图不变
+
+        Raises:
+            ValueError: 指标配置错误
+        """
+        nodes: Dict[str, IndicatorNode] = {}
+        visible: Dict[str, Source] = {}
+        assignments = []
+        for indicator in indicators or []:
+            node, outputs = self._build_node(indicator, visible)
+            if node is None:
+                return False
+            nodes.setdefault(node.key, node)
+            for output, column in outputs:
+                visible[column] = (node.key, output)
+                assignments.append((column, (node.key, output)))
+        for key, node in nodes.items():
+            self.nodes.setdefault(key, node)
+        self.declared += len(indicators or [])
+        self.strategies[name] = assignments
+        return True
+
+    def order(self) -> List[IndicatorNode]:
+        """按拓扑顺序返回节点（节点总在其依赖之后加入，加入顺序即拓扑顺序）"""
+        return list(self.nodes.values())
+
+    def _calculate(self,
+                   node: IndicatorNode,
+                   frame: pd.DataFrame,
+                   execute_code: Callable[[str, Dict], Any]) -> Optional[Dict[str, pd.Series]]:
+        """计算一个节点的全部输出，出错时返回None"""
+        if node.kind == 'code':
+            local_vars = {'data': frame, 'params': node.params, 'result': None}
+            execute_code(node.code, local_vars)
+            frame = local_vars['data']
+            if not all(column in frame.columns for column in node.columns):
+                return None
+            return {output: frame[column] for output, column in zip(node.outputs, node.columns)}
+        try:
+            return calculate_outputs(node.spec, node.params, frame)
+        except Exception as e:
+            print(f"计算指标 {node.label} 时出错: {e}")
+            return None
+
+    def evaluate(self,
+                 data: pd.DataFrame,
+                 digests: Optional[Dict[str, str]] = None,
+                 cache: Optional[IndicatorCache] = None,
+                 execute_code: Optional[Callable[[str, Dict], Any]] = None) -> Dict[Source, pd.Series]:
+        """在一份数据上按拓扑顺序计算所有节点，每个节点只计算一次
+
+        Args:
+            data: 历史数据
+            digests: data 各列的内容指纹（见 fingerprint），提供时按内容读写 cache
+            cache: 指标结果缓存
+            execute_code: 执行 code 节点的函数，参数为代码和局部变量字典
+
+        Returns:
+            {来源: Series}，传给 assign 写入各策略的数据
+        """
+        execute_code = execute_code or _execute_code
+        values: Dict[Source, pd.Series] = {}
+        content: Dict[Source, str] = {}
+        index_digest = (digests or {}).get(INDEX_DIGEST)
+        self.stats = {
+            'strategies': len(self.strategies),
+            'nodes': self.declared,
+            'unique': len(self.nodes),
+            'saved': self.declared - len(self.nodes),
+            'cached': 0,
+            'computed': 0,
+            'failed': 0
+        }
+        for node in self.order():
+            columns, input_digests = {}, []
+            for field, source in node.inputs:
+                if source[0] is None:
+                    if source[1] in data.columns:
+                        columns[field] = data[source[1]]
+                    input_digests.append((digests or {}).get(source[1]))
+                else:
+                    if source in values:
+                        columns[field] = values[source]
+                    input_digests.append(content.get(source))
+            if len(columns) < len(node.inputs):
+                print(f"指标 {node.label} 的输入列不存在")
+                self.stats['failed'] += 1
+                continue
+
+            key = None
+            if (cache is not None and index_digest is not None
+                    and all(d is not None for d in input_digests)):
+                key = node.content_key(index_digest, input_digests)
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                outputs = {output: cached[output] for output in node.outputs}
+                self.stats['cached'] += 1
+            else:
+                outputs = self._calculate(node, pd.DataFrame(columns, index=data.index), execute_code)
+                if outputs is None:
+                    self.stats['failed'] += 1
+                    continue
+                self.stats['computed'] += 1
+                if key is not None:
+                    cache.put(key, pd.DataFrame(outputs))
+            for i, output in enumerate(node.outputs):
+                values[(node.key, output)] = outputs[output]
+                if key is not None:
+                    content[(node.key, output)] = _digest(key, i)
+        return values
+
+    def assign(self, name: str, data: pd.DataFrame, values: Dict[Source, pd.Series]) -> pd.DataFrame:
+        """返回写入了策略 name 全部指标列的数据副本"""
+        data = data.copy()
+        for column, source in self.strategies[name]:
+            if source in values:
+                data[column] = values[source]
+        return data
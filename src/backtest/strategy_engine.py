@@ -1,17 +1,27 @@
 import yaml
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pathlib import Path
+from ..data.resample import align_period_bars
+from ..indicators.registry import apply_indicator, indicator_outputs
+from .indicator_cache import IndicatorCache, default_indicator_cache, fingerprint
+from .indicator_graph import IndicatorGraph
+from .vectorized import positions_from_signals, strategy_returns
 
 class StrategyEngine:
-    def __init__(self, config_path: str = None):
+    def __init__(self, config_path: str = None, indicator_cache: Optional[IndicatorCache] = None):
         """初始化策略引擎
         
         Args:
             config_path: 策略配置文件路径，如果为None则自动加载所有策略
+            indicator_cache: 指标结果缓存，默认使用进程内共享的缓存，
+                各策略、多次回测中相同的指标只计算一次
         """
         self.config = self._load_all_configs(config_path)
+        self.indicator_cache = indicator_cache or default_indicator_cache
+        # 最近一次回测的指标依赖图统计，见 IndicatorGraph.evaluate
+        self.graph_stats: Dict[str, int] = {}
         
     def _load_all_configs(self, config_path: str = None) -> Dict:
         """加载所有策略配置
@@ -50,6 +60,23 @@ class StrategyEngine:
         
         return config
         
+    def build_graph(self, strategy_names: List[str]) -> IndicatorGraph:
+        """把多个策略的指标合并为一张依赖图，相同的计算只保留一个节点
+        
+        Args:
+            strategy_names: 策略名称列表
+            
+        Returns:
+            IndicatorGraph: 指标依赖图，含无法分析的指标代码的策略不在图中
+        """
+        graph = IndicatorGraph()
+        for strategy_name in strategy_names:
+            try:
+                graph.add_strategy(strategy_name, self.config['strategies'][strategy_name]['indicators'])
+            except ValueError as e:
+                print(f"策略 {strategy_name} 的指标配置错误: {e}")
+        return graph
+        
     def _execute_code(self, code: str, local_vars: Dict) -> Any:
         """执行代码片段
         
@@ -67,29 +94,74 @@ class StrategyEngine:
             print(f"执行代码时出错: {e}")
             return None
             
-    def _run_strategy(self, data: pd.DataFrame, strategy_config: Dict) -> Dict:
+    def _calculate_indicators(self,
+                              data: pd.DataFrame,
+                              strategy_config: Dict,
+                              digests: Dict[str, str]) -> pd.DataFrame:
+        """按配置顺序逐个计算策略的指标，用于无法加入指标依赖图的策略
+        
+        Args:
+            data: 历史数据，原地写入指标列
+            strategy_config: 策略配置
+            digests: data 各列的内容指纹，写入的指标列会更新到其中
+            
+        Returns:
+            pd.DataFrame: 包含指标的数据
+        """
+        for indicator in strategy_config['indicators']:
+            if 'indicator' in indicator:
+                try:
+                    # 注册指标的输出不经过 IndicatorCache，没有指纹，之后读取这些列的代码不缓存
+                    for _, column in indicator_outputs(indicator):
+                        digests.pop(column, None)
+                    data = apply_indicator(data, indicator)
+                except Exception as e:
+                    print(f"计算指标 {indicator.get('name', indicator['indicator'])} 时出错: {e}")
+                continue
+                
+            # 相同的指标代码从缓存读取
+            def execute(data, indicator=indicator):
+                local_vars = {
+                    'data': data,
+                    'params': indicator['params'],
+                    'result': None
+                }
+                self._execute_code(indicator['code'], local_vars)
+                return local_vars['data']
+            data = self.indicator_cache.run(data, digests, indicator['code'],
+                                            indicator['params'], execute)
+        return data
+        
+    def _run_strategy(self,
+                      data: pd.DataFrame,
+                      strategy_config: Dict,
+                      digests: Optional[Dict[str, str]] = None) -> Dict:
         """运行单个策略
         
         Args:
             data: 历史数据
             strategy_config: 策略配置
+            digests: data 各列的内容指纹，多个策略共用同一份数据时由调用方计算一次
             
         Returns:
             Dict: 策略运行结果
         """
         # 复制数据，避免修改原始数据
         data = data.copy()
+        digests = dict(digests) if digests is not None else fingerprint(data)
+        data = self._calculate_indicators(data, strategy_config, digests)
+        return self._generate_results(data, strategy_config)
         
-        # 计算指标
-        for indicator in strategy_config['indicators']:
-            local_vars = {
-                'data': data,
-                'params': indicator['params'],
-                'result': None
-            }
-            self._execute_code(indicator['code'], local_vars)
-            data = local_vars['data']
+    def _generate_results(self, data: pd.DataFrame, strategy_config: Dict) -> Dict:
+        """由已计算指标的数据生成信号、仓位和收益
+        
+        Args:
+            data: 包含策略全部指标列的数据
+            strategy_config: 策略配置
             
+        Returns:
+            Dict: 策略运行结果
+        """
         # 生成信号
         signals = pd.DataFrame(index=data.index)
         signals['signal'] = 0
@@ -140,18 +212,16 @@ class StrategyEngine:
         if sell_condition is not None:
             signals.loc[sell_condition, 'signal'] = -1
             
-        # 计算仓位
+        # 计算仓位，carry为True时持仓保持到下一个信号，卖出后空仓（allow_short为True时做空）
+        sizing = strategy_config['position_sizing']
         positions = pd.DataFrame(index=signals.index)
-        if strategy_config['position_sizing']['type'] == 'fixed':
-            position_size = strategy_config['position_sizing']['value']
-            positions['position'] = signals['signal'] * position_size
+        if sizing['type'] == 'fixed':
+            positions['position'] = positions_from_signals(signals['signal'], sizing['value'],
+                                                           sizing.get('carry', False),
+                                                           sizing.get('allow_short', False))
             
         # 计算收益
-        returns = pd.Series(index=data.index)
-        returns.iloc[0] = 0
-        for i in range(1, len(data)):
-            daily_return = (data['close'].iloc[i] / data['close'].iloc[i-1] - 1)
-            returns.iloc[i] = daily_return * positions['position'].iloc[i-1]
+        returns = strategy_returns(data['close'], positions['position'])
             
         return {
             'returns': returns,
@@ -159,26 +229,58 @@ class StrategyEngine:
             'signals': signals
         }
         
-    def backtest(self, data: pd.DataFrame, start_date: str, end_date: str) -> Dict:
+    def backtest(self,
+                 data: pd.DataFrame,
+                 start_date: str,
+                 end_date: str,
+                 timeframes: Optional[Dict[str, pd.DataFrame]] = None,
+                 strategies: Optional[List[str]] = None) -> Dict:
         """执行回测
         
         Args:
             data: 历史数据
             start_date: 开始日期
             end_date: 结束日期
+            timeframes: 高周期K线，键为列名后缀，值为包含date列的K线（如
+                StockDataManager.get_stock_period_bars 的结果）。例如 {'w': 周线}
+                会在日线上增加 close_w 等列，每个交易日只能看到已结束的周期。
+                也可以直接传入 StockDataManager.get_multi_timeframe_bars 的结果作为 data
+            strategies: 要回测的策略名称，默认全部策略
             
         Returns:
             Dict: 回测结果
         """
-        # 筛选时间范围
+        # 在筛选时间范围前对齐，区间开始时可以看到上一个周期的数据
+        for suffix, bars in (timeframes or {}).items():
+            data = align_period_bars(data, bars, suffix)
+            
+        # 筛选时间范围（布尔索引已返回新对象，各策略运行时会再各自复制，
+        # 这里不再额外拷贝，内存映射的只读数据也可以直接传入）
+        if data.empty:
+            raise ValueError("回测数据为空")
         mask = (data.index >= start_date) & (data.index <= end_date)
-        data = data[mask].copy()
+        data = data[mask]
+        if data.empty:
+            raise ValueError(f"{start_date} 至 {end_date} 之间没有数据")
         
         results = {}
+        digests = fingerprint(data)
+        selected = [name for name in self.config['strategies']
+                    if strategies is None or name in strategies]
+        
+        # 所选策略的指标合并为一张依赖图，相同的指标只计算一次
+        graph = self.build_graph(selected)
+        values = graph.evaluate(data, digests, self.indicator_cache, self._execute_code)
+        self.graph_stats = graph.stats
         
         # 执行单个策略回测
-        for strategy_name, strategy_config in self.config['strategies'].items():
-            results[strategy_name] = self._run_strategy(data, strategy_config)
+        for strategy_name in selected:
+            strategy_config = self.config['strategies'][strategy_name]
+            if strategy_name in graph.strategies:
+                results[strategy_name] = self._generate_results(
+                    graph.assign(strategy_name, data, values), strategy_config)
+            else:
+                results[strategy_name] = self._run_strategy(data, strategy_config, digests)
             
         # 执行组合策略回测
         if 'strategy_portfolio' in self.config:
@@ -0,0 +1,82 @@
+"""
+向量化回测核心
+
+由信号计算仓位、由仓位计算收益都只用数组的平移和逐元素乘法，不逐行读写：
+    positions_from_signals  信号乘以仓位比例；carry=True 时无信号的日子沿用上一个信号的仓位，
+                            卖出后空仓（A股只做多），allow_short=True 时卖出后持有空头
+    strategy_returns        第 t 天的收益 = (close[t] / close[t-1] - 1) * position[t-1]，第一天为0
+输入可以是一维序列，也可以是 (时间 × 股票) 二维数组，一次计算全部股票。
+默认（carry=False）的结果与逐行循环的实现逐位一致。
+"""
+from typing import Union
+import numpy as np
+import pandas as pd
+
+ArrayLike = Union[pd.Series, pd.DataFrame, np.ndarray]
+
+def _wrap(result: np.ndarray, like):
+    """输入为Series/DataFrame时按原索引返回，数组输入返回数组"""
+    if isinstance(like, pd.DataFrame):
+        return pd.DataFrame(result, index=like.index, columns=like.columns)
+    if isinstance(like, pd.Series):
+        return pd.Series(result, index=like.index)
+    return result
+
+def carry_forward(signal: np.ndarray) -> np.ndarray:
+    """把每个非0信号沿用到下一个非0信号之前，第一个信号之前为0
+
+    Args:
+        signal: 信号数组（1买入、-1卖出、0无信号），二维时按列（时间轴为第0维）处理
+    """
+    signal = np.asarray(signal)
+    n = signal.shape[0]
+    if n == 0:
+        return signal.copy()
+    # 每个位置取最近一个非0信号的行号；第0行没有信号时取到的值本身就是0
+    rows = np.arange(n).reshape((n,) + (1,) * (signal.ndim - 1))
+    last = np.where(signal != 0, rows, 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    return np.take_along_axis(signal, last, axis=0)
+
+def positions_from_signals(signal: ArrayLike, size: float, carry: bool = False,
+                           allow_short: bool = False):
+    """由信号计算仓位
+
+    Args:
+        signal: 信号序列或 (时间 × 股票) 信号矩阵
+        size: 仓位比例（position_sizing 的 value）
+        carry: 为True时持仓保持到下一个信号，卖出信号后空仓；
+            否则只有信号当天有仓位，与原有实现一致
+        allow_short: carry 为True时，卖出信号后持有 -size 的空头仓位
+
+    Returns:
+        与 signal 形状相同的仓位
+    """
+    values = np.asarray(signal)
+    if carry:
+        values = carry_forward(values)
+        if not allow_short:
+            values = np.where(values < 0, 0, values)
+    return _wrap(values * size, signal)
+
+def strategy_returns(close: ArrayLike, position: ArrayLike):
+    """按前一天的仓位计算每天的收益
+
+    Args:
+        close: 收盘价序列或 (时间 × 股票) 矩阵
+        position: 与 close 形状相同的仓位
+
+    Returns:
+        与 close 形状相同的收益，第一天为0；收盘价为NaN时相关的两天为NaN
+    """
+    price = np.asarray(close, dtype='float64')
+    held = np.asarray(position, dtype='float64')
+    if held.shape != price.shape:
+        raise ValueError("仓位与收盘价的形状不一致")
+    returns = np.empty(price.shape)
+    returns[:1] = 0
+    # 与逐行实现的运算顺序相同：先算涨跌幅，再乘以前一天的仓位
+    np.divide(price[1:], price[:-1], out=returns[1:])
+    returns[1:] -= 1
+    returns[1:] *= held[:-1]
+    return _wrap(returns, close)
@@ -0,0 +1,49 @@
+"""
+系统配置
+
+所有配置项均可通过环境变量覆盖，便于在 Docker 中按容器调整。
+"""
+import os
+
+# 项目根目录
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 数据目录
+DATA_DIR = os.getenv('BLACKX_DATA_DIR', os.path.join(BASE_DIR, 'data'))
+
+# 日线存储后端：sqlite（默认）或 parquet
+BAR_BACKEND = os.getenv('BLACKX_BAR_BACKEND', 'sqlite')
+
+# Parquet 日线存储目录
+PARQUET_DIR = os.getenv('BLACKX_PARQUET_DIR', os.path.join(DATA_DIR, 'parquet'))
+
+# 内存映射日线缓存目录
+BAR_CACHE_DIR = os.getenv('BLACKX_BAR_CACHE_DIR', os.path.join(DATA_DIR, 'bar_cache'))
+
+# 进程内LRU缓存容量（条目数、字节数）
+CACHE_MAX_ENTRIES = int(os.getenv('BLACKX_CACHE_MAX_ENTRIES', '1024'))
+CACHE_MAX_BYTES = int(os.getenv('BLACKX_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+# 回测指标结果缓存的最大条目数和总字节数
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv('BLACKX_INDICATOR_CACHE_MAX_ENTRIES', '512'))
+INDICATOR_CACHE_MAX_BYTES = int(os.getenv('BLACKX_INDICATOR_CACHE_MAX_BYTES', str(128 * 1024 * 1024)))
+
+# 批量获取数据时的线程数和每秒请求上限
+FETCH_WORKERS = int(os.getenv('BLACKX_FETCH_WORKERS', '8'))
+FETCH_RATE_LIMIT = float(os.getenv('BLACKX_FETCH_RATE_LIMIT', '5'))
+
+# 全市场实时行情快照的刷新间隔（秒）
+SNAPSHOT_INTERVAL = float(os.getenv('BLACKX_SNAPSHOT_INTERVAL', '30'))
+
+# 内存中每只股票保留的行情快照数，以及快照批量写入历史表的间隔（秒）
+QUOTE_BUFFER_CAPACITY = int(os.getenv('BLACKX_QUOTE_BUFFER_CAPACITY', '512'))
+QUOTE_FLUSH_INTERVAL = float(os.getenv('BLACKX_QUOTE_FLUSH_INTERVAL', '300'))
+
+# 收盘后日线同步任务：运行时间（工作日）、首次同步的起始日期、断点文件
+SYNC_HOUR = int(os.getenv('BLACKX_SYNC_HOUR', '16'))
+SYNC_MINUTE = int(os.getenv('BLACKX_SYNC_MINUTE', '30'))
+SYNC_HISTORY_START = os.getenv('BLACKX_SYNC_HISTORY_START', '2015-01-01')
+SYNC_CHECKPOINT = os.getenv('BLACKX_SYNC_CHECKPOINT', os.path.join(DATA_DIR, 'sync_checkpoint.json'))
+
+# 财务指标的起始年份，默认为日线首次同步起始日期的前一年，保证区间开始时已有最近一期财报
+FUNDAMENTALS_START_YEAR = int(os.getenv('BLACKX_FUNDAMENTALS_START_YEAR', str(int(SYNC_HISTORY_START[:4]) - 1)))
@@ -0,0 +1,59 @@
+"""
+复权计算
+
+本地只保存不复权日线和后复权因子，复权价格在读取时计算：
+    后复权 hfq = 原始价格 × 当日因子
+    前复权 qfq = 原始价格 × 当日因子 / 最新因子
+因子表每行表示从该日期起生效的因子，分红送股只新增一行因子，
+不需要重新获取历史日线。
+"""
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# 需要复权的价格列，成交量保持原值
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+# 支持的复权方式：前复权、后复权、不复权
+ADJUST_TYPES = ('qfq', 'hfq', '')
+
+def apply_adj_factor(df: pd.DataFrame, factors: pd.DataFrame, adjust: Optional[str]) -> pd.DataFrame:
+    """对包含 code、date 列的日线数据计算复权价格
+
+    每根K线使用日期不晚于它的最近一个因子；早于第一个因子的K线使用第一个因子。
+    没有因子的股票视为从未除权，价格不变。
+
+    Args:
+        df: 不复权日线数据，包含 code、date 和价格列
+        factors: 复权因子，包含 code、date、factor 列
+        adjust: 'qfq' 前复权，'hfq' 后复权，'' 或 None 不复权
+
+    Returns:
+        与 df 行顺序相同的复权后数据
+    """
+    adjust = adjust or ''
+    if adjust not in ADJUST_TYPES:
+        raise ValueError(f"不支持的复权方式: {adjust}")
+    if not adjust or df.empty or factors.empty:
+        return df
+
+    factors = factors.sort_values(['date', 'code'])
+    # merge_asof 要求按连接键整体排序，计算完成后按原顺序写回
+    order = df['date'].to_numpy().argsort(kind='stable')
+    bars = df[['code', 'date']].iloc[order]
+    factor = pd.merge_asof(bars, factors[['code', 'date', 'factor']],
+                           on='date', by='code', direction='backward')['factor'].to_numpy()
+
+    by_code = factors.groupby('code')['factor']
+    codes = bars['code']
+    first = codes.map(by_code.first()).fillna(1.0).to_numpy()
+    factor = np.where(np.isnan(factor), first, factor)
+    if adjust == 'qfq':
+        factor = factor / codes.map(by_code.last()).fillna(1.0).to_numpy()
+
+    scale = np.empty(len(df))
+    scale[order] = factor
+    result = df.copy()
+    columns = [c for c in PRICE_COLUMNS if c in result.columns]
+    result[columns] = result[columns].to_numpy(dtype='float64') * scale[:, None]
+    return result
@@ -0,0 +1,210 @@
+from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import weakref
+from typing import Optional, Iterable, AsyncIterator, Tuple, Callable, Any, List
+import pandas as pd
+from .fetcher import StockDataFetcherBase, StockDataFetcher, DataFetchError
+from ..config import settings
+
+class AsyncStockDataFetcherBase(ABC):
+    """异步股票数据获取器基类"""
+
+    @abstractmethod
+    async def get_stock_list(self) -> pd.DataFrame:
+        """获取A股股票列表"""
+        pass
+
+    @abstractmethod
+    async def get_stock_daily(self,
+                              symbol: str,
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None,
+                              raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票日线数据"""
+        pass
+
+    @abstractmethod
+    async def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """获取股票实时行情"""
+        pass
+
+    @abstractmethod
+    async def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """获取股票财务数据"""
+        pass
+
+    async def get_stock_daily_many(self,
+                                   symbols: Iterable[str],
+                                   start_date: Optional[str] = None,
+                                   end_date: Optional[str] = None
+                                   ) -> AsyncIterator[Tuple[str, pd.DataFrame, Optional[Exception]]]:
+        """并发获取多只股票日线数据，按完成顺序逐个返回
+
+        Yields:
+            (股票代码, 日线数据, 异常)，成功时异常为None，失败时日线数据为空DataFrame
+        """
+        async def fetch(symbol):
+            try:
+                return symbol, await self.get_stock_daily(symbol, start_date, end_date,
+                                                          raise_on_error=True), None
+            except Exception as e:
+                return symbol, pd.DataFrame(), e
+
+        tasks = [asyncio.ensure_future(fetch(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 调用方提前停止迭代或被取消时，取消尚未完成的请求
+            for task in tasks:
+                task.cancel()
+
+class AsyncAkshareStockDataFetcher(AsyncStockDataFetcherBase):
+    """异步数据获取器实现
+
+    akshare 只提供同步接口，这里把同步获取器的调用放到有界线程池中执行，
+    不阻塞事件循环。并发数由信号量和线程池共同限制，每次调用有超时时间。
+    被取消或超时的调用会立即返回，但已在工作线程中执行的请求无法中断，
+    会在后台执行完毕后丢弃结果。
+    """
+
+    def __init__(self,
+                 fetcher: Optional[StockDataFetcherBase] = None,
+                 max_concurrency: Optional[int] = None,
+                 timeout: float = 30.0,
+                 max_retries: int = 2,
+                 backoff: float = 1.0):
+        """
+        Args:
+            fetcher: 同步数据获取器，默认使用Akshare实现
+            max_concurrency: 最大并发请求数，默认读取配置 BLACKX_FETCH_WORKERS
+            timeout: 单次调用超时秒数（包含日线请求的重试等待）
+            max_retries: 日线请求失败时的最大重试次数
+            backoff: 日线请求首次重试前的等待秒数
+        """
+        self.fetcher = fetcher or StockDataFetcher()
+        self.max_concurrency = max_concurrency or settings.FETCH_WORKERS
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        # 信号量绑定创建它的事件循环，每个事件循环使用自己的信号量，
+        # 同一个实例可以在多次 asyncio.run() 中复用
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _call(self, func: Callable, *args, **kwargs) -> Any:
+        """在线程池中执行同步调用，超时抛出 DataFetchError"""
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError as e:
+                raise DataFetchError(f"{func.__name__} 调用超时({self.timeout}秒)") from e
+
+    async def _call_or_empty(self, func: Callable, *args) -> pd.DataFrame:
+        """调用失败或超时时返回空DataFrame，与同步获取器的行为一致"""
+        try:
+            return await self._call(func, *args)
+        except DataFetchError as e:
+            print(e)
+            return pd.DataFrame()
+
+    async def get_stock_list(self) -> pd.DataFrame:
+        """获取A股股票列表"""
+        return await self._call_or_empty(self.fetcher.get_stock_list)
+
+    async def get_stock_daily(self,
+                              symbol: str,
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None,
+                              raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票日线数据（经过同步获取器的限流和重试）"""
+        try:
+            return await self._call(self.fetcher.get_stock_daily_with_retry,
+                                    symbol, start_date, end_date,
+                                    self.max_retries, self.backoff)
+        except DataFetchError as e:
+            if raise_on_error:
+                raise
+            print(e)
+            return pd.DataFrame()
+
+    async def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """获取股票实时行情"""
+        return await self._call_or_empty(self.fetcher.get_stock_realtime, symbol)
+
+    async def get_stock_realtime_many(self, symbols: List[str]) -> pd.DataFrame:
+        """批量获取股票实时行情"""
+        return await self._call_or_empty(self.fetcher.get_stock_realtime_many, symbols)
+
+    async def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """获取股票财务数据"""
+        return await self._call_or_empty(self.fetcher.get_stock_financial, symbol)
+
+    def close(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class AsyncStockDataManager:
+    """StockDataManager 的异步适配器
+
+    同一个 StockDataManager 实例既可被同步代码直接调用，也可通过本适配器在
+    协程中 await。调用在线程池中执行，不会阻塞事件循环；DatabaseManager
+    按调用创建会话，多个调用可以并发执行。
+    """
+
+    def __init__(self,
+                 manager=None,
+                 timeout: Optional[float] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            manager: StockDataManager 实例，默认新建
+            timeout: 单次调用超时秒数，None表示不限制
+            max_workers: 线程数，默认读取配置 BLACKX_FETCH_WORKERS
+        """
+        if manager is None:
+            from .manager import StockDataManager
+            manager = StockDataManager()
+        self.manager = manager
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or settings.FETCH_WORKERS)
+
+    async def _call(self, func: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(func, *args))
+        return await asyncio.wait_for(future, self.timeout)
+
+    async def get_stock_list(self) -> pd.DataFrame:
+        """获取股票列表"""
+        return await self._call(self.manager.get_stock_list)
+
+    async def get_stock_daily(self,
+                              symbol: str,
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None,
+                              adjust: str = 'qfq') -> pd.DataFrame:
+        """获取股票日线数据"""
+        return await self._call(self.manager.get_stock_daily, symbol, start_date, end_date, adjust)
+
+    async def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """获取股票实时行情"""
+        return await self._call(self.manager.get_stock_realtime, symbol)
+
+    async def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """获取股票财务数据"""
+        return await self._call(self.manager.get_stock_financial, symbol)
+
+    def close(self):
+        """关闭线程池"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
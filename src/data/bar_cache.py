@@ -0,0 +1,93 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+class MmapBarCache:
+    """内存映射的日线数据缓存
+
+    每只股票一个 ``<code>.npy`` 文件，内容为按日期排序的 n×6 float64 矩阵，
+    以列优先（Fortran）顺序存储：第0列逐位保存 int64 纳秒时间戳，
+    其余依次为 open/high/low/close/volume。列优先保证每一列在文件中连续，
+    读取时日期索引和价格块都直接引用映射内存，构造 DataFrame 不发生拷贝。
+
+    文件以只读方式映射，多个进程（Streamlit、FastAPI、批处理任务）读取同一
+    股票时共享操作系统页缓存。刷新时先写临时文件再原子替换，已打开旧文件的
+    读取方不受影响。
+    """
+
+    fields = ['open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 缓存目录
+        """
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.root, f'{code}.npy')
+
+    def exists(self, code: str) -> bool:
+        """检查股票是否已有缓存文件"""
+        return os.path.exists(self._path(code))
+
+    def refresh(self, code: str, df: pd.DataFrame):
+        """用日线数据重写某只股票的缓存文件
+
+        Args:
+            code: 股票代码
+            df: 日线数据，包含date及OHLCV列
+        """
+        df = df.drop_duplicates(subset=['date'], keep='last').sort_values('date')
+        matrix = np.empty((len(df), len(self.fields) + 1), dtype='float64', order='F')
+        matrix[:, 0] = pd.to_datetime(df['date']).to_numpy('datetime64[ns]').view('float64')
+        matrix[:, 1:] = df[self.fields].to_numpy(dtype='float64')
+
+        # 临时文件名包含进程和线程号，多个进程同时刷新同一股票时互不覆盖
+        tmp_path = os.path.join(self.root, f'.{code}.{os.getpid()}.{threading.get_ident()}.tmp.npy')
+        try:
+            np.save(tmp_path, matrix)
+            os.replace(tmp_path, self._path(code))
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def invalidate(self, code: str):
+        """删除某只股票的缓存，下次读取时重建"""
+        try:
+            os.remove(self._path(code))
+        except FileNotFoundError:
+            pass
+
+    def load(self,
+             code: str,
+             start_date: Optional[str] = None,
+             end_date: Optional[str] = None) -> pd.DataFrame:
+        """以只读内存映射方式读取日线数据
+
+        Args:
+            code: 股票代码
+            start_date: 开始日期，默认不限
+            end_date: 结束日期，默认不限
+
+        Returns:
+            以date为索引的DataFrame，数据直接引用映射内存（只读）；无缓存时返回空DataFrame
+        """
+        path = self._path(code)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+
+        matrix = np.load(path, mmap_mode='r')
+        dates = np.asarray(matrix[:, 0]).view('datetime64[ns]')
+        lo = 0 if start_date is None else np.searchsorted(dates, np.datetime64(start_date), 'left')
+        hi = len(dates) if end_date is None else np.searchsorted(dates, np.datetime64(end_date), 'right')
+        matrix = np.asarray(matrix[lo:hi])
+
+        index = pd.DatetimeIndex(matrix[:, 0].view('datetime64[ns]'), name='date')
+        return pd.DataFrame(matrix[:, 1:], index=index, columns=self.fields, copy=False)
@@ -0,0 +1,223 @@
+from abc import ABC, abstractmethod
+import os
+import threading
+import numpy as np
+import pandas as pd
+from typing import Optional, List
+from ..utils.dtypes import compact_bars
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow为可选依赖，仅Parquet存储需要
+    pa = None
+
+def to_wide_panel(df: pd.DataFrame, fields: List[str], dtype='float64') -> pd.DataFrame:
+    """把长表转换为 (date × 股票代码) 面板
+
+    用因子化后的整数下标直接写入预分配的二维数组，不经过逐行透视。
+
+    Args:
+        df: 包含 code、date 和 fields 列的长表
+        fields: 需要转换的价格列
+        dtype: 面板的数据类型，紧凑模式为float32
+    """
+    if df.empty:
+        return pd.DataFrame()
+    date_idx, dates = pd.factorize(df['date'], sort=True)
+    code_idx, codes = pd.factorize(df['code'], sort=True)
+    panels = {}
+    for field in fields:
+        values = np.full((len(dates), len(codes)), np.nan, dtype=dtype)
+        values[date_idx, code_idx] = df[field].to_numpy(dtype=dtype)
+        panels[field] = pd.DataFrame(values,
+                                     index=pd.DatetimeIndex(dates, name='date'),
+                                     columns=pd.Index(codes, name='code'))
+    if len(fields) == 1:
+        return panels[fields[0]]
+    return pd.concat(panels, axis=1, names=['field', 'code'])
+
+class BarStoreBase(ABC):
+    """日线数据存储基类"""
+
+    # 日线数据列
+    columns = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+    # 同步区间（stock_daily_coverage）中标识本存储的键，不同存储的数据分别记录已同步区间
+    coverage_key = 'sqlite'
+
+    @abstractmethod
+    def get_stock_daily(self,
+                        code: str,
+                        start_date: str,
+                        end_date: str,
+                        columns: Optional[List[str]] = None,
+                        compact: bool = False) -> pd.DataFrame:
+        """获取单只股票日线数据
+
+        Args:
+            code: 股票代码
+            start_date: 开始日期，格式YYYY-MM-DD
+            end_date: 结束日期，格式YYYY-MM-DD
+            columns: 需要的价格列，默认全部；date列总是返回
+            compact: 返回紧凑类型（价格float32、成交量int64、日期int64纳秒时间戳，见 utils.dtypes）
+        """
+        pass
+
+    @abstractmethod
+    def save_stock_daily(self, code: str, df: pd.DataFrame):
+        """保存股票日线数据，已有日期的数据会被覆盖"""
+        pass
+
+    def get_stock_daily_panel(self,
+                              codes: Optional[List[str]],
+                              start_date: str,
+                              end_date: str,
+                              columns: Optional[List[str]] = None,
+                              layout: str = 'long',
+                              compact: bool = False) -> pd.DataFrame:
+        """批量获取多只股票日线数据
+
+        Args:
+            codes: 股票代码列表，None表示全部股票
+            start_date: 开始日期
+            end_date: 结束日期
+            columns: 需要的价格列，默认全部
+            layout: 'long' 返回带code、date列的长表（按code、date排序）；
+                'wide' 返回以date为索引、股票代码为列的面板，多列时列为(字段, 代码)两级索引，
+                某只股票当天无数据（停牌）时为NaN
+            compact: 返回紧凑类型（见 utils.dtypes）：长表的价格为float32、成交量为int64、
+                代码为category、日期为int64纳秒时间戳；宽面板所有字段为float32
+        """
+        if layout not in ('long', 'wide'):
+            raise ValueError(f"不支持的面板格式: {layout}")
+        fields = self._select_columns(columns)
+        df = self._load_panel(codes, start_date, end_date, fields)
+        if layout == 'wide':
+            return to_wide_panel(df, fields, 'float32' if compact else 'float64')
+        return compact_bars(df) if compact else df
+
+    def _load_panel(self,
+                    codes: Optional[List[str]],
+                    start_date: str,
+                    end_date: str,
+                    fields: List[str]) -> pd.DataFrame:
+        """读取长表格式的多股票日线数据，列为 code、date 和 fields
+
+        默认实现逐只读取，子类可覆盖为一次批量读取。
+        """
+        frames = []
+        for code in codes or []:
+            df = self.get_stock_daily(code, start_date, end_date, fields)
+            if not df.empty:
+                frames.append(df.assign(code=code))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)[['code', 'date'] + fields]
+
+    def _select_columns(self, columns: Optional[List[str]]) -> List[str]:
+        """校验并返回需要读取的价格列"""
+        if columns is None:
+            return self.columns[1:]
+        unknown = set(columns) - set(self.columns)
+        if unknown:
+            raise ValueError(f"不支持的日线数据列: {sorted(unknown)}")
+        return [c for c in columns if c != 'date']
+
+class ParquetBarStore(BarStoreBase):
+    """基于Parquet的列式日线存储
+
+    目录按股票代码分区：<root>/daily/code=<代码>/bars.parquet。
+    文件内按日期排序并按 row_group_size 行分组写入，日期过滤条件会利用
+    行组统计信息跳过无关数据块；批量读取时代码过滤直接裁剪分区目录。
+    """
+
+    def __init__(self, root: str, row_group_size: int = 250):
+        """
+        Args:
+            root: 存储根目录
+            row_group_size: 每个行组的行数，默认约一年的交易日
+        """
+        if pa is None:
+            raise ImportError("Parquet存储需要安装pyarrow: pip install pyarrow")
+        self.root = os.path.join(root, 'daily')
+        self.row_group_size = row_group_size
+        self.coverage_key = f'parquet:{os.path.abspath(self.root)}'
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.root, f'code={code}', 'bars.parquet')
+
+    @staticmethod
+    def _date_filter(start_date: str, end_date: str):
+        return ((ds.field('date') >= pd.Timestamp(start_date)) &
+                (ds.field('date') <= pd.Timestamp(end_date)))
+
+    def get_stock_daily(self,
+                        code: str,
+                        start_date: str,
+                        end_date: str,
+                        columns: Optional[List[str]] = None,
+                        compact: bool = False) -> pd.DataFrame:
+        """从Parquet文件获取股票日线数据"""
+        columns = self._select_columns(columns)
+        try:
+            path = self._path(code)
+            if not os.path.exists(path):
+                return pd.DataFrame()
+            table = ds.dataset(path, format='parquet').to_table(
+                columns=['date'] + columns,
+                filter=self._date_filter(start_date, end_date)
+            )
+            df = table.to_pandas()
+            return compact_bars(df) if compact else df
+        except Exception as e:
+            print(f"从Parquet获取股票日线数据失败: {e}")
+            return pd.DataFrame()
+
+    def _load_panel(self,
+                    codes: Optional[List[str]],
+                    start_date: str,
+                    end_date: str,
+                    fields: List[str]) -> pd.DataFrame:
+        """一次列式读取多只股票日线数据，codes为None时读取全部股票"""
+        try:
+            partitioning = ds.partitioning(pa.schema([('code', pa.string())]), flavor='hive')
+            dataset = ds.dataset(self.root, format='parquet', partitioning=partitioning)
+            expr = self._date_filter(start_date, end_date)
+            if codes is not None:
+                expr = expr & ds.field('code').isin(list(codes))
+            table = dataset.to_table(columns=['code', 'date'] + fields, filter=expr)
+            return table.sort_by([('code', 'ascending'), ('date', 'ascending')]).to_pandas()
+        except Exception as e:
+            print(f"从Parquet批量获取股票日线数据失败: {e}")
+            return pd.DataFrame()
+
+    def save_stock_daily(self, code: str, df: pd.DataFrame):
+        """保存股票日线数据到Parquet文件，与已有数据按日期合并"""
+        try:
+            df = df[self.columns].copy()
+            df['date'] = pd.to_datetime(df['date'])
+            df[self.columns[1:]] = df[self.columns[1:]].astype('float64')
+
+            path = self._path(code)
+            if os.path.exists(path):
+                existing = pq.read_table(path).to_pandas()
+                df = pd.concat([existing, df], ignore_index=True)
+            df = df.drop_duplicates(subset=['date'], keep='last').sort_values('date')
+
+            # 先写临时文件再替换，避免读取方看到写了一半的文件；临时文件以'.'开头，
+            # 写入中断时残留的文件也会被数据集扫描忽略，文件名包含进程和线程号，并发写入互不覆盖
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = os.path.join(directory, f'.bars.{os.getpid()}.{threading.get_ident()}.tmp')
+            pq.write_table(
+                pa.Table.from_pandas(df, preserve_index=False),
+                tmp_path,
+                row_group_size=self.row_group_size,
+                compression='zstd'
+            )
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"保存股票日线数据到Parquet失败: {e}")
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional
+import pandas as pd
+
+def estimate_size(value: Any) -> int:
+    """估算缓存对象占用的字节数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return 0
+
+class LRUCache:
+    """带过期时间的内存LRU缓存
+
+    同时按条目数和总字节数限制容量，超出时淘汰最久未使用的条目。
+    每个条目有各自的过期时间，过期条目在读取时删除并计为未命中。
+    所有操作加锁，可在多线程（如FastAPI线程池）中共享。
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            max_entries: 最大条目数
+            max_bytes: 最大总字节数
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, nbytes, expires_at = entry
+            if expires_at is not None and datetime.now() >= expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, expires_at: Optional[datetime] = None):
+        """写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expires_at: 过期时间，None表示不过期
+        """
+        nbytes = estimate_size(value)
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            # 单个对象超过总容量时不缓存
+            if nbytes > self.max_bytes:
+                return
+            self._data[key] = (value, nbytes, expires_at)
+            self._bytes += nbytes
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """删除指定缓存"""
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """删除键满足 predicate 的全部缓存，返回删除的条目数"""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存（保留统计计数）"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, nbytes, _ = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """返回命中、未命中、淘汰等统计信息"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._data),
+                'bytes': self._bytes
+            }
@@ -1,35 +1,124 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from contextlib import contextmanager
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import func, select, type_coerce, String
+from sqlalchemy.dialects.sqlite import insert
 from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
 import pandas as pd
-from .models import Session as DBSession, StockList, StockDaily, StockRealtime, StockFinancial
+from .models import (engine as default_engine, StockList, StockDaily, StockDailyCoverage,
+                     StockPeriodBar, StockAdjFactor, StockRealtime, StockRealtimeHistory,
+                     StockFinancial)
+from .bar_store import BarStoreBase
+from ..utils.date_ranges import DateRange, merge_ranges
+from ..utils.dtypes import compact_bars
 
-class DatabaseManager:
-    """数据库管理器"""
+class DatabaseManager(BarStoreBase):
+    """数据库管理器
     
-    def __init__(self):
-        """初始化数据库管理器"""
-        self.session = DBSession()
+    每个方法调用是一个独立的工作单元：从连接池取连接、新建会话，结束时提交或
+    回滚并归还连接。实例本身不持有会话，可在多个线程间共享。
+    """
+    
+    # 每批写入的行数，整个保存过程仍在同一事务内
+    chunk_size = 1000
+    
+    # 批量读取时IN条件允许的最大代码数，低于SQLite默认的999个参数限制
+    max_in_params = 900
+    
+    def __init__(self, engine=None):
+        """初始化数据库管理器
+        
+        Args:
+            engine: 数据库引擎，默认使用models中的全局引擎
+        """
+        self.engine = engine if engine is not None else default_engine
+        self.Session = sessionmaker(bind=self.engine, expire_on_commit=False)
+        
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """提供一个工作单元的会话：正常结束时提交，出错时回滚，最后关闭"""
+        session = self.Session()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        
+    def _bulk_upsert(self, session: Session, model, records: List[dict], key_columns: List[str]):
+        """批量写入，唯一键冲突时更新已有行
+        
+        使用 INSERT ... ON CONFLICT DO UPDATE 分批执行，调用方负责提交事务。
+        
+        Args:
+            session: 数据库会话
+            model: ORM模型类
+            records: 行数据列表
+            key_columns: 冲突判断所用的唯一键列
+        """
+        if not records:
+            return
+        stmt = insert(model.__table__)
+        update_columns = {
+            name: stmt.excluded[name]
+            for name in records[0]
+            if name not in key_columns
+        }
+        # ON CONFLICT的UPDATE分支不会触发onupdate，需显式刷新更新时间
+        update_columns['update_time'] = stmt.excluded['update_time']
+        stmt = stmt.on_conflict_do_update(index_elements=key_columns, set_=update_columns)
+        now = datetime.now()
+        for i in range(0, len(records), self.chunk_size):
+            chunk = records[i:i + self.chunk_size]
+            for record in chunk:
+                record.setdefault('update_time', now)
+            session.execute(stmt, chunk)
+            
+    @staticmethod
+    def _to_records(df: pd.DataFrame, columns: List[str]) -> List[dict]:
+        """将DataFrame转换为可直接写入数据库的字典列表（NaN转为None）"""
+        df = df[columns]
+        df = df.astype(object).where(df.notna(), None)
+        return df.to_dict('records')
+        
+    # 缓存类型对应的数据表
+    _cache_models = {
+        'stock_list': StockList,
+        'daily': StockDaily,
+        'adj_factor': StockAdjFactor,
+        'realtime': StockRealtime,
+        'financial': StockFinancial
+    }
         
-    def __del__(self):
-        """关闭数据库连接"""
-        self.session.close()
+    def get_update_time(self, cache_type: str, code: Optional[str] = None) -> Optional[datetime]:
+        """获取数据最近一次写入的时间
         
+        Args:
+            cache_type: 缓存类型，stock_list/daily/adj_factor/realtime/financial
+            code: 股票代码，None表示整张表
+        """
+        try:
+            model = self._cache_models[cache_type]
+            with self.session_scope() as session:
+                query = session.query(func.max(model.update_time))
+                if code is not None:
+                    query = query.filter(model.code == code)
+                return query.scalar()
+        except Exception as e:
+            print(f"从数据库获取更新时间失败: {e}")
+            return None
+            
     def get_stock_list(self) -> pd.DataFrame:
         """从数据库获取股票列表"""
         try:
-            stocks = self.session.query(StockList).all()
+            with self.session_scope() as session:
+                stocks = session.query(StockList.code, StockList.name).all()
             if not stocks:
                 return pd.DataFrame()
                 
-            data = []
-            for stock in stocks:
-                data.append({
-                    'code': stock.code,
-                    'name': stock.name
-                })
-                
-            return pd.DataFrame(data)
+            return pd.DataFrame(stocks, columns=['code', 'name'])
         except Exception as e:
             print(f"从数据库获取股票列表失败: {e}")
             return pd.DataFrame()
@@ -37,46 +126,66 @@ class DatabaseManager:
     def save_stock_list(self, df: pd.DataFrame):
         """保存股票列表到数据库"""
         try:
-            for _, row in df.iterrows():
-                stock = StockList(
-                    code=row['code'],
-                    name=row['name']
-                )
-                self.session.merge(stock)  # 使用merge而不是add，避免重复
-            self.session.commit()
+            df = df.drop_duplicates(subset=['code'], keep='last')
+            records = self._to_records(df, ['code', 'name'])
+            with self.session_scope() as session:
+                self._bulk_upsert(session, StockList, records, ['code'])
         except Exception as e:
-            self.session.rollback()
             print(f"保存股票列表失败: {e}")
             
-    def get_stock_daily(self, code: str, start_date: str, end_date: str) -> pd.DataFrame:
-        """从数据库获取股票日线数据"""
+    def get_stock_daily(self,
+                        code: str,
+                        start_date: str,
+                        end_date: str,
+                        columns: Optional[List[str]] = None,
+                        compact: bool = False) -> pd.DataFrame:
+        """从数据库获取股票日线数据
+        
+        compact为True时返回紧凑类型（价格float32、成交量int64、日期int64纳秒时间戳，
+        见 utils.dtypes）
+        """
+        fields = self._select_columns(columns)
+        df = self._load_panel([code], start_date, end_date, fields)
+        if df.empty:
+            return df
+        df = df.drop(columns='code')
+        return compact_bars(df) if compact else df
+        
+    def _load_panel(self,
+                    codes: Optional[List[str]],
+                    start_date: str,
+                    end_date: str,
+                    fields: List[str]) -> pd.DataFrame:
+        """一次查询读取多只股票日线数据，codes为None时读取全部股票
+        
+        只查询需要的列，结果行直接按列构造DataFrame，不创建ORM对象；
+        日期按字符串取出后统一向量化解析。代码数量超过 max_in_params 时，
+        SQL只按日期过滤，代码过滤在内存中完成，避免超出SQLite参数个数限制。
+        """
         try:
             start = datetime.strptime(start_date, '%Y-%m-%d')
             end = datetime.strptime(end_date, '%Y-%m-%d')
             
-            data = self.session.query(StockDaily).filter(
-                and_(
-                    StockDaily.code == code,
-                    StockDaily.date >= start,
-                    StockDaily.date <= end
-                )
-            ).all()
+            query = select(
+                StockDaily.code,
+                type_coerce(StockDaily.date, String).label('date'),
+                *[getattr(StockDaily, c) for c in fields]
+            ).where(StockDaily.date >= start, StockDaily.date <= end)
+            if codes is not None and len(codes) <= self.max_in_params:
+                query = query.where(StockDaily.code.in_(list(codes)))
+            query = query.order_by(StockDaily.code, StockDaily.date)
             
-            if not data:
+            with self.engine.connect() as conn:
+                rows = conn.execute(query).fetchall()
+            
+            if not rows:
                 return pd.DataFrame()
-                
-            records = []
-            for d in data:
-                records.append({
-                    'date': d.date,
-                    'open': d.open,
-                    'high': d.high,
-                    'low': d.low,
-                    'close': d.close,
-                    'volume': d.volume
-                })
-                
-            return pd.DataFrame(records)
+            
+            df = pd.DataFrame.from_records(rows, columns=['code', 'date'] + fields)
+            if codes is not None and len(codes) > self.max_in_params:
+                df = df[df['code'].isin(codes)].reset_index(drop=True)
+            df['date'] = pd.to_datetime(df['date'], format='ISO8601')
+            return df
         except Exception as e:
             print(f"从数据库获取股票日线数据失败: {e}")
             return pd.DataFrame()
@@ -84,28 +193,185 @@ class DatabaseManager:
     def save_stock_daily(self, code: str, df: pd.DataFrame):
         """保存股票日线数据到数据库"""
         try:
-            for _, row in df.iterrows():
-                daily = StockDaily(
-                    code=code,
-                    date=row['date'],
-                    open=row['open'],
-                    high=row['high'],
-                    low=row['low'],
-                    close=row['close'],
-                    volume=row['volume']
-                )
-                self.session.merge(daily)
-            self.session.commit()
-        except Exception as e:
-            self.session.rollback()
+            df = df.assign(code=code, date=pd.to_datetime(df['date']))
+            df = df.drop_duplicates(subset=['date'], keep='last')
+            records = self._to_records(
+                df, ['code', 'date', 'open', 'high', 'low', 'close', 'volume'])
+            with self.session_scope() as session:
+                self._bulk_upsert(session, StockDaily, records, ['code', 'date'])
+        except Exception as e:
             print(f"保存股票日线数据失败: {e}")
             
+    @staticmethod
+    def _load_daily_coverage(session: Session, code: str, store: str) -> List[DateRange]:
+        rows = session.query(
+            StockDailyCoverage.start_date, StockDailyCoverage.end_date
+        ).filter(StockDailyCoverage.code == code, StockDailyCoverage.store == store).all()
+        return merge_ranges([(r.start_date, r.end_date) for r in rows])
+            
+    def get_daily_coverage(self, code: str, store: str = 'sqlite') -> List[DateRange]:
+        """获取某只股票日线数据已同步的日期区间
+        
+        Args:
+            code: 股票代码
+            store: 日线存储的标识（BarStoreBase.coverage_key），默认为本数据库
+        """
+        try:
+            with self.session_scope() as session:
+                return self._load_daily_coverage(session, code, store)
+        except Exception as e:
+            print(f"从数据库获取日线同步区间失败: {e}")
+            return []
+            
+    def get_daily_coverage_end(self, store: str = 'sqlite') -> Dict[str, datetime]:
+        """一次查询获取某个日线存储中所有股票已同步区间的最晚日期"""
+        try:
+            with self.session_scope() as session:
+                rows = session.query(
+                    StockDailyCoverage.code, func.max(StockDailyCoverage.end_date)
+                ).filter(StockDailyCoverage.store == store).group_by(StockDailyCoverage.code).all()
+            return {code: end for code, end in rows}
+        except Exception as e:
+            print(f"从数据库获取日线同步区间失败: {e}")
+            return {}
+            
+    def add_daily_coverage(self, code: str, start: datetime, end: datetime, store: str = 'sqlite'):
+        """记录某只股票新同步到 store 的日期区间，并与已有区间合并"""
+        try:
+            with self.session_scope() as session:
+                ranges = merge_ranges(self._load_daily_coverage(session, code, store) + [(start, end)])
+                session.query(StockDailyCoverage).filter(
+                    StockDailyCoverage.code == code, StockDailyCoverage.store == store
+                ).delete()
+                session.add_all([
+                    StockDailyCoverage(store=store, code=code, start_date=s, end_date=e)
+                    for s, e in ranges
+                ])
+        except Exception as e:
+            print(f"保存日线同步区间失败: {e}")
+            
+    def get_period_bars(self,
+                        code: str,
+                        period: str,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None) -> pd.DataFrame:
+        """获取周线或月线（后复权），日期区间为空时不限制"""
+        try:
+            query = select(
+                type_coerce(StockPeriodBar.date, String).label('date'),
+                StockPeriodBar.open, StockPeriodBar.high, StockPeriodBar.low,
+                StockPeriodBar.close, StockPeriodBar.volume
+            ).where(StockPeriodBar.code == code, StockPeriodBar.period == period)
+            if start_date is not None:
+                query = query.where(StockPeriodBar.date >= datetime.strptime(start_date, '%Y-%m-%d'))
+            if end_date is not None:
+                query = query.where(StockPeriodBar.date <= datetime.strptime(end_date, '%Y-%m-%d'))
+            with self.engine.connect() as conn:
+                rows = conn.execute(query.order_by(StockPeriodBar.date)).fetchall()
+            if not rows:
+                return pd.DataFrame()
+            df = pd.DataFrame.from_records(rows, columns=['date'] + self.columns[1:])
+            df['date'] = pd.to_datetime(df['date'], format='ISO8601')
+            return df
+        except Exception as e:
+            print(f"从数据库获取周期K线失败: {e}")
+            return pd.DataFrame()
+            
+    def get_last_period_bar_date(self, code: str, period: str) -> Optional[datetime]:
+        """获取已合成的最后一根周期K线的日期"""
+        try:
+            with self.session_scope() as session:
+                return session.query(func.max(StockPeriodBar.date)).filter(
+                    StockPeriodBar.code == code, StockPeriodBar.period == period
+                ).scalar()
+        except Exception as e:
+            print(f"从数据库获取周期K线日期失败: {e}")
+            return None
+            
+    def save_period_bars(self, code: str, period: str, df: pd.DataFrame,
+                         since: Optional[datetime] = None):
+        """保存周期K线，已有周期按日期覆盖
+        
+        周期K线以周期内最后一个交易日为日期，未结束的周期补齐后日期会变化。
+        since 不为None时先删除该周期日期不早于 since 的K线，再写入重新合成的K线。
+        """
+        try:
+            df = df.assign(code=code, period=period, date=pd.to_datetime(df['date']))
+            records = self._to_records(
+                df, ['code', 'period', 'date', 'open', 'high', 'low', 'close', 'volume'])
+            with self.session_scope() as session:
+                if since is not None:
+                    session.query(StockPeriodBar).filter(
+                        StockPeriodBar.code == code, StockPeriodBar.period == period,
+                        StockPeriodBar.date >= since).delete()
+                self._bulk_upsert(session, StockPeriodBar, records, ['code', 'period', 'date'])
+        except Exception as e:
+            print(f"保存周期K线失败: {e}")
+            
+    def delete_period_bars(self, code: str, since: Optional[datetime] = None):
+        """删除某只股票日期不早于 since 的周期K线，since为None时全部删除"""
+        try:
+            with self.session_scope() as session:
+                query = session.query(StockPeriodBar).filter(StockPeriodBar.code == code)
+                if since is not None:
+                    query = query.filter(StockPeriodBar.date >= since)
+                query.delete()
+        except Exception as e:
+            print(f"删除周期K线失败: {e}")
+            
+    def get_adj_factor(self, codes: Optional[List[str]]) -> pd.DataFrame:
+        """获取复权因子，返回按 code、date 排序的 code、date、factor 列
+        
+        Args:
+            codes: 股票代码列表，None表示全部股票
+        """
+        try:
+            query = select(StockAdjFactor.code, StockAdjFactor.date, StockAdjFactor.factor)
+            if codes is not None:
+                query = query.where(StockAdjFactor.code.in_(list(codes)))
+            query = query.order_by(StockAdjFactor.code, StockAdjFactor.date)
+            with self.engine.connect() as conn:
+                rows = conn.execute(query).fetchall()
+            df = pd.DataFrame.from_records(rows, columns=['code', 'date', 'factor'])
+            df['date'] = pd.to_datetime(df['date'])
+            return df
+        except Exception as e:
+            print(f"从数据库获取复权因子失败: {e}")
+            return pd.DataFrame(columns=['code', 'date', 'factor'])
+            
+    def save_adj_factor(self, code: str, df: pd.DataFrame) -> bool:
+        """用最新获取的因子替换某只股票的全部复权因子
+        
+        Returns:
+            因子是否有变化；数据源可能修订历史因子，因此按整只股票比较
+        """
+        try:
+            df = df.assign(code=code, date=pd.to_datetime(df['date']))
+            df = df.drop_duplicates(subset=['date'], keep='last').sort_values('date')
+            with self.session_scope() as session:
+                existing = session.query(StockAdjFactor.date, StockAdjFactor.factor).filter(
+                    StockAdjFactor.code == code
+                ).order_by(StockAdjFactor.date).all()
+                existing = pd.DataFrame(existing, columns=['date', 'factor'])
+                changed = not existing.equals(
+                    df[['date', 'factor']].astype({'factor': float}).reset_index(drop=True))
+                # 没有变化时也整体重写，用 update_time 记录最近一次确认的时间
+                session.query(StockAdjFactor).filter(StockAdjFactor.code == code).delete()
+                if not df.empty:
+                    session.execute(insert(StockAdjFactor),
+                                    self._to_records(df, ['code', 'date', 'factor']))
+            return changed
+        except Exception as e:
+            print(f"保存复权因子失败: {e}")
+            return False
+            
     def get_stock_realtime(self, code: str) -> pd.DataFrame:
         """从数据库获取股票实时行情"""
         try:
-            data = self.session.query(StockRealtime).filter(
-                StockRealtime.code == code
-            ).first()
+            with self.session_scope() as session:
+                data = session.query(StockRealtime).filter(
+                    StockRealtime.code == code
+                ).first()
             
             if not data:
                 return pd.DataFrame()
@@ -124,26 +390,60 @@ class DatabaseManager:
     def save_stock_realtime(self, df: pd.DataFrame):
         """保存股票实时行情到数据库"""
         try:
-            for _, row in df.iterrows():
-                realtime = StockRealtime(
-                    code=row['code'],
-                    name=row['name'],
-                    price=row['price'],
-                    change=row['change'],
-                    volume=row['volume']
-                )
-                self.session.merge(realtime)
-            self.session.commit()
-        except Exception as e:
-            self.session.rollback()
+            df = df.drop_duplicates(subset=['code'], keep='last')
+            records = self._to_records(df, ['code', 'name', 'price', 'change', 'volume'])
+            with self.session_scope() as session:
+                self._bulk_upsert(session, StockRealtime, records, ['code'])
+        except Exception as e:
             print(f"保存股票实时行情失败: {e}")
             
+    def get_realtime_history(self,
+                             codes: Optional[List[str]] = None,
+                             start: Optional[datetime] = None,
+                             end: Optional[datetime] = None) -> pd.DataFrame:
+        """获取日内行情快照历史，按 code、time 排序
+        
+        Args:
+            codes: 股票代码列表，None表示全部股票
+            start: 开始时间（含）
+            end: 结束时间（含）
+        """
+        columns = ['code', 'time', 'price', 'change', 'volume']
+        try:
+            query = select(*[getattr(StockRealtimeHistory, c) for c in columns])
+            if codes is not None:
+                query = query.where(StockRealtimeHistory.code.in_(list(codes)))
+            if start is not None:
+                query = query.where(StockRealtimeHistory.time >= start)
+            if end is not None:
+                query = query.where(StockRealtimeHistory.time <= end)
+            query = query.order_by(StockRealtimeHistory.code, StockRealtimeHistory.time)
+            with self.engine.connect() as conn:
+                rows = conn.execute(query).fetchall()
+            df = pd.DataFrame.from_records(rows, columns=columns)
+            df['time'] = pd.to_datetime(df['time'])
+            return df
+        except Exception as e:
+            print(f"从数据库获取行情快照历史失败: {e}")
+            return pd.DataFrame(columns=columns)
+            
+    def save_realtime_history(self, df: pd.DataFrame):
+        """批量保存行情快照，同一股票同一时间的快照只保留一行"""
+        try:
+            df = df.drop_duplicates(subset=['code', 'time'], keep='last')
+            records = self._to_records(df, ['code', 'time', 'price', 'change', 'volume'])
+            with self.session_scope() as session:
+                self._bulk_upsert(session, StockRealtimeHistory, records, ['code', 'time'])
+        except Exception as e:
+            print(f"保存行情快照历史失败: {e}")
+            
     def get_stock_financial(self, code: str) -> pd.DataFrame:
         """从数据库获取股票财务数据"""
         try:
-            data = self.session.query(StockFinancial).filter(
-                StockFinancial.code == code
-            ).all()
+            with self.session_scope() as session:
+                data = session.query(StockFinancial).filter(
+                    StockFinancial.code == code
+                ).all()
             
             if not data:
                 return pd.DataFrame()
@@ -164,14 +464,10 @@ class DatabaseManager:
     def save_stock_financial(self, df: pd.DataFrame):
         """保存股票财务数据到数据库"""
         try:
-            for _, row in df.iterrows():
-                financial = StockFinancial(
-                    code=row['code'],
-                    name=row['name'],
-                    report_date=row['report_date']
-                )
-                self.session.merge(financial)
-            self.session.commit()
+            df = df.assign(report_date=pd.to_datetime(df['report_date']))
+            df = df.drop_duplicates(subset=['code', 'report_date'], keep='last')
+            records = self._to_records(df, ['code', 'name', 'report_date'])
+            with self.session_scope() as session:
+                self._bulk_upsert(session, StockFinancial, records, ['code', 'report_date'])
         except Exception as e:
-            self.session.rollback()
             print(f"保存股票财务数据失败: {e}") 
\ No newline at end of file
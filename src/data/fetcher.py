@@ -1,8 +1,22 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import random
+import time
 import akshare as ak
 import pandas as pd
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterable, Iterator, Tuple
 from datetime import datetime, timedelta
+from ..config import settings
+from ..utils.rate_limit import TokenBucket
+from ..utils.dtypes import compact_bars
+from .snapshot import MarketSnapshot
+
+# 分钟线字段
+MINUTE_FIELDS = ['datetime', 'open', 'high', 'low', 'close', 'volume', 'amount']
+
+class DataFetchError(Exception):
+    """数据源请求失败"""
+    pass
 
 class StockDataFetcherBase(ABC):
     """股票数据获取器基类"""
@@ -16,26 +30,179 @@ class StockDataFetcherBase(ABC):
     def get_stock_daily(self, 
                        symbol: str, 
                        start_date: Optional[str] = None,
-                       end_date: Optional[str] = None) -> pd.DataFrame:
-        """获取股票日线数据"""
+                       end_date: Optional[str] = None,
+                       raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票日线数据（不复权），复权价格由 get_adj_factor 的因子计算
+        
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            raise_on_error: 获取失败时抛出 DataFetchError，而不是返回空DataFrame。
+                用于区分"区间内没有交易日"和"请求失败"
+        """
         pass
     
+    # 批量获取时使用的限流器，None表示不限流
+    rate_limiter: Optional[TokenBucket] = None
+    
+    def get_stock_daily_with_retry(self,
+                                   symbol: str,
+                                   start_date: Optional[str] = None,
+                                   end_date: Optional[str] = None,
+                                   max_retries: int = 3,
+                                   backoff: float = 1.0) -> pd.DataFrame:
+        """带限流和指数退避重试的单只股票日线获取，最终失败时抛出 DataFetchError
+        
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            max_retries: 最大重试次数
+            backoff: 首次重试前的等待秒数，之后逐次翻倍
+        """
+        for attempt in range(max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return self.get_stock_daily(symbol, start_date, end_date, raise_on_error=True)
+            except DataFetchError:
+                if attempt == max_retries:
+                    raise
+                # 退避时间加随机抖动，避免多个线程同时重试
+                time.sleep(backoff * (2 ** attempt) * (1 + random.random()))
+    
+    def get_stock_daily_many(self,
+                             symbols: Iterable[str],
+                             start_date: Optional[str] = None,
+                             end_date: Optional[str] = None,
+                             max_workers: Optional[int] = None,
+                             max_retries: int = 3,
+                             backoff: float = 1.0,
+                             compact: bool = False
+                             ) -> Iterator[Tuple[str, pd.DataFrame, Optional[Exception]]]:
+        """并发获取多只股票日线数据，按完成顺序逐个返回
+        
+        在有界线程池中执行请求，所有请求共享 rate_limiter 限流，
+        单只股票失败时按指数退避重试。
+        
+        Args:
+            symbols: 股票代码列表
+            start_date: 开始日期
+            end_date: 结束日期
+            max_workers: 线程数，默认读取配置 BLACKX_FETCH_WORKERS
+            max_retries: 每只股票的最大重试次数
+            backoff: 首次重试前的等待秒数，之后逐次翻倍
+            compact: 返回紧凑类型的日线数据（见 utils.dtypes），用于只读取不写入存储的场景
+            
+        Yields:
+            (股票代码, 日线数据, 异常)，成功时异常为None，失败时日线数据为空DataFrame
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or settings.FETCH_WORKERS)
+        try:
+            futures = {
+                executor.submit(self.get_stock_daily_with_retry,
+                                symbol, start_date, end_date, max_retries, backoff): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    df = future.result()
+                    yield symbol, compact_bars(df) if compact else df, None
+                except Exception as e:
+                    yield symbol, pd.DataFrame(), e
+        finally:
+            # 调用方提前停止迭代时取消尚未开始的请求
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def get_adj_factor(self, symbol: str, raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票后复权因子
+        
+        Returns:
+            包含 date、factor 列的DataFrame，每行表示从该日期起生效的因子。
+            默认实现返回空DataFrame，表示数据源不提供因子、价格不做复权
+        """
+        return pd.DataFrame(columns=['date', 'factor'])
+    
+    def get_stock_minute(self,
+                         symbol: str,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None,
+                         period: str = '1',
+                         raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票分钟线（不复权）
+        
+        Args:
+            symbol: 股票代码
+            start: 开始时间，如 '2024-01-02 09:30:00'
+            end: 结束时间
+            period: 分钟周期，'1'、'5'、'15'、'30'、'60'
+            raise_on_error: 获取失败时抛出 DataFetchError
+            
+        Returns:
+            包含 datetime、open、high、low、close、volume、amount 列的DataFrame。
+            默认实现返回空DataFrame，表示数据源不提供分钟线
+        """
+        return pd.DataFrame(columns=MINUTE_FIELDS)
+    
     @abstractmethod
     def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
         """获取股票实时行情"""
         pass
     
+    def get_stock_realtime_many(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """批量获取股票实时行情，默认逐只获取后合并"""
+        frames = [self.get_stock_realtime(symbol) for symbol in symbols]
+        frames = [df for df in frames if not df.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+    
+    def get_market_snapshot(self, force_refresh: bool = False) -> pd.DataFrame:
+        """获取全市场实时行情快照，默认按股票列表批量获取实时行情后合并"""
+        stock_list = self.get_stock_list()
+        if stock_list.empty:
+            return pd.DataFrame()
+        return self.get_stock_realtime_many(stock_list['code'].astype(str))
+    
     @abstractmethod
     def get_stock_financial(self, symbol: str) -> pd.DataFrame:
         """获取股票财务数据"""
         pass
+    
+    def get_financial_indicators(self,
+                                 symbol: str,
+                                 start_year: Optional[int] = None,
+                                 raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票全部财务指标
+        
+        Args:
+            symbol: 股票代码
+            start_year: 起始年份，默认读取配置 BLACKX_FUNDAMENTALS_START_YEAR
+            raise_on_error: 请求失败时抛出 DataFetchError
+        
+        Returns:
+            包含 report_date 和数值型指标列的宽表，可选 announce_date 列（实际公告日）。
+            默认实现返回空DataFrame，表示数据源不提供财务指标
+        """
+        return pd.DataFrame()
 
 class AkshareStockDataFetcher(StockDataFetcherBase):
     """基于Akshare的股票数据获取器实现"""
     
-    def __init__(self):
-        """初始化数据获取器"""
+    def __init__(self, rate_limit: Optional[float] = None):
+        """初始化数据获取器
+        
+        Args:
+            rate_limit: 批量获取时每秒最多请求数，默认读取配置 BLACKX_FETCH_RATE_LIMIT
+        """
         self._cache: Dict[str, pd.DataFrame] = {}
+        rate = rate_limit or settings.FETCH_RATE_LIMIT
+        self.rate_limiter = TokenBucket(rate=rate, capacity=rate)
+        # 全市场行情快照，实时行情查询共享同一份下载结果
+        self._snapshot = MarketSnapshot(self._load_market_spot,
+                                        timedelta(seconds=settings.SNAPSHOT_INTERVAL))
 
     def _clean_symbol(self, symbol: str) -> str:
         """清理股票代码，移除后缀"""
@@ -52,7 +219,8 @@ class AkshareStockDataFetcher(StockDataFetcherBase):
     def get_stock_daily(self, 
                        symbol: str, 
                        start_date: Optional[str] = None,
-                       end_date: Optional[str] = None) -> pd.DataFrame:
+                       end_date: Optional[str] = None,
+                       raise_on_error: bool = False) -> pd.DataFrame:
         """获取股票日线数据"""
         try:
             if start_date is None:
@@ -70,7 +238,7 @@ class AkshareStockDataFetcher(StockDataFetcherBase):
             df = ak.stock_zh_a_hist(symbol=clean_symbol, 
                                   start_date=start_date,
                                   end_date=end_date,
-                                  adjust="qfq")  # 前复权
+                                  adjust="")  # 不复权，复权价格在读取时由因子计算
             
             if df.empty:
                 return df
@@ -100,57 +268,114 @@ class AkshareStockDataFetcher(StockDataFetcherBase):
             
             return df
         except Exception as e:
+            if raise_on_error:
+                raise DataFetchError(f"获取股票 {symbol} 日线数据失败: {e}") from e
             print(f"获取股票 {symbol} 日线数据失败: {e}")
             return pd.DataFrame()
 
-    def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
-        """获取股票实时行情"""
+    def _exchange_symbol(self, symbol: str) -> str:
+        """转换为带交易所前缀的代码（如sh600000），新浪接口使用"""
+        code = self._clean_symbol(symbol)
+        if code.startswith(('6', '9')):
+            return f'sh{code}'
+        if code.startswith(('4', '8')):
+            return f'bj{code}'
+        return f'sz{code}'
+
+    def get_adj_factor(self, symbol: str, raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票后复权因子"""
         try:
-            # 清理股票代码
-            clean_symbol = self._clean_symbol(symbol)
-            
-            # 使用更稳定的API
-            df = ak.stock_zh_a_spot()
+            df = ak.stock_zh_a_daily(symbol=self._exchange_symbol(symbol), adjust="hfq-factor")
             if df.empty:
-                return df
-                
-            # 重命名列
-            column_mapping = {
-                '代码': 'code',
-                '名称': 'name',
-                '最新价': 'price',
-                '涨跌幅': 'change',
-                '成交量': 'volume'
-            }
-            
-            # 筛选并重命名列
-            df = df[df['代码'] == clean_symbol]
+                return pd.DataFrame(columns=['date', 'factor'])
+            df = df.rename(columns={'hfq_factor': 'factor'})[['date', 'factor']]
+            df['date'] = pd.to_datetime(df['date'])
+            df['factor'] = df['factor'].astype(float)
+            return df.sort_values('date').reset_index(drop=True)
+        except Exception as e:
+            if raise_on_error:
+                raise DataFetchError(f"获取股票 {symbol} 复权因子失败: {e}") from e
+            print(f"获取股票 {symbol} 复权因子失败: {e}")
+            return pd.DataFrame(columns=['date', 'factor'])
+
+    def get_stock_minute(self,
+                         symbol: str,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None,
+                         period: str = '1',
+                         raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票分钟线（东方财富），1分钟线只能获取最近5个交易日"""
+        try:
+            df = ak.stock_zh_a_hist_min_em(
+                symbol=self._clean_symbol(symbol),
+                start_date=start or '1979-09-01 09:32:00',
+                end_date=end or '2222-01-01 09:32:00',
+                period=period,
+                adjust=''
+            )
             if df.empty:
-                return df
-                
-            df = df.rename(columns=column_mapping)
-            required_columns = ['code', 'name', 'price', 'change', 'volume']
-            df = df[required_columns]
-            
-            return df
+                return pd.DataFrame(columns=MINUTE_FIELDS)
+            df = df.rename(columns={
+                '时间': 'datetime',
+                '开盘': 'open',
+                '最高': 'high',
+                '最低': 'low',
+                '收盘': 'close',
+                '成交量': 'volume',
+                '成交额': 'amount'
+            })[MINUTE_FIELDS]
+            df['datetime'] = pd.to_datetime(df['datetime'])
+            return df.sort_values('datetime').reset_index(drop=True)
+        except Exception as e:
+            if raise_on_error:
+                raise DataFetchError(f"获取股票 {symbol} 分钟线失败: {e}") from e
+            print(f"获取股票 {symbol} 分钟线失败: {e}")
+            return pd.DataFrame(columns=MINUTE_FIELDS)
+
+    def _load_market_spot(self) -> pd.DataFrame:
+        """下载全市场实时行情并统一列名，主接口失败时使用备用接口"""
+        column_mapping = {
+            '代码': 'code',
+            '名称': 'name',
+            '最新价': 'price',
+            '涨跌幅': 'change',
+            '成交量': 'volume'
+        }
+        required_columns = ['code', 'name', 'price', 'change', 'volume']
+        
+        try:
+            # 使用更稳定的API
+            df = ak.stock_zh_a_spot()
         except Exception as e:
-            print(f"获取股票 {symbol} 实时行情失败: {e}")
+            print(f"获取全市场实时行情失败: {e}")
             # 尝试使用备用API
-            try:
-                df = ak.stock_zh_a_spot_em()
-                if df.empty:
-                    return df
-                    
-                df = df[df['代码'] == clean_symbol]
-                if df.empty:
-                    return df
-                    
-                df = df.rename(columns=column_mapping)
-                df = df[required_columns]
-                return df
-            except Exception as e2:
-                print(f"获取股票 {symbol} 实时行情失败(备用API): {e2}")
-                return pd.DataFrame()
+            df = ak.stock_zh_a_spot_em()
+            
+        df = df.rename(columns=column_mapping)[required_columns]
+        # 新浪接口的代码带交易所前缀（如sh600000），统一为6位代码
+        df['code'] = df['code'].astype(str).str[-6:]
+        return df
+        
+    def get_market_snapshot(self, force_refresh: bool = False) -> pd.DataFrame:
+        """获取全市场实时行情快照（每个刷新周期只下载一次）"""
+        try:
+            return self._snapshot.get(force_refresh).reset_index(drop=True)
+        except Exception as e:
+            print(f"获取全市场实时行情失败(备用API): {e}")
+            return pd.DataFrame()
+
+    def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """获取股票实时行情"""
+        return self.get_stock_realtime_many([symbol])
+        
+    def get_stock_realtime_many(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """批量获取股票实时行情，从共享的全市场快照中按代码取值"""
+        symbols = list(symbols)
+        try:
+            return self._snapshot.lookup(self._clean_symbol(s) for s in symbols)
+        except Exception as e:
+            print(f"获取股票 {', '.join(symbols)} 实时行情失败(备用API): {e}")
+            return pd.DataFrame()
 
     def get_stock_financial(self, symbol: str) -> pd.DataFrame:
         """获取股票财务数据"""
@@ -194,5 +419,35 @@ class AkshareStockDataFetcher(StockDataFetcherBase):
                 print(f"获取股票 {symbol} 财务数据失败(备用API): {e2}")
                 return pd.DataFrame()
 
+    def get_financial_indicators(self,
+                                 symbol: str,
+                                 start_year: Optional[int] = None,
+                                 raise_on_error: bool = False) -> pd.DataFrame:
+        """获取股票自 start_year 起的全部财务指标（新浪财经），保留所有指标列"""
+        try:
+            current_year = datetime.now().year
+            if start_year is None:
+                start_year = settings.FUNDAMENTALS_START_YEAR
+            start_year = min(int(start_year), current_year)
+            # 新浪接口只接受有数据的年份作为起始年份，其他年份返回空：起始年份早于上市时
+            # 逐年向后尝试；起始年份为今年但还没有今年的报告时改为上一年
+            years = list(range(start_year, current_year + 1))
+            if start_year == current_year:
+                years.append(current_year - 1)
+            df = pd.DataFrame()
+            for year in years:
+                df = ak.stock_financial_analysis_indicator(symbol=self._clean_symbol(symbol),
+                                                           start_year=str(year))
+                if not df.empty:
+                    break
+            if df.empty:
+                return df
+            return df.rename(columns={'日期': 'report_date'})
+        except Exception as e:
+            if raise_on_error:
+                raise DataFetchError(f"获取股票 {symbol} 财务指标失败: {e}") from e
+            print(f"获取股票 {symbol} 财务指标失败: {e}")
+            return pd.DataFrame()
+
 # 默认使用Akshare实现
 StockDataFetcher = AkshareStockDataFetcher 
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+时点财务指标存储
+
+每只股票的全部财务指标按宽表保存为一个Parquet文件：
+<root>/fundamentals/code=<代码>/data.parquet，
+每行以 (code, report_date, announce_date) 标识，其余列为数值型指标。
+读取全市场时一次列式扫描，按公告日与日线做 as-of 连接，避免使用未公告的数据。
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Optional, List
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow为可选依赖，仅财务指标存储需要
+    pa = None
+
+KEY_COLUMNS = ['code', 'report_date', 'announce_date']
+
+def statutory_announce_date(report_date: pd.Series) -> pd.Series:
+    """按法定披露期限估计公告日
+
+    一季报 4月30日、半年报 8月31日、三季报 10月31日、年报次年4月30日前披露。
+    数据源没有提供实际公告日时用该期限，保证回测不会提前用到财报数据。
+    """
+    report_date = pd.to_datetime(report_date)
+    year = report_date.dt.year
+    month = report_date.dt.month
+    deadline = pd.Series(pd.NaT, index=report_date.index, dtype='datetime64[ns]')
+    for months, (offset_year, deadline_month, deadline_day) in {
+        (1, 2, 3): (0, 4, 30),
+        (4, 5, 6): (0, 8, 31),
+        (7, 8, 9): (0, 10, 31),
+        (10, 11, 12): (1, 4, 30),
+    }.items():
+        mask = month.isin(months)
+        deadline[mask] = pd.to_datetime(pd.DataFrame({
+            'year': year[mask] + offset_year,
+            'month': deadline_month,
+            'day': deadline_day
+        }))
+    return deadline
+
+class FundamentalsStore:
+    """按股票分区的宽表财务指标存储"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: 存储根目录
+        """
+        if pa is None:
+            raise ImportError("财务指标存储需要安装pyarrow: pip install pyarrow")
+        self.root = os.path.join(root, 'fundamentals')
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, code: str) -> str:
+        return os.path.join(self.root, f'code={code}', 'data.parquet')
+
+    def updated_at(self, code: str) -> Optional[datetime]:
+        """某只股票财务指标最近一次写入的时间，没有数据时为None"""
+        path = self._path(code)
+        if not os.path.exists(path):
+            return None
+        return datetime.fromtimestamp(os.path.getmtime(path))
+
+    def save(self, code: str, df: pd.DataFrame):
+        """保存财务指标，与已有数据按 (report_date, announce_date) 合并
+
+        Args:
+            code: 股票代码
+            df: 包含 report_date 和指标列的数据，announce_date 缺失时按法定披露期限估计；
+                指标列统一转为浮点数，无法解析的值为NaN
+        """
+        try:
+            df = df.drop(columns='code', errors='ignore').copy()
+            df['report_date'] = pd.to_datetime(df['report_date'])
+            if 'announce_date' not in df.columns:
+                df['announce_date'] = statutory_announce_date(df['report_date'])
+            df['announce_date'] = pd.to_datetime(df['announce_date'])
+            values = [c for c in df.columns if c not in KEY_COLUMNS]
+            df[values] = df[values].apply(pd.to_numeric, errors='coerce').astype('float64')
+
+            path = self._path(code)
+            if os.path.exists(path):
+                existing = pq.read_table(path).to_pandas()
+                df = pd.concat([existing, df], ignore_index=True)
+            df = df.drop_duplicates(subset=['report_date', 'announce_date'], keep='last')
+            df = df.sort_values(['announce_date', 'report_date'])
+
+            # 先写临时文件再替换，避免读取方看到写了一半的文件；临时文件以'.'开头，
+            # 不会被 load() 的数据集扫描读到，文件名包含进程和线程号，并发写入互不覆盖
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = os.path.join(directory, f'.data.{os.getpid()}.{threading.get_ident()}.tmp')
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path,
+                           compression='zstd')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"保存股票 {code} 财务指标失败: {e}")
+
+    def load(self,
+             codes: Optional[List[str]] = None,
+             columns: Optional[List[str]] = None,
+             as_of: Optional[str] = None) -> pd.DataFrame:
+        """一次读取多只股票的财务指标
+
+        不同股票的指标列可能不同，缺少的列为NaN。
+
+        Args:
+            codes: 股票代码列表，None表示全部股票
+            columns: 需要的指标列，默认全部
+            as_of: 只返回该日期及之前已公告的数据
+
+        Returns:
+            包含 code、report_date、announce_date 和指标列的长表，按 code、announce_date 排序
+        """
+        try:
+            partitioning = ds.partitioning(pa.schema([('code', pa.string())]), flavor='hive')
+            # 各股票文件的指标列不同，合并所有文件的schema
+            dataset = ds.dataset(self.root, format='parquet', partitioning=partitioning)
+            dataset = ds.dataset(self.root, format='parquet', partitioning=partitioning,
+                                 schema=pa.unify_schemas([
+                                     fragment.physical_schema
+                                     for fragment in dataset.get_fragments()
+                                 ] + [dataset.schema]))
+            expr = None
+            if codes is not None:
+                expr = ds.field('code').isin(list(codes))
+            if as_of is not None:
+                cond = ds.field('announce_date') <= pd.Timestamp(as_of)
+                expr = cond if expr is None else expr & cond
+            if columns is not None:
+                columns = KEY_COLUMNS + [c for c in columns if c not in KEY_COLUMNS]
+            table = dataset.to_table(columns=columns, filter=expr)
+            df = table.to_pandas()
+            df = df[KEY_COLUMNS + [c for c in df.columns if c not in KEY_COLUMNS]]
+            return df.sort_values(['code', 'announce_date', 'report_date'], ignore_index=True)
+        except Exception as e:
+            print(f"读取财务指标失败: {e}")
+            return pd.DataFrame()
+
+    def asof_join(self, bars: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """把每个交易日已公告的最新一期财务指标连接到日线上
+
+        对全部股票做一次按 code 分组的 merge_asof：每根K线取公告日不晚于当天、
+        报告期最新的一行。公告时已有更新报告期的旧报告更正不会覆盖新数据。
+
+        Args:
+            bars: 包含 code、date 列的日线长表
+            columns: 需要的指标列，默认全部
+
+        Returns:
+            与 bars 行顺序相同、增加了 report_date 和指标列的数据
+        """
+        codes = bars['code'].unique().tolist()
+        fundamentals = self.load(codes, columns)
+        if fundamentals.empty:
+            return bars.copy()
+        # 按公告顺序，跳过报告期早于已公告最新报告期的行
+        latest = fundamentals.groupby('code')['report_date'].cummax()
+        fundamentals = fundamentals[fundamentals['report_date'] >= latest]
+        fundamentals = fundamentals.sort_values('announce_date', kind='stable')
+
+        # merge_asof 要求按日期整体排序，连接后按原顺序还原
+        order = np.argsort(bars['date'].to_numpy(), kind='stable')
+        joined = pd.merge_asof(bars.iloc[order].reset_index(drop=True), fundamentals,
+                               left_on='date', right_on='announce_date',
+                               by='code', direction='backward')
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        joined = joined.iloc[inverse].drop(columns='announce_date')
+        joined.index = bars.index
+        return joined
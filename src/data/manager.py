@@ -1,21 +1,75 @@
-from typing import Optional
-from .fetcher import StockDataFetcher
+from typing import Optional, List, Callable, Hashable, Dict, Sequence
+from .fetcher import StockDataFetcher, StockDataFetcherBase, DataFetchError
 from .db_manager import DatabaseManager
+from .bar_store import BarStoreBase, ParquetBarStore, to_wide_panel
+from .adjust import apply_adj_factor, ADJUST_TYPES, PRICE_COLUMNS
+from .fundamentals import FundamentalsStore
+from .minute_store import MinuteBarStore
+from .quote_buffer import QuoteRingBuffer
+from .resample import PERIODS, PERIOD_SUFFIXES, period_start, resample_bars, align_period_bars
+from .bar_cache import MmapBarCache
+from .cache import LRUCache
 from .models import init_db
+from ..config import settings
+from ..utils.date_ranges import missing_ranges, ONE_DAY
+from ..utils.dtypes import compact_bars
 import pandas as pd
 from datetime import datetime, timedelta
 
+def create_bar_store(backend: str, db: DatabaseManager) -> BarStoreBase:
+    """根据配置创建日线存储后端
+    
+    Args:
+        backend: 存储后端名称，sqlite 或 parquet
+        db: 数据库管理器，sqlite后端直接复用
+    """
+    if backend == 'sqlite':
+        return db
+    if backend == 'parquet':
+        return ParquetBarStore(settings.PARQUET_DIR)
+    raise ValueError(f"不支持的日线存储后端: {backend}")
+
 class StockDataManager:
-    def __init__(self):
-        """初始化数据管理器"""
+    def __init__(self,
+                 bar_backend: Optional[str] = None,
+                 bar_cache_dir: Optional[str] = None,
+                 fetcher: Optional[StockDataFetcherBase] = None,
+                 db: Optional[DatabaseManager] = None,
+                 fundamentals_dir: Optional[str] = None,
+                 minute_dir: Optional[str] = None):
+        """初始化数据管理器
+        
+        Args:
+            bar_backend: 日线存储后端，默认读取配置 BLACKX_BAR_BACKEND（sqlite）
+            bar_cache_dir: 内存映射日线缓存目录，默认读取配置 BLACKX_BAR_CACHE_DIR
+            fetcher: 数据获取器，默认使用Akshare实现
+            db: 数据库管理器，默认使用 data/stock_data.db
+            fundamentals_dir: 财务指标存储目录，默认读取配置 BLACKX_PARQUET_DIR
+            minute_dir: 分钟线存储目录，默认读取配置 BLACKX_PARQUET_DIR
+        """
+        self.fetcher = fetcher or StockDataFetcher()
+        self.db = db or DatabaseManager()
+        
         # 初始化数据库
-        init_db()
+        init_db(self.db.engine)
         
-        self.fetcher = StockDataFetcher()
-        self.db = DatabaseManager()
+        self.bar_store = create_bar_store(bar_backend or settings.BAR_BACKEND, self.db)
+        self.bar_cache = MmapBarCache(bar_cache_dir or settings.BAR_CACHE_DIR)
+        self.fundamentals_dir = fundamentals_dir
+        self._fundamentals: Optional[FundamentalsStore] = None
+        self.minute_dir = minute_dir
+        self._minute_store: Optional[MinuteBarStore] = None
+        # 日内行情快照，定期批量写入 stock_realtime_history 表
+        self.quote_buffer = QuoteRingBuffer(settings.QUOTE_BUFFER_CAPACITY)
+        self.quote_flush_interval = timedelta(seconds=settings.QUOTE_FLUSH_INTERVAL)
+        self._quote_flushed_at = datetime.now()
+        # 进程内LRU缓存，位于SQLite之前
+        self.memory_cache = LRUCache(max_entries=settings.CACHE_MAX_ENTRIES,
+                                     max_bytes=settings.CACHE_MAX_BYTES)
         self.cache_time = {
             'stock_list': timedelta(days=1),  # 股票列表缓存1天
             'daily': timedelta(days=1),       # 日线数据缓存1天
+            'adj_factor': timedelta(days=1),  # 复权因子缓存1天
             'realtime': timedelta(minutes=5), # 实时行情缓存5分钟
             'financial': timedelta(days=7)    # 财务数据缓存7天
         }
@@ -26,72 +80,516 @@ class StockDataManager:
             return False
         return datetime.now() - update_time < self.cache_time[cache_type]
 
-    def get_stock_list(self) -> pd.DataFrame:
-        """获取股票列表"""
-        # 先从数据库获取
-        df = self.db.get_stock_list()
-        if not df.empty:
-            return df
+    def _read_through(self,
+                      cache_type: str,
+                      key: Hashable,
+                      code: Optional[str],
+                      load_local: Callable[[], pd.DataFrame],
+                      fetch_remote: Callable[[], pd.DataFrame],
+                      save_local: Callable[[pd.DataFrame], None]) -> pd.DataFrame:
+        """两级读穿缓存：内存LRU -> SQLite -> API
+        
+        SQLite中的数据按 update_time 和 cache_time 判断是否过期，过期或缺失时从API
+        获取并写回数据库；API获取失败时退回数据库中的旧数据（旧数据不进入内存缓存）。
+        
+        Args:
+            cache_type: 缓存类型，对应 cache_time 的键
+            key: 内存缓存键
+            code: 查询update_time所用的股票代码，None表示整张表
+            load_local: 从数据库读取
+            fetch_remote: 从API获取
+            save_local: 写入数据库
+        """
+        df = self.memory_cache.get(key)
+        if df is not None:
+            return df.copy()
             
-        # 如果数据库没有，从API获取
-        df = self.fetcher.get_stock_list()
-        if not df.empty:
-            # 保存到数据库
-            self.db.save_stock_list(df)
+        df = load_local()
+        update_time = self.db.get_update_time(cache_type, code) if not df.empty else None
+        if not self._is_cache_valid(update_time, cache_type):
+            fetched = fetch_remote()
+            if not fetched.empty:
+                save_local(fetched)
+                df, update_time = fetched, datetime.now()
+                
+        if not df.empty and self._is_cache_valid(update_time, cache_type):
+            self.memory_cache.put(key, df, expires_at=update_time + self.cache_time[cache_type])
+            return df.copy()
         return df
 
+    def cache_stats(self) -> Dict[str, int]:
+        """内存缓存的命中、未命中、淘汰统计"""
+        return self.memory_cache.stats()
+
+    def get_stock_list(self) -> pd.DataFrame:
+        """获取股票列表"""
+        return self._read_through('stock_list', ('stock_list',), None,
+                                  self.db.get_stock_list,
+                                  self.fetcher.get_stock_list,
+                                  self.db.save_stock_list)
+
     def get_stock_daily(self, 
                        symbol: str, 
                        start_date: Optional[str] = None,
-                       end_date: Optional[str] = None) -> pd.DataFrame:
+                       end_date: Optional[str] = None,
+                       adjust: str = 'qfq') -> pd.DataFrame:
         """获取股票日线数据
         
         Args:
             symbol: 股票代码
             start_date: 开始日期
             end_date: 结束日期
+            adjust: 复权方式，'qfq' 前复权（默认），'hfq' 后复权，'' 不复权
         """
+        if adjust not in ADJUST_TYPES:
+            raise ValueError(f"不支持的复权方式: {adjust}")
         if end_date is None:
             end_date = datetime.now().strftime('%Y-%m-%d')
         if start_date is None:
             start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
             
-        # 先从数据库获取
-        df = self.db.get_stock_daily(symbol, start_date, end_date)
+        key = ('daily', symbol, start_date, end_date, adjust)
+        df = self.memory_cache.get(key)
+        if df is not None:
+            return df.copy()
+            
+        # 只从API拉取本地尚未覆盖的日期区间，再统一从本地存储读取
+        self._sync_stock_daily(symbol, start_date, end_date)
+        df = self.bar_store.get_stock_daily(symbol, start_date, end_date)
+        if adjust and not df.empty:
+            self.sync_adj_factor(symbol)
+            df = self._adjust(df.assign(code=symbol), adjust).drop(columns='code')
+        
         if not df.empty:
+            # 历史日线同步后不再变化，包含当天的区间仍可能更新，按实时行情的有效期缓存
+            today = datetime.now().strftime('%Y-%m-%d')
+            ttl = self.cache_time['realtime' if end_date >= today else 'daily']
+            self.memory_cache.put(key, df, expires_at=datetime.now() + ttl)
+            return df.copy()
+        return df
+
+    def _sync_stock_daily(self, symbol: str, start_date: str, end_date: str):
+        """补齐 [start_date, end_date] 内本地缺失的日线数据
+        
+        按已同步区间计算缺失部分（头部、尾部或中间空洞），逐段从API获取并写入
+        本地存储。请求失败的区间不会记为已同步，下次调用时重试；当天及以后的
+        数据可能尚未收盘，也不计入已同步区间。
+        """
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        last_final = datetime.combine(datetime.now().date(), datetime.min.time()) - ONE_DAY
+        
+        covered = self.db.get_daily_coverage(symbol, self.bar_store.coverage_key)
+        updated_since = None
+        for gap_start, gap_end in missing_ranges(start, end, covered):
+            try:
+                df = self.fetcher.get_stock_daily(symbol,
+                                                  gap_start.strftime('%Y-%m-%d'),
+                                                  gap_end.strftime('%Y-%m-%d'),
+                                                  raise_on_error=True)
+            except DataFetchError as e:
+                print(e)
+                continue
+            if not df.empty:
+                # 保存到本地存储
+                self.bar_store.save_stock_daily(symbol, df)
+                since = df['date'].min()
+                updated_since = since if updated_since is None else min(updated_since, since)
+            if gap_start <= last_final:
+                self.db.add_daily_coverage(symbol, gap_start, min(gap_end, last_final),
+                                           self.bar_store.coverage_key)
+                
+        if updated_since is not None:
+            self.mark_daily_updated(symbol, updated_since)
+            
+    def mark_daily_updated(self, symbol: str, since: datetime):
+        """本地日线从 since 起有新写入时调用，使派生数据失效
+        
+        内存中该股票的日线、周期K线缓存和内存映射缓存在下次读取时重建；
+        包含 since 及之后的周期K线被删除，下次读取时增量重新合成。
+        """
+        self._invalidate_memory_cache(symbol)
+        self.bar_cache.invalidate(symbol)
+        self.db.delete_period_bars(symbol, since)
+
+    def _invalidate_memory_cache(self, symbol: str):
+        """删除内存缓存中某只股票的日线和周期K线"""
+        self.memory_cache.invalidate_where(
+            lambda key: len(key) > 1 and key[0] in ('daily', 'period') and key[1] == symbol)
+
+    def sync_adj_factor(self, symbol: str, force: bool = False) -> bool:
+        """复权因子过期时重新获取，因子有变化时使内存缓存和内存映射缓存失效
+        
+        Args:
+            symbol: 股票代码
+            force: 为True时不检查缓存时间，总是重新获取
+            
+        Returns:
+            获取失败时为False，继续使用本地已有的因子
+        """
+        if not force and self._is_cache_valid(self.db.get_update_time('adj_factor', symbol), 'adj_factor'):
+            return True
+        try:
+            factors = self.fetcher.get_adj_factor(symbol, raise_on_error=True)
+        except DataFetchError as e:
+            print(e)
+            return False
+        if not factors.empty and self.db.save_adj_factor(symbol, factors):
+            # 后复权的周期K线需要按新因子全部重新合成
+            self._invalidate_memory_cache(symbol)
+            self.bar_cache.invalidate(symbol)
+            self.db.delete_period_bars(symbol)
+        return True
+            
+    def _adjust(self, df: pd.DataFrame, adjust: str) -> pd.DataFrame:
+        """用本地复权因子计算包含 code 列的日线数据的复权价格"""
+        if not adjust:
             return df
+        codes = df['code'].unique().tolist()
+        return apply_adj_factor(df, self.db.get_adj_factor(codes), adjust)
+
+    def update_period_bars(self, symbol: str, period: str):
+        """用本地日线增量合成周线或月线
+        
+        最后一个已合成的周期可能还未结束，从它的第一天开始重新合成，替换该周期已保存的K线
+        （补齐后最后交易日变化，日期也随之变化），更早的周期不再变化。
+        """
+        last = self.db.get_last_period_bar_date(symbol, period)
+        since = period_start(last, period) if last else None
+        start = since.strftime('%Y-%m-%d') if since is not None else '1990-01-01'
+        df = self.bar_store.get_stock_daily(symbol, start, datetime.now().strftime('%Y-%m-%d'))
+        if df.empty:
+            return
+        df = self._adjust(df.assign(code=symbol), 'hfq').drop(columns='code')
+        self.db.save_period_bars(symbol, period, resample_bars(df, period), since)
+        
+    def get_stock_period_bars(self,
+                              symbol: str,
+                              period: str,
+                              start_date: Optional[str] = None,
+                              end_date: Optional[str] = None,
+                              adjust: str = 'qfq') -> pd.DataFrame:
+        """获取周线或月线
+        
+        先补齐区间内的日线和复权因子，再增量更新已合成的周期K线后读取。
+        最后一根K线所在周期可能尚未结束，是截至 end_date 的部分周期。
+        
+        Args:
+            symbol: 股票代码
+            period: 'W' 周线或 'M' 月线
+            start_date: 开始日期
+            end_date: 结束日期
+            adjust: 'qfq' 前复权（默认）或 'hfq' 后复权
+        """
+        if period not in PERIODS:
+            raise ValueError(f"不支持的周期: {period}")
+        if adjust not in ('qfq', 'hfq'):
+            raise ValueError(f"周期K线只支持前复权或后复权: {adjust}")
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if start_date is None:
+            start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
             
-        # 如果数据库没有，从API获取
-        df = self.fetcher.get_stock_daily(symbol, start_date, end_date)
+        key = ('period', symbol, period, start_date, end_date, adjust)
+        df = self.memory_cache.get(key)
+        if df is not None:
+            return df.copy()
+            
+        # 从第一个周期的第一天开始补齐日线，保证第一根K线完整
+        first_day = period_start(datetime.strptime(start_date, '%Y-%m-%d'), period)
+        self._sync_stock_daily(symbol, first_day.strftime('%Y-%m-%d'), end_date)
+        self.sync_adj_factor(symbol)
+        self.update_period_bars(symbol, period)
+        df = self.db.get_period_bars(symbol, period, start_date, end_date)
+        
         if not df.empty:
-            # 保存到数据库
-            self.db.save_stock_daily(symbol, df)
+            if adjust == 'qfq':
+                factors = self.db.get_adj_factor([symbol])
+                if not factors.empty:
+                    df[PRICE_COLUMNS] = df[PRICE_COLUMNS] / factors['factor'].iloc[-1]
+            today = datetime.now().strftime('%Y-%m-%d')
+            ttl = self.cache_time['realtime' if end_date >= today else 'daily']
+            self.memory_cache.put(key, df, expires_at=datetime.now() + ttl)
+            return df.copy()
         return df
+        
+    def get_multi_timeframe_bars(self,
+                                 symbol: str,
+                                 start_date: Optional[str] = None,
+                                 end_date: Optional[str] = None,
+                                 periods: Sequence[str] = ('W', 'M'),
+                                 adjust: str = 'qfq') -> pd.DataFrame:
+        """获取以日期为索引的日线，并附加按时间对齐的周线、月线列
+        
+        周线列名为 open_w、close_w 等，月线为 open_m、close_m 等。每个交易日
+        只能看到截至当天已结束的周期，可直接传给 StrategyEngine.backtest。
+        
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期
+            end_date: 结束日期
+            periods: 需要附加的周期
+            adjust: 'qfq' 前复权（默认）或 'hfq' 后复权
+        """
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        if start_date is None:
+            start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+        data = self.get_stock_daily(symbol, start_date, end_date, adjust)
+        if data.empty:
+            return data
+        data = data.set_index('date')
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        for period in periods:
+            # 区间开始时还未结束的周期之前，需要上一个完整周期的数据
+            previous = period_start(period_start(start, period) - ONE_DAY, period)
+            bars = self.get_stock_period_bars(symbol, period, previous.strftime('%Y-%m-%d'),
+                                              end_date, adjust)
+            if not bars.empty:
+                data = align_period_bars(data, bars, PERIOD_SUFFIXES[period])
+        return data
+
+    def load_daily_bars(self,
+                        symbol: str,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None) -> pd.DataFrame:
+        """从内存映射缓存读取前复权日线数据（以date为索引，只读，零拷贝）
+        
+        每次读取前先补齐本地存储中 [start_date, end_date] 缺失的日线并检查复权因子，
+        有新数据写入或因子变化时缓存被删除；缓存不存在时用该股票的全部本地历史重建。
+        返回的DataFrame可直接传给 StrategyEngine.backtest。
+        
+        Args:
+            symbol: 股票代码
+            start_date: 开始日期，默认不限（同步时与 get_stock_daily 一样取最近一年）
+            end_date: 结束日期，默认不限（同步时取今天）
+        """
+        sync_end = end_date or datetime.now().strftime('%Y-%m-%d')
+        sync_start = start_date or (datetime.strptime(sync_end, '%Y-%m-%d')
+                                    - timedelta(days=365)).strftime('%Y-%m-%d')
+        self._sync_stock_daily(symbol, sync_start, sync_end)
+        self.sync_adj_factor(symbol)
+        if not self.bar_cache.exists(symbol):
+            self.refresh_bar_cache(symbol)
+        return self.bar_cache.load(symbol, start_date, end_date)
+
+    def refresh_bar_cache(self, symbol: str):
+        """用本地存储中的全部历史数据重建某只股票的内存映射缓存（前复权）"""
+        df = self.bar_store.get_stock_daily(symbol, '1990-01-01', datetime.now().strftime('%Y-%m-%d'))
+        if not df.empty:
+            df = self._adjust(df.assign(code=symbol), 'qfq').drop(columns='code')
+            self.bar_cache.refresh(symbol, df)
+
+    def get_stock_daily_panel(self,
+                              symbols: Optional[List[str]],
+                              start_date: str,
+                              end_date: str,
+                              columns: Optional[List[str]] = None,
+                              layout: str = 'long',
+                              adjust: str = 'qfq',
+                              compact: bool = False) -> pd.DataFrame:
+        """从本地存储批量读取多只股票日线数据（不触发网络请求）
+        
+        复权使用本地已有的因子，不检查因子是否过期。
+        
+        Args:
+            symbols: 股票代码列表，None时读取全部股票
+            start_date: 开始日期
+            end_date: 结束日期
+            columns: 需要的价格列，默认全部
+            layout: 'long' 返回长表，'wide' 返回 (date × 股票代码) 面板
+            adjust: 复权方式，'qfq' 前复权（默认），'hfq' 后复权，'' 不复权
+            compact: 返回紧凑类型（见 utils.dtypes），复权在float64下计算后再转换
+        """
+        if adjust not in ADJUST_TYPES:
+            raise ValueError(f"不支持的复权方式: {adjust}")
+        if layout not in ('long', 'wide'):
+            raise ValueError(f"不支持的面板格式: {layout}")
+        df = self.bar_store.get_stock_daily_panel(symbols, start_date, end_date, columns)
+        if df.empty:
+            return df
+        df = self._adjust(df, adjust)
+        if layout == 'wide':
+            return to_wide_panel(df, [c for c in df.columns if c not in ('code', 'date')],
+                                 'float32' if compact else 'float64')
+        return compact_bars(df) if compact else df
 
     def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
         """获取股票实时行情"""
-        # 先从数据库获取
-        df = self.db.get_stock_realtime(symbol)
+        # 数据库中保存的是去掉后缀的代码
+        code = symbol.split('.')[0]
+        return self._read_through('realtime', ('realtime', code), code,
+                                  lambda: self.db.get_stock_realtime(code),
+                                  lambda: self.fetcher.get_stock_realtime(symbol),
+                                  self._save_realtime)
+
+    def get_stock_realtime_many(self, symbols: List[str]) -> pd.DataFrame:
+        """批量获取股票实时行情（共享一次全市场下载），结果批量写入数据库"""
+        df = self.fetcher.get_stock_realtime_many(symbols)
         if not df.empty:
-            return df
-            
-        # 如果数据库没有，从API获取
-        df = self.fetcher.get_stock_realtime(symbol)
+            self._save_realtime(df)
+        return df
+
+    def refresh_realtime_snapshot(self, force_refresh: bool = False) -> pd.DataFrame:
+        """下载（或复用）全市场行情快照，并一次性批量写入 stock_realtime 表"""
+        try:
+            df = self.fetcher.get_market_snapshot(force_refresh)
+        except Exception as e:
+            print(f"获取全市场行情快照失败: {e}")
+            return pd.DataFrame()
         if not df.empty:
-            # 保存到数据库
-            self.db.save_stock_realtime(df)
+            self._save_realtime(df)
         return df
 
-    def get_stock_financial(self, symbol: str) -> pd.DataFrame:
-        """获取股票财务数据"""
-        # 先从数据库获取
-        df = self.db.get_stock_financial(symbol)
+    def _save_realtime(self, df: pd.DataFrame):
+        """保存最新行情，同时写入环形缓冲区，距上次落盘超过 quote_flush_interval 时
+        批量写入历史表"""
+        self.db.save_stock_realtime(df)
+        self.quote_buffer.append(df)
+        if datetime.now() - self._quote_flushed_at >= self.quote_flush_interval:
+            self.flush_quote_history()
+
+    def flush_quote_history(self) -> int:
+        """把缓冲区中尚未落盘的行情快照一次性写入 stock_realtime_history 表
+        
+        Returns:
+            写入的行数
+        """
+        self._quote_flushed_at = datetime.now()
+        df = self.quote_buffer.drain()
         if not df.empty:
-            return df
+            self.db.save_realtime_history(df)
+        return len(df)
+
+    def get_recent_quotes(self, symbols: List[str], k: int = 1) -> pd.DataFrame:
+        """内存中各股票最近 k 个行情快照（不访问数据库）
+        
+        Returns:
+            包含 code、time、price、change、volume 列的长表，时间升序
+        """
+        return self.quote_buffer.last([symbol.split('.')[0] for symbol in symbols], k)
+
+    @property
+    def fundamentals(self) -> FundamentalsStore:
+        """财务指标存储，首次使用时创建（需要pyarrow）"""
+        if self._fundamentals is None:
+            self._fundamentals = FundamentalsStore(self.fundamentals_dir or settings.PARQUET_DIR)
+        return self._fundamentals
+        
+    def sync_fundamentals(self, symbols: List[str], start_year: Optional[int] = None) -> Dict[str, str]:
+        """重新获取本地已过期（超过 financial 缓存时间）的财务指标
+        
+        Args:
+            symbols: 股票代码列表
+            start_year: 财务指标的起始年份，默认读取配置 BLACKX_FUNDAMENTALS_START_YEAR
+        
+        Returns:
+            获取失败的股票及原因
+        """
+        failed = {}
+        for symbol in symbols:
+            if self._is_cache_valid(self.fundamentals.updated_at(symbol), 'financial'):
+                continue
+            try:
+                df = self.fetcher.get_financial_indicators(symbol, start_year, raise_on_error=True)
+            except DataFetchError as e:
+                print(e)
+                failed[symbol] = str(e)
+                continue
+            if not df.empty:
+                self.fundamentals.save(symbol, df)
+        return failed
+        
+    def get_fundamentals(self,
+                         symbols: Optional[List[str]] = None,
+                         columns: Optional[List[str]] = None,
+                         as_of: Optional[str] = None) -> pd.DataFrame:
+        """批量读取财务指标宽表
+        
+        指定股票时先补齐过期的数据；symbols为None时只读取本地已有的全部股票。
+        
+        Args:
+            symbols: 股票代码列表
+            columns: 需要的指标列，默认全部
+            as_of: 只返回该日期及之前已公告的数据
+        """
+        if symbols is not None:
+            self.sync_fundamentals(symbols)
+        return self.fundamentals.load(symbols, columns, as_of)
+        
+    def join_fundamentals(self, bars: pd.DataFrame, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """把每个交易日已公告的最新财务指标连接到日线长表上（只读本地数据）
+        
+        Args:
+            bars: 包含 code、date 列的日线，如 get_stock_daily_panel 的结果
+            columns: 需要的指标列，默认全部
+        """
+        return self.fundamentals.asof_join(bars, columns)
+
+    @property
+    def minute_store(self) -> MinuteBarStore:
+        """分钟线存储，首次使用时创建（需要pyarrow）"""
+        if self._minute_store is None:
+            self._minute_store = MinuteBarStore(self.minute_dir or settings.PARQUET_DIR)
+        return self._minute_store
+
+    def ingest_stock_minute(self,
+                            symbols: List[str],
+                            start: Optional[str] = None,
+                            end: Optional[str] = None,
+                            compact: bool = True) -> Dict[str, str]:
+        """获取多只股票的1分钟线，合并为一批写入分钟线存储
+        
+        数据源的1分钟线只保留最近几个交易日，需要每天收盘后运行以积累历史。
+        
+        Args:
+            symbols: 股票代码列表
+            start: 开始时间，默认由数据源决定
+            end: 结束时间，默认由数据源决定
+            compact: 写入后合并涉及的交易日的分片，重复拉取的数据只保留最新一份
             
-        # 如果数据库没有，从API获取
-        df = self.fetcher.get_stock_financial(symbol)
-        if not df.empty:
-            # 保存到数据库
-            self.db.save_stock_financial(df)
-        return df 
\ No newline at end of file
+        Returns:
+            获取失败的股票及原因
+        """
+        failed = {}
+        frames = []
+        for symbol in symbols:
+            if self.fetcher.rate_limiter is not None:
+                self.fetcher.rate_limiter.acquire()
+            try:
+                df = self.fetcher.get_stock_minute(symbol, start, end, raise_on_error=True)
+            except DataFetchError as e:
+                print(e)
+                failed[symbol] = str(e)
+                continue
+            if not df.empty:
+                frames.append(df.assign(code=symbol))
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+            self.minute_store.append(df)
+            if compact:
+                for day in pd.to_datetime(df['datetime']).dt.strftime('%Y-%m-%d').unique():
+                    self.minute_store.compact(day)
+        return failed
+
+    def get_stock_minute(self,
+                         symbols: Optional[List[str]],
+                         start: str,
+                         end: str,
+                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """读取本地的1分钟线（不复权），只扫描区间内的交易日分区
+        
+        Args:
+            symbols: 股票代码列表，None表示全部股票
+            start: 开始时间
+            end: 结束时间，只给日期时包含当天全天
+            columns: 需要的价格列，默认全部
+        """
+        return self.minute_store.read(symbols, start, end, columns)
+
+    def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """获取股票财务数据"""
+        return self._read_through('financial', ('financial', symbol), symbol,
+                                  lambda: self.db.get_stock_financial(symbol),
+                                  lambda: self.fetcher.get_stock_financial(symbol),
+                                  self.db.save_stock_financial) 
\ No newline at end of file
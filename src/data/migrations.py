@@ -0,0 +1,93 @@
+"""
+数据库结构升级
+
+旧版本创建的 stock_data.db 缺少联合唯一索引，重复同步会累积重复行。
+这里按 SQLite 的 ``PRAGMA user_version`` 记录结构版本，逐步执行升级脚本。
+升级在 create_all 之后执行，新增的表已经存在；每个步骤都必须是幂等的
+（新建库上执行也不会出错）。
+"""
+from sqlalchemy import inspect, text
+
+
+def _table_exists(conn, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def _dedup_and_index(conn, table: str, index: str, columns: list):
+    """删除重复行（保留id最大即最新写入的一行）并建立联合唯一索引"""
+    if not _table_exists(conn, table):
+        return
+    cols = ', '.join(columns)
+    conn.execute(text(
+        f"DELETE FROM {table} WHERE id NOT IN "
+        f"(SELECT MAX(id) FROM {table} GROUP BY {cols})"
+    ))
+    conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS {index} ON {table} ({cols})"))
+
+
+def _v1_unique_keys(conn):
+    """v1: stock_daily(code, date) 与 stock_financial(code, report_date) 唯一"""
+    _dedup_and_index(conn, 'stock_daily', 'ux_stock_daily_code_date', ['code', 'date'])
+    _dedup_and_index(conn, 'stock_financial', 'ux_stock_financial_code_report_date',
+                     ['code', 'report_date'])
+
+
+def _v2_seed_daily_coverage(conn):
+    """v2: 按已有日线数据的起止日期初始化同步区间，避免升级后整段重新拉取"""
+    conn.execute(text(
+        "INSERT INTO stock_daily_coverage (code, start_date, end_date, update_time) "
+        "SELECT code, MIN(date), MAX(date), MAX(update_time) FROM stock_daily "
+        "WHERE code NOT IN (SELECT code FROM stock_daily_coverage) GROUP BY code"
+    ))
+
+
+def _v3_refetch_raw_daily(conn):
+    """v3: 日线改为保存不复权数据，删除旧日线并清空同步区间
+
+    旧版本保存的是前复权数据，无法还原为不复权数据，读取时再按因子复权会重复复权。
+    删除旧日线和由其合成的周期K线，清空同步区间后，读取时重新获取不复权数据。
+    """
+    for table in ('stock_daily', 'stock_period_bar', 'stock_daily_coverage'):
+        if _table_exists(conn, table):
+            conn.execute(text(f"DELETE FROM {table}"))
+
+
+def _v4_coverage_per_store(conn):
+    """v4: 同步区间按日线存储后端分别记录，已有区间属于SQLite存储"""
+    columns = [c['name'] for c in inspect(conn).get_columns('stock_daily_coverage')]
+    if 'store' not in columns:
+        conn.execute(text(
+            "ALTER TABLE stock_daily_coverage "
+            "ADD COLUMN store VARCHAR(255) NOT NULL DEFAULT 'sqlite'"
+        ))
+
+
+# (版本号, 升级函数)，按顺序执行
+MIGRATIONS = [
+    (1, _v1_unique_keys),
+    (2, _v2_seed_daily_coverage),
+    (3, _v3_refetch_raw_daily),
+    (4, _v4_coverage_per_store),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn) -> int:
+    """读取数据库当前结构版本"""
+    return conn.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def upgrade_db(engine):
+    """将数据库升级到最新结构版本
+
+    Args:
+        engine: 数据库引擎
+    """
+    with engine.begin() as conn:
+        version = get_schema_version(conn)
+        for target, step in MIGRATIONS:
+            if version < target:
+                step(conn)
+        if version < SCHEMA_VERSION:
+            conn.execute(text(f"PRAGMA user_version = {SCHEMA_VERSION}"))
@@ -0,0 +1,149 @@
+"""
+分钟线存储
+
+分钟线数据量约为日线的240倍，按交易日分区保存为Parquet文件：
+<root>/minute/date=<YYYY-MM-DD>/part-<序号>.parquet。
+
+- 追加：每批数据按交易日拆分后各写一个新的分片文件，不读写已有文件
+- 删除：删除某个交易日的目录
+- 读取：只打开日期区间内的分区目录，按代码和时间过滤，只读取需要的列
+- 压缩：同一交易日的多个分片可合并为一个按 (code, datetime) 排序的文件，
+  合并时按写入顺序去重，后写入的数据优先
+
+文件使用 zstd 压缩，股票代码列使用字典编码。
+"""
+import os
+import shutil
+import time
+from typing import Optional, List
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow为可选依赖，仅分钟线存储需要
+    pa = None
+
+MINUTE_COLUMNS = ['code', 'datetime', 'open', 'high', 'low', 'close', 'volume', 'amount']
+
+class MinuteBarStore:
+    """按交易日分区的分钟线存储"""
+
+    def __init__(self, root: str, row_group_size: int = 48000):
+        """
+        Args:
+            root: 存储根目录
+            row_group_size: 每个行组的行数，默认约200只股票一天的1分钟线
+        """
+        if pa is None:
+            raise ImportError("分钟线存储需要安装pyarrow: pip install pyarrow")
+        self.root = os.path.join(root, 'minute')
+        self.row_group_size = row_group_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def _day_dir(self, day: str) -> str:
+        return os.path.join(self.root, f'date={day}')
+
+    def _parts(self, day: str) -> List[str]:
+        """某个交易日的分片文件，按写入顺序排列"""
+        directory = self._day_dir(day)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                      if name.startswith('part-') and name.endswith('.parquet'))
+
+    def days(self) -> List[str]:
+        """已保存的交易日，升序"""
+        return sorted(name[len('date='):] for name in os.listdir(self.root)
+                      if name.startswith('date='))
+
+    def _write(self, df: pd.DataFrame, path: str):
+        """写入临时文件后替换，读取方看不到写了一半的分片"""
+        df = df.sort_values(['code', 'datetime'])
+        table = pa.Table.from_pandas(df.astype({'code': 'category'}), preserve_index=False)
+        tmp_path = path + '.tmp'
+        pq.write_table(table, tmp_path, row_group_size=self.row_group_size, compression='zstd')
+        os.replace(tmp_path, path)
+
+    def append(self, df: pd.DataFrame):
+        """追加分钟线，按交易日拆分写入新分片
+
+        Args:
+            df: 包含 MINUTE_COLUMNS 列的多只股票分钟线，amount 列可缺失
+        """
+        try:
+            df = df.reindex(columns=MINUTE_COLUMNS)
+            df['code'] = df['code'].astype(str)
+            df['datetime'] = pd.to_datetime(df['datetime'])
+            df[MINUTE_COLUMNS[2:]] = df[MINUTE_COLUMNS[2:]].astype('float64')
+            for day, part in df.groupby(df['datetime'].dt.strftime('%Y-%m-%d'), sort=True):
+                directory = self._day_dir(day)
+                os.makedirs(directory, exist_ok=True)
+                # 纳秒时间戳作为序号，文件名顺序即写入顺序
+                self._write(part, os.path.join(directory, f'part-{time.time_ns():020d}.parquet'))
+        except Exception as e:
+            print(f"保存分钟线失败: {e}")
+
+    def drop_day(self, day: str):
+        """删除某个交易日的全部分钟线"""
+        shutil.rmtree(self._day_dir(day), ignore_errors=True)
+
+    def compact(self, day: str):
+        """把某个交易日的多个分片合并为一个文件，重复的 (code, datetime) 保留最后写入的一行"""
+        parts = self._parts(day)
+        if len(parts) <= 1:
+            return
+        try:
+            df = ds.dataset(parts, format='parquet').to_table().to_pandas()
+            df['code'] = df['code'].astype(str)
+            df = df.drop_duplicates(subset=['code', 'datetime'], keep='last')
+            # 合并后的文件名沿用最后一个分片的序号，之后追加的分片仍排在它后面
+            self._write(df, parts[-1])
+            for path in parts[:-1]:
+                os.remove(path)
+        except Exception as e:
+            print(f"合并 {day} 分钟线失败: {e}")
+
+    def read(self,
+             codes: Optional[List[str]],
+             start: str,
+             end: str,
+             columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """读取时间区间内的分钟线
+
+        Args:
+            codes: 股票代码列表，None表示全部股票
+            start: 开始时间，如 '2024-01-02' 或 '2024-01-02 10:00'
+            end: 结束时间，只给日期时包含当天全天
+            columns: 需要的价格列，默认全部
+
+        Returns:
+            包含 code、datetime 和价格列的长表，按 code、datetime 排序
+        """
+        try:
+            start_ts = pd.Timestamp(start)
+            end_ts = pd.Timestamp(end)
+            if end_ts == end_ts.normalize() and len(str(end)) <= 10:
+                end_ts = end_ts + pd.Timedelta(days=1) - pd.Timedelta(nanoseconds=1)
+            first, last = start_ts.strftime('%Y-%m-%d'), end_ts.strftime('%Y-%m-%d')
+            parts = [path for day in self.days() if first <= day <= last
+                     for path in self._parts(day)]
+            if not parts:
+                return pd.DataFrame()
+
+            if columns is None:
+                columns = MINUTE_COLUMNS[2:]
+            expr = (ds.field('datetime') >= start_ts) & (ds.field('datetime') <= end_ts)
+            if codes is not None:
+                expr = expr & ds.field('code').isin(list(codes))
+            table = ds.dataset(parts, format='parquet').to_table(
+                columns=['code', 'datetime'] + list(columns), filter=expr)
+            df = table.to_pandas()
+            df['code'] = df['code'].astype(str)
+            # 未合并的分片中可能有重复数据，保留最后写入的一行
+            df = df.drop_duplicates(subset=['code', 'datetime'], keep='last')
+            return df.sort_values(['code', 'datetime'], ignore_index=True)
+        except Exception as e:
+            print(f"读取分钟线失败: {e}")
+            return pd.DataFrame()
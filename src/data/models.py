@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Boolean, Index
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 import os
+from .migrations import upgrade_db
 
 # 创建数据库目录
 db_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
@@ -11,8 +13,40 @@ os.makedirs(db_dir, exist_ok=True)
 # 数据库路径
 DB_PATH = os.path.join(db_dir, 'stock_data.db')
 
+def create_db_engine(db_path: str = DB_PATH, pool_size: int = 10, max_overflow: int = 20):
+    """创建适合并发访问的SQLite引擎
+    
+    每个连接启用WAL日志模式：读不阻塞写、写不阻塞读；busy_timeout 让写冲突
+    时等待而不是立即报 "database is locked"；WAL 下 synchronous=NORMAL 仍能
+    保证数据库一致性，只是断电时可能丢失最近提交的事务。
+    
+    Args:
+        db_path: 数据库文件路径
+        pool_size: 连接池保持的连接数
+        max_overflow: 连接池允许临时超出的连接数
+    """
+    db_engine = create_engine(
+        f'sqlite:///{db_path}',
+        connect_args={'check_same_thread': False, 'timeout': 30},
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    
+    @event.listens_for(db_engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA busy_timeout=30000')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA cache_size=-65536')  # 64MB页缓存
+        cursor.close()
+        
+    return db_engine
+
 # 创建数据库引擎
-engine = create_engine(f'sqlite:///{DB_PATH}')
+engine = create_db_engine()
 Session = sessionmaker(bind=engine)
 Base = declarative_base()
 
@@ -26,7 +60,7 @@ class StockList(Base):
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
 class StockDaily(Base):
-    """股票日线数据"""
+    """股票日线数据（不复权）"""
     __tablename__ = 'stock_daily'
     
     id = Column(Integer, primary_key=True)
@@ -41,6 +75,54 @@ class StockDaily(Base):
     
     __table_args__ = (
         # 创建联合唯一索引
+        Index('ux_stock_daily_code_date', 'code', 'date', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
+class StockDailyCoverage(Base):
+    """日线数据已同步的日期区间"""
+    __tablename__ = 'stock_daily_coverage'
+    
+    id = Column(Integer, primary_key=True)
+    # 日线存储后端的标识（BarStoreBase.coverage_key），不同后端的数据分别记录
+    store = Column(String(255), nullable=False, default='sqlite', server_default='sqlite')
+    code = Column(String(10), nullable=False, index=True)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+class StockPeriodBar(Base):
+    """由日线合成的周线、月线（后复权）"""
+    __tablename__ = 'stock_period_bar'
+    
+    id = Column(Integer, primary_key=True)
+    code = Column(String(10), nullable=False)
+    period = Column(String(1), nullable=False)  # W 周线，M 月线
+    date = Column(DateTime, nullable=False)     # 周期内最后一个交易日
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    volume = Column(Float)
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        Index('ux_stock_period_bar_code_period_date', 'code', 'period', 'date', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
+class StockAdjFactor(Base):
+    """股票后复权因子，每行表示从该日期起生效的因子"""
+    __tablename__ = 'stock_adj_factor'
+    
+    id = Column(Integer, primary_key=True)
+    code = Column(String(10), nullable=False)
+    date = Column(DateTime, nullable=False)
+    factor = Column(Float, nullable=False)
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        Index('ux_stock_adj_factor_code_date', 'code', 'date', unique=True),
         {'sqlite_autoincrement': True},
     )
 
@@ -56,6 +138,23 @@ class StockRealtime(Base):
     volume = Column(Float)
     update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
+class StockRealtimeHistory(Base):
+    """股票日内行情快照历史，由行情环形缓冲区批量写入"""
+    __tablename__ = 'stock_realtime_history'
+    
+    id = Column(Integer, primary_key=True)
+    code = Column(String(10), nullable=False)
+    time = Column(DateTime, nullable=False)
+    price = Column(Float)
+    change = Column(Float)
+    volume = Column(Float)
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        Index('ux_stock_realtime_history_code_time', 'code', 'time', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
 class StockFinancial(Base):
     """股票财务数据"""
     __tablename__ = 'stock_financial'
@@ -68,9 +167,18 @@ class StockFinancial(Base):
     
     __table_args__ = (
         # 创建联合唯一索引
+        Index('ux_stock_financial_code_report_date', 'code', 'report_date', unique=True),
         {'sqlite_autoincrement': True},
     )
 
 # 创建所有表
-def init_db():
-    Base.metadata.create_all(engine) 
\ No newline at end of file
+def init_db(bind=None):
+    """创建所有表并升级已有数据库结构
+
+    Args:
+        bind: 数据库引擎，默认使用模块级引擎
+    """
+    bind = bind if bind is not None else engine
+    # create_all只创建缺失的表，已有表的结构变更由升级脚本完成
+    Base.metadata.create_all(bind)
+    upgrade_db(bind) 
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+实时行情环形缓冲区
+
+stock_realtime 表每只股票只保留最新一行，日内的价格路径会丢失。
+QuoteRingBuffer 在内存中为每只股票保留最近 capacity 个行情快照：
+所有股票共用一组 (股票数 × capacity) 的numpy数组，每只股票占一行，
+写入位置按行循环，追加一批快照只做一次按行列下标的赋值。
+新写入的快照同时进入待落盘队列，由调用方定期批量写入历史表。
+"""
+import threading
+from datetime import datetime
+from typing import Optional, List, Iterable, Sequence
+import numpy as np
+import pandas as pd
+
+# 缓冲的行情字段
+QUOTE_FIELDS = ('price', 'change', 'volume')
+
+class QuoteRingBuffer:
+    """按股票分行的定长行情环形缓冲区，线程安全"""
+
+    def __init__(self, capacity: int = 256, fields: Sequence[str] = QUOTE_FIELDS):
+        """
+        Args:
+            capacity: 每只股票保留的快照数
+            fields: 缓冲的数值字段
+        """
+        if capacity <= 0:
+            raise ValueError("capacity 必须大于0")
+        self.capacity = capacity
+        self.fields = list(fields)
+        self._rows = {}  # 股票代码 -> 行号
+        self._codes: List[str] = []
+        self._times = np.empty((0, capacity), dtype='datetime64[ns]')
+        self._values = np.empty((len(self.fields), 0, capacity))
+        self._head = np.empty(0, dtype=np.int64)   # 下一次写入的位置
+        self._count = np.empty(0, dtype=np.int64)  # 已写入的快照数，不超过capacity
+        self._pending: List[pd.DataFrame] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """已缓冲的股票数"""
+        return len(self._codes)
+
+    def _grow(self, n: int):
+        """为新股票扩充行，按倍数扩容以摊销复制成本"""
+        used = self._times.shape[0]
+        if n <= used:
+            return
+        size = max(n, used * 2, 64)
+        times = np.full((size, self.capacity), np.datetime64('NaT'), dtype='datetime64[ns]')
+        values = np.full((len(self.fields), size, self.capacity), np.nan)
+        head = np.zeros(size, dtype=np.int64)
+        count = np.zeros(size, dtype=np.int64)
+        times[:used] = self._times[:used]
+        values[:, :used] = self._values[:, :used]
+        head[:used] = self._head[:used]
+        count[:used] = self._count[:used]
+        self._times, self._values, self._head, self._count = times, values, head, count
+
+    def _row_ids(self, codes: Iterable[str], create: bool) -> np.ndarray:
+        """股票代码对应的行号，未缓冲的股票为-1（create时分配新行）"""
+        ids = []
+        for code in codes:
+            row = self._rows.get(code)
+            if row is None and create:
+                row = len(self._codes)
+                self._rows[code] = row
+                self._codes.append(code)
+            ids.append(-1 if row is None else row)
+        if create:
+            self._grow(len(self._codes))
+        return np.asarray(ids, dtype=np.int64)
+
+    def append(self, df: pd.DataFrame, timestamp: Optional[datetime] = None,
+               skip_unchanged: bool = True) -> int:
+        """追加一批行情快照
+
+        Args:
+            df: 包含 code 和 fields 列的行情，如 get_market_snapshot 的结果
+            timestamp: 快照时间，默认当前时间
+            skip_unchanged: 跳过与该股票最近一个快照完全相同的行，
+                同一份行情快照被重复读取时不会写入重复数据
+
+        Returns:
+            实际写入的行数
+        """
+        if df.empty:
+            return 0
+        timestamp = np.datetime64(pd.Timestamp(timestamp or datetime.now()), 'ns')
+        df = df.drop_duplicates(subset=['code'], keep='last')
+        values = df[self.fields].to_numpy(dtype='float64').T
+        with self._lock:
+            rows = self._row_ids(df['code'].astype(str), create=True)
+            if skip_unchanged:
+                last = (self._head[rows] - 1) % self.capacity
+                previous = self._values[:, rows, last]
+                same = (previous == values) | (np.isnan(previous) & np.isnan(values))
+                keep = ~(same.all(axis=0) & (self._count[rows] > 0))
+                rows, values, df = rows[keep], values[:, keep], df[keep]
+            if len(rows) == 0:
+                return 0
+            head = self._head[rows]
+            self._times[rows, head] = timestamp
+            self._values[:, rows, head] = values
+            self._head[rows] = (head + 1) % self.capacity
+            self._count[rows] = np.minimum(self._count[rows] + 1, self.capacity)
+            pending = df[['code'] + self.fields].copy()
+            pending['code'] = pending['code'].astype(str)
+            pending.insert(1, 'time', pd.Timestamp(timestamp))
+            self._pending.append(pending)
+        return len(rows)
+
+    def window(self, codes: Sequence[str], field: str, k: int) -> np.ndarray:
+        """最近 k 个快照的某个字段
+
+        Returns:
+            (len(codes), k) 的数组，每行按时间升序，最后一列为最新值；
+            快照不足 k 个或未缓冲的股票在左侧补NaN
+        """
+        k = min(k, self.capacity)
+        index = self.fields.index(field)
+        with self._lock:
+            rows, pos, valid = self._positions(codes, k)
+            out = self._values[index][np.maximum(rows, 0)[:, None], pos]
+        out[~valid] = np.nan
+        return out
+
+    def _positions(self, codes: Sequence[str], k: int):
+        """各股票最近 k 个快照在数组中的列位置及是否有效"""
+        rows = self._row_ids(codes, create=False)
+        safe = np.maximum(rows, 0)
+        offsets = np.arange(-k, 0)
+        pos = (self._head[safe][:, None] + offsets) % self.capacity
+        count = np.where(rows >= 0, self._count[safe], 0)
+        valid = offsets[None, :] >= -count[:, None]
+        return rows, pos, valid
+
+    def last(self, codes: Sequence[str], k: int = 1) -> pd.DataFrame:
+        """最近 k 个快照的长表
+
+        Returns:
+            包含 code、time 和 fields 列的DataFrame，按 codes 的顺序、时间升序排列
+        """
+        k = min(k, self.capacity)
+        codes = list(codes)
+        with self._lock:
+            rows, pos, valid = self._positions(codes, k)
+            safe = np.maximum(rows, 0)[:, None]
+            times = self._times[safe, pos][valid]
+            values = self._values[:, safe, pos][:, valid]
+        result = pd.DataFrame({'code': np.repeat(codes, valid.sum(axis=1)), 'time': times})
+        for i, field in enumerate(self.fields):
+            result[field] = values[i]
+        return result
+
+    def pending_rows(self) -> int:
+        """待落盘的行数"""
+        with self._lock:
+            return sum(len(df) for df in self._pending)
+
+    def drain(self) -> pd.DataFrame:
+        """取出全部待落盘的快照并清空队列"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return pd.DataFrame(columns=['code', 'time'] + self.fields)
+        return pd.concat(pending, ignore_index=True)
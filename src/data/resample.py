@@ -0,0 +1,81 @@
+"""
+周线、月线合成与对齐
+
+周期K线由后复权日线合成：开盘取首日、最高取最大、最低取最小、收盘取末日、
+成交量求和，日期为该周期内最后一个交易日。后复权价格不随新的除权变化，
+已合成的历史周期无需重算；前复权视图在读取时按最新因子换算。
+"""
+from datetime import datetime, timedelta
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+# 周期代码 -> pandas周期频率
+PERIODS = {
+    'W': 'W',  # 自然周
+    'M': 'M',  # 自然月
+}
+
+# 对齐到日线时的列名后缀，如 close_w、close_m
+PERIOD_SUFFIXES = {'W': 'w', 'M': 'm'}
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+def period_start(date: datetime, period: str) -> datetime:
+    """date 所在周期的第一天"""
+    date = datetime(date.year, date.month, date.day)
+    if period == 'W':
+        return date - timedelta(days=date.weekday())
+    if period == 'M':
+        return date.replace(day=1)
+    raise ValueError(f"不支持的周期: {period}")
+
+def resample_bars(df: pd.DataFrame, period: str) -> pd.DataFrame:
+    """把日线合成为周期K线
+
+    Args:
+        df: 按日期排序的日线数据，包含 date 和 BAR_COLUMNS 列
+        period: 'W' 周线或 'M' 月线
+
+    Returns:
+        包含 date 和 BAR_COLUMNS 列的周期K线，date为周期内最后一个交易日
+    """
+    if period not in PERIODS:
+        raise ValueError(f"不支持的周期: {period}")
+    if df.empty:
+        return pd.DataFrame(columns=['date'] + BAR_COLUMNS)
+    key = df['date'].dt.to_period(PERIODS[period])
+    bars = df.groupby(key, sort=True).agg(
+        date=('date', 'last'),
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        volume=('volume', 'sum'),
+    )
+    return bars.reset_index(drop=True)
+
+def align_period_bars(data: pd.DataFrame, bars: pd.DataFrame, suffix: str) -> pd.DataFrame:
+    """把周期K线按时间对齐到以日期为索引的日线上
+
+    每个交易日取截至当天已经结束（日期不晚于当天）的最近一根周期K线，
+    周期内的其他交易日看到的是上一周期的数据，不会用到未来信息。
+
+    Args:
+        data: 以日期为索引、按日期排序的日线数据
+        bars: 周期K线，包含 date 和价格列
+        suffix: 新列名后缀，如 'w' 生成 close_w
+
+    Returns:
+        增加了 <列名>_<suffix> 列的日线数据（新对象）
+    """
+    bars = bars.sort_values('date')
+    columns = [c for c in bars.columns if c != 'date']
+    pos = np.searchsorted(bars['date'].to_numpy(), data.index.to_numpy(), side='right') - 1
+    valid = pos >= 0
+    aligned: Dict[str, np.ndarray] = {}
+    for column in columns:
+        values = np.full(len(data), np.nan)
+        values[valid] = bars[column].to_numpy(dtype='float64')[pos[valid]]
+        aligned[f'{column}_{suffix}'] = values
+    return data.assign(**aligned)
@@ -0,0 +1,63 @@
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+import pandas as pd
+
+class MarketSnapshot:
+    """全市场实时行情快照
+
+    每个刷新周期只调用一次 loader 下载全市场行情，按股票代码建立索引，
+    之后的单只或批量查询都直接从快照中按索引取值。多线程并发查询时只有
+    一个线程执行下载，其余线程等待并复用结果。
+    """
+
+    def __init__(self, loader: Callable[[], pd.DataFrame], refresh_interval: timedelta):
+        """
+        Args:
+            loader: 下载全市场行情的函数，返回包含code列的DataFrame
+            refresh_interval: 快照刷新间隔
+        """
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._table: Optional[pd.DataFrame] = None
+        self._loaded_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (self._table is not None and
+                datetime.now() - self._loaded_at < self.refresh_interval)
+
+    @property
+    def loaded_at(self) -> Optional[datetime]:
+        """最近一次下载快照的时间"""
+        return self._loaded_at
+
+    def get(self, force_refresh: bool = False) -> pd.DataFrame:
+        """返回以code为索引的全市场行情表，过期时重新下载
+
+        下载失败时继续返回已有的快照（不更新下载时间，下次调用重试）；
+        还没有快照时抛出异常。
+        """
+        if not force_refresh and self._is_fresh():
+            return self._table
+        with self._lock:
+            # 等待锁期间其他线程可能已经完成刷新
+            if not force_refresh and self._is_fresh():
+                return self._table
+            try:
+                table = self.loader()
+            except Exception as e:
+                if self._table is None:
+                    raise
+                print(f"刷新全市场行情快照失败，继续使用 {self._loaded_at:%H:%M:%S} 的快照: {e}")
+                return self._table
+            table = table.drop_duplicates(subset=['code'], keep='last')
+            self._table = table.set_index('code', drop=False)
+            self._loaded_at = datetime.now()
+            return self._table
+
+    def lookup(self, codes: Iterable[str]) -> pd.DataFrame:
+        """按代码查询行情，快照中不存在的代码被忽略"""
+        table = self.get()
+        codes = [code for code in codes if code in table.index]
+        return table.loc[codes].reset_index(drop=True)
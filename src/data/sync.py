@@ -0,0 +1,236 @@
+"""
+收盘后日线同步任务
+
+遍历股票列表，为每只股票只拉取本地已同步区间之后的新日线，写入本地存储。
+进度记录在断点文件中，任务中断后重新运行会跳过已完成的股票。
+
+用法：
+    python -m src.data.sync                 # 立即同步一次
+    python -m src.data.sync --schedule      # 每个工作日收盘后定时同步
+"""
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+import pandas as pd
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from ..config import settings
+from ..utils.date_ranges import ONE_DAY
+
+# A股收盘时间，之后当天日线不再变化
+MARKET_CLOSE_HOUR = 15
+
+class DailySyncJob:
+    """全市场日线增量同步
+
+    每只股票的拉取起点是已同步区间的最晚日期的下一天，从未同步过的股票从
+    history_start 开始。起点相同的股票合并为一批，通过获取器的
+    get_stock_daily_many 并发拉取（共享限流，失败按退避重试），结果在当前
+    线程逐只写入，避免多个线程同时写SQLite。同步成功的股票同时刷新复权因子。
+    """
+
+    def __init__(self,
+                 manager=None,
+                 history_start: Optional[str] = None,
+                 checkpoint_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 max_retries: int = 3,
+                 backoff: float = 1.0,
+                 checkpoint_every: int = 50):
+        """
+        Args:
+            manager: StockDataManager 实例，默认新建
+            history_start: 从未同步过的股票的起始日期，默认读取配置 BLACKX_SYNC_HISTORY_START
+            checkpoint_path: 断点文件路径，默认读取配置 BLACKX_SYNC_CHECKPOINT
+            max_workers: 并发请求数，默认读取配置 BLACKX_FETCH_WORKERS
+            max_retries: 单只股票的最大重试次数
+            backoff: 首次重试前的等待秒数
+            checkpoint_every: 每完成多少只股票写一次断点文件
+        """
+        if manager is None:
+            from .manager import StockDataManager
+            manager = StockDataManager()
+        self.manager = manager
+        self.history_start = datetime.strptime(history_start or settings.SYNC_HISTORY_START,
+                                               '%Y-%m-%d')
+        self.checkpoint_path = checkpoint_path or settings.SYNC_CHECKPOINT
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.checkpoint_every = checkpoint_every
+
+    @staticmethod
+    def default_end_date() -> str:
+        """收盘后同步到当天，收盘前同步到前一天"""
+        now = datetime.now()
+        if now.hour < MARKET_CLOSE_HOUR:
+            now -= ONE_DAY
+        return now.strftime('%Y-%m-%d')
+
+    def _load_checkpoint(self, end_date: str) -> Dict[str, Any]:
+        """读取同一截止日期未完成的断点，否则返回新断点"""
+        if os.path.exists(self.checkpoint_path):
+            try:
+                with open(self.checkpoint_path) as f:
+                    checkpoint = json.load(f)
+                if checkpoint.get('end_date') == end_date and not checkpoint.get('finished'):
+                    return checkpoint
+            except (OSError, ValueError) as e:
+                print(f"读取同步断点失败，重新开始: {e}")
+        return {'end_date': end_date, 'done': [], 'failed': {}, 'finished': False}
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]):
+        """先写临时文件再替换，避免中断时留下损坏的断点文件"""
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, ensure_ascii=False)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _plan(self, codes: List[str], end: datetime) -> Dict[datetime, List[str]]:
+        """按拉取起点把股票分组，已同步到 end 的股票不再请求"""
+        coverage_end = self.manager.db.get_daily_coverage_end(self.manager.bar_store.coverage_key)
+        batches = defaultdict(list)
+        for code in codes:
+            last = coverage_end.get(code)
+            start = last + ONE_DAY if last is not None else self.history_start
+            if start <= end:
+                batches[start].append(code)
+        return dict(sorted(batches.items()))
+
+    def run(self, codes: Optional[List[str]] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+        """执行一次同步
+
+        Args:
+            codes: 需要同步的股票代码，默认为股票列表中的全部股票
+            end_date: 同步截止日期（含），默认见 default_end_date
+
+        Returns:
+            本次运行的统计：股票数、跳过数、成功数、失败的股票及原因、复权因子获取
+            失败的股票、写入行数、耗时和吞吐量
+        """
+        end_date = end_date or self.default_end_date()
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        if codes is None:
+            codes = self.manager.get_stock_list()['code'].astype(str).tolist()
+
+        checkpoint = self._load_checkpoint(end_date)
+        done = set(checkpoint['done'])
+        pending = [code for code in codes if code not in done]
+        batches = self._plan(pending, end)
+        planned = sum(len(batch) for batch in batches.values())
+
+        report = {
+            'end_date': end_date,
+            'symbols': len(codes),
+            'skipped': len(codes) - planned,
+            'synced': 0,
+            'failed': {},
+            'adj_factor_failed': [],
+            'rows': 0
+        }
+        # 数据源可能还没有发布当天（或截止日）的日线，已同步区间只记到实际返回的最后
+        # 一个交易日；今天以前的日期与按需同步一样视为已经发布
+        today = datetime.combine(datetime.now().date(), datetime.min.time())
+        last_final = min(end, today - ONE_DAY)
+        print(f"开始同步日线数据至 {end_date}：共 {len(codes)} 只，需要拉取 {planned} 只")
+        started = time.monotonic()
+        completed = 0
+        for start, batch in batches.items():
+            results = self.manager.fetcher.get_stock_daily_many(
+                batch, start.strftime('%Y-%m-%d'), end_date,
+                max_workers=self.max_workers,
+                max_retries=self.max_retries,
+                backoff=self.backoff)
+            for code, df, error in results:
+                if error is not None:
+                    report['failed'][code] = str(error)
+                else:
+                    covered_end = last_final
+                    if not df.empty:
+                        self.manager.bar_store.save_stock_daily(code, df)
+                        self.manager.mark_daily_updated(code, df['date'].min())
+                        report['rows'] += len(df)
+                        covered_end = max(covered_end, pd.Timestamp(df['date'].max()).to_pydatetime())
+                    if covered_end >= start:
+                        self.manager.db.add_daily_coverage(code, start, covered_end,
+                                                           self.manager.bar_store.coverage_key)
+                    # 顺便刷新复权因子，次日查询时不再需要访问数据源
+                    if not self.manager.sync_adj_factor(code, force=True):
+                        report['adj_factor_failed'].append(code)
+                    report['synced'] += 1
+                    checkpoint['done'].append(code)
+                completed += 1
+                if completed % self.checkpoint_every == 0:
+                    checkpoint['failed'] = report['failed']
+                    self._save_checkpoint(checkpoint)
+
+        elapsed = time.monotonic() - started
+        report['seconds'] = round(elapsed, 3)
+        report['symbols_per_sec'] = round(completed / elapsed, 2) if elapsed > 0 else None
+        report['rows_per_sec'] = round(report['rows'] / elapsed, 2) if elapsed > 0 else None
+
+        checkpoint['failed'] = report['failed']
+        # 有失败的股票时保留断点，再次运行只重试失败的股票
+        checkpoint['finished'] = not report['failed']
+        self._save_checkpoint(checkpoint)
+
+        print(f"日线同步完成：成功 {report['synced']} 只，失败 {len(report['failed'])} 只，"
+              f"写入 {report['rows']} 行，耗时 {report['seconds']} 秒")
+        return report
+
+def schedule_daily_sync(job: Optional[DailySyncJob] = None,
+                        scheduler=None,
+                        hour: Optional[int] = None,
+                        minute: Optional[int] = None):
+    """在每个工作日收盘后运行同步任务
+
+    Args:
+        job: 同步任务，默认新建
+        scheduler: APScheduler调度器，默认新建并启动 BackgroundScheduler
+        hour: 运行时间（小时），默认读取配置 BLACKX_SYNC_HOUR
+        minute: 运行时间（分钟），默认读取配置 BLACKX_SYNC_MINUTE
+
+    Returns:
+        调度器
+    """
+    job = job or DailySyncJob()
+    trigger = CronTrigger(day_of_week='mon-fri',
+                          hour=settings.SYNC_HOUR if hour is None else hour,
+                          minute=settings.SYNC_MINUTE if minute is None else minute)
+    start = scheduler is None
+    if start:
+        scheduler = BackgroundScheduler()
+    # 上一次同步未结束时跳过本次触发，错过的多次触发只补跑一次
+    scheduler.add_job(job.run, trigger, id='daily_sync', max_instances=1, coalesce=True)
+    if start:
+        scheduler.start()
+    return scheduler
+
+def main():
+    parser = argparse.ArgumentParser(description='收盘后日线同步')
+    parser.add_argument('--codes', nargs='*', help='只同步指定股票，默认全部')
+    parser.add_argument('--end-date', help='同步截止日期 YYYY-MM-DD')
+    parser.add_argument('--workers', type=int, help='并发请求数')
+    parser.add_argument('--schedule', action='store_true', help='按工作日定时运行，不立即执行')
+    args = parser.parse_args()
+
+    job = DailySyncJob(max_workers=args.workers)
+    if args.schedule:
+        scheduler = BlockingScheduler()
+        schedule_daily_sync(job, scheduler)
+        print(f"已启动定时同步：每个工作日 {settings.SYNC_HOUR:02d}:{settings.SYNC_MINUTE:02d}")
+        scheduler.start()
+    else:
+        report = job.run(args.codes, args.end_date)
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+"""
+离线数据获取器
+
+不依赖网络的 StockDataFetcherBase 实现，用于测试和性能基准：
+SyntheticStockDataFetcher 按股票代码生成确定性的模拟行情，
+ReplayStockDataFetcher 回放事先录制到磁盘的数据。
+"""
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional, Iterable, List
+import numpy as np
+import pandas as pd
+from .fetcher import StockDataFetcherBase, DataFetchError, MINUTE_FIELDS
+
+# A股连续竞价的分钟K线时间：上午 09:31-11:30，下午 13:01-15:00
+TRADING_MINUTES = pd.TimedeltaIndex(
+    [pd.Timedelta(hours=9, minutes=30 + i) for i in range(1, 121)] +
+    [pd.Timedelta(hours=13, minutes=i) for i in range(1, 121)])
+
+def _date_range(start_date: Optional[str], end_date: Optional[str]):
+    """与Akshare获取器一致：默认取最近一年，日期支持YYYY-MM-DD和YYYYMMDD"""
+    end = pd.Timestamp(end_date) if end_date else pd.Timestamp(datetime.now().date())
+    start = pd.Timestamp(start_date) if start_date else end - timedelta(days=365)
+    return start, end
+
+class SyntheticStockDataFetcher(StockDataFetcherBase):
+    """确定性模拟行情获取器
+
+    每只股票的日线是从 origin 开始的几何随机游走，随机种子由股票代码的
+    CRC32 和 seed 决定，同一只股票同一交易日的数据与请求区间无关，
+    因此分段获取和一次性获取的结果一致。每次调用前等待 latency 秒以模拟网络延迟。
+    """
+
+    def __init__(self,
+                 n_symbols: int = 5000,
+                 latency: float = 0.0,
+                 seed: int = 0,
+                 origin: str = '2000-01-03'):
+        """
+        Args:
+            n_symbols: 股票数量，代码为 000001 起的连续6位数字
+            latency: 每次调用的模拟延迟秒数
+            seed: 全局随机种子，改变后生成另一组行情
+            origin: 行情起始日期，之前没有数据
+        """
+        self.n_symbols = n_symbols
+        self.latency = latency
+        self.seed = seed
+        self.origin = pd.Timestamp(origin)
+        self.symbols = [f'{i:06d}' for i in range(1, n_symbols + 1)]
+
+    def _sleep(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def _rng(self, code: str) -> np.random.RandomState:
+        return np.random.RandomState((zlib.crc32(code.encode()) + self.seed) % (2 ** 32))
+
+    def _generate(self, code: str, end: pd.Timestamp) -> pd.DataFrame:
+        """生成从 origin 到 end 的全部日线"""
+        # 工作日即交易日；bdate_range 逐日生成较慢，这里按自然日生成后过滤
+        dates = pd.date_range(self.origin, end, freq='D')
+        dates = dates[dates.dayofweek < 5]
+        n = len(dates)
+        rng = self._rng(code)
+        # 先抽取固定的参数，再按日抽取随机数，保证前缀与 end 无关
+        base = rng.uniform(5, 100)
+        sigma = rng.uniform(0.01, 0.03)
+        volume_base = rng.uniform(1e5, 1e7)
+        noise = np.random.RandomState(rng.randint(0, 2 ** 31))
+        draws = noise.standard_normal((n, 4))
+
+        close = base * np.exp(np.cumsum(sigma * draws[:, 0]))
+        prev_close = np.concatenate([[base], close[:-1]])
+        open_ = prev_close * np.exp(sigma / 2 * draws[:, 1])
+        spread = np.abs(draws[:, 2]) * sigma * close
+        high = np.maximum(open_, close) + spread
+        low = np.minimum(open_, close) - spread
+        volume = np.round(volume_base * np.exp(0.5 * draws[:, 3]))
+
+        return pd.DataFrame({
+            'date': dates,
+            'open': open_.round(2),
+            'close': close.round(2),
+            'high': high.round(2),
+            'low': low.round(2),
+            'volume': volume
+        })
+
+    def get_stock_list(self) -> pd.DataFrame:
+        """获取模拟股票列表"""
+        self._sleep()
+        return pd.DataFrame({
+            'code': self.symbols,
+            'name': [f'模拟{code}' for code in self.symbols]
+        })
+
+    def get_stock_daily(self,
+                        symbol: str,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        raise_on_error: bool = False) -> pd.DataFrame:
+        """获取模拟日线数据，列与Akshare获取器一致"""
+        self._sleep()
+        start, end = _date_range(start_date, end_date)
+        df = self._generate(symbol.split('.')[0], end)
+        return df[df['date'] >= start].reset_index(drop=True)
+
+    def get_stock_minute(self,
+                         symbol: str,
+                         start: Optional[str] = None,
+                         end: Optional[str] = None,
+                         period: str = '1',
+                         raise_on_error: bool = False) -> pd.DataFrame:
+        """获取模拟分钟线
+
+        每个交易日 240 根1分钟线，由当日开盘价到收盘价的布朗桥生成，
+        随机种子由股票代码和交易日决定；其他周期由1分钟线合成。
+        """
+        self._sleep()
+        code = symbol.split('.')[0]
+        end_ts = pd.Timestamp(end) if end else pd.Timestamp(datetime.now())
+        start_ts = pd.Timestamp(start) if start else end_ts.normalize() - timedelta(days=7)
+        daily = self._generate(code, end_ts.normalize())
+        daily = daily[daily['date'] >= start_ts.normalize()]
+        if daily.empty:
+            return pd.DataFrame(columns=MINUTE_FIELDS)
+
+        n = len(TRADING_MINUTES)
+        frames = []
+        for row in daily.itertuples(index=False):
+            rng = np.random.RandomState(
+                (zlib.crc32(code.encode()) + self.seed + row.date.toordinal()) % (2 ** 32))
+            path = np.cumsum(rng.standard_normal(n))
+            # 布朗桥：首尾分别落在开盘价和收盘价上
+            path = path - np.arange(1, n + 1) / n * path[-1]
+            log_open, log_close = np.log(row.open), np.log(row.close)
+            close = np.exp(log_open + (log_close - log_open) * np.arange(1, n + 1) / n
+                           + 0.001 * path)
+            open_ = np.concatenate([[row.open], close[:-1]])
+            volume = np.round(row.volume / n * rng.uniform(0.5, 1.5, n))
+            frames.append(pd.DataFrame({
+                'datetime': row.date + TRADING_MINUTES,
+                'open': open_,
+                'high': np.maximum(open_, close),
+                'low': np.minimum(open_, close),
+                'close': close,
+                'volume': volume,
+                'amount': volume * close
+            }))
+        df = pd.concat(frames, ignore_index=True)
+
+        step = int(period)
+        if step > 1:
+            key = np.arange(len(df)) // step
+            df = df.groupby(key).agg(datetime=('datetime', 'last'), open=('open', 'first'),
+                                     high=('high', 'max'), low=('low', 'min'),
+                                     close=('close', 'last'), volume=('volume', 'sum'),
+                                     amount=('amount', 'sum'))
+        df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].round(2)
+        mask = (df['datetime'] >= start_ts) & (df['datetime'] <= end_ts)
+        return df[mask].reset_index(drop=True)
+
+    def get_market_snapshot(self, force_refresh: bool = False) -> pd.DataFrame:
+        """全市场模拟行情，取各股票最近一个交易日的数据"""
+        self._sleep()
+        return self._realtime(self.symbols)
+
+    def _realtime(self, codes: Iterable[str]) -> pd.DataFrame:
+        end = pd.Timestamp(datetime.now().date())
+        rows = []
+        for code in codes:
+            df = self._generate(code, end)
+            if len(df) < 2:
+                continue
+            last, prev = df.iloc[-1], df.iloc[-2]
+            rows.append({
+                'code': code,
+                'name': f'模拟{code}',
+                'price': last['close'],
+                'change': round((last['close'] / prev['close'] - 1) * 100, 2),
+                'volume': last['volume']
+            })
+        return pd.DataFrame(rows)
+
+    def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """获取模拟实时行情"""
+        return self.get_stock_realtime_many([symbol])
+
+    def get_stock_realtime_many(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """批量获取模拟实时行情"""
+        self._sleep()
+        return self._realtime(symbol.split('.')[0] for symbol in symbols)
+
+    def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """获取模拟财务数据（最近四个季度的报告期）"""
+        self._sleep()
+        code = symbol.split('.')[0]
+        report_dates = pd.date_range(end=datetime.now(), periods=4, freq='QE')
+        return pd.DataFrame({
+            'code': code,
+            'name': f'模拟{code}',
+            'report_date': report_dates.strftime('%Y-%m-%d')
+        })
+
+class ReplayStockDataFetcher(StockDataFetcherBase):
+    """回放磁盘上录制的数据
+
+    目录结构：
+        <root>/stock_list.csv
+        <root>/daily/<代码>.csv
+        <root>/adj_factor/<代码>.csv
+        <root>/realtime.csv
+        <root>/financial/<代码>.csv
+
+    可以用 record 从任意获取器（包括Akshare）录制一份数据，之后离线重复使用。
+    没有录制的股票返回空DataFrame。
+    """
+
+    def __init__(self, root: str, latency: float = 0.0):
+        """
+        Args:
+            root: 录制数据目录
+            latency: 每次调用的模拟延迟秒数
+        """
+        self.root = root
+        self.latency = latency
+
+    @staticmethod
+    def _file(symbol: str) -> str:
+        """股票数据的文件名，录制和回放都去掉代码后缀"""
+        return f"{symbol.split('.')[0]}.csv"
+
+    @staticmethod
+    def record(fetcher: StockDataFetcherBase,
+               root: str,
+               symbols: List[str],
+               start_date: Optional[str] = None,
+               end_date: Optional[str] = None):
+        """从 fetcher 获取数据并写入 root 目录，带后缀的代码（如 000001.SZ）按6位代码保存
+
+        Args:
+            fetcher: 数据来源
+            root: 录制数据目录
+            symbols: 需要录制的股票代码
+            start_date: 日线开始日期
+            end_date: 日线结束日期
+        """
+        os.makedirs(os.path.join(root, 'daily'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'adj_factor'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'financial'), exist_ok=True)
+        fetcher.get_stock_list().to_csv(os.path.join(root, 'stock_list.csv'), index=False)
+        fetcher.get_stock_realtime_many(symbols).to_csv(os.path.join(root, 'realtime.csv'),
+                                                        index=False)
+        for symbol, df, error in fetcher.get_stock_daily_many(symbols, start_date, end_date):
+            if error is None:
+                df.to_csv(os.path.join(root, 'daily', ReplayStockDataFetcher._file(symbol)), index=False)
+        for symbol in symbols:
+            df = fetcher.get_adj_factor(symbol)
+            df.to_csv(os.path.join(root, 'adj_factor', ReplayStockDataFetcher._file(symbol)), index=False)
+            df = fetcher.get_stock_financial(symbol)
+            df.to_csv(os.path.join(root, 'financial', ReplayStockDataFetcher._file(symbol)), index=False)
+
+    def _read(self, *parts: str) -> pd.DataFrame:
+        self._sleep()
+        path = os.path.join(self.root, *parts)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return pd.read_csv(path, dtype={'code': str})
+        except pd.errors.EmptyDataError:
+            return pd.DataFrame()
+
+    def _sleep(self):
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+    def get_stock_list(self) -> pd.DataFrame:
+        """回放股票列表"""
+        return self._read('stock_list.csv')
+
+    def get_stock_daily(self,
+                        symbol: str,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        raise_on_error: bool = False) -> pd.DataFrame:
+        """回放日线数据，按请求区间过滤"""
+        try:
+            df = self._read('daily', self._file(symbol))
+            if df.empty:
+                return df
+            df['date'] = pd.to_datetime(df['date'])
+            start, end = _date_range(start_date, end_date)
+            return df[(df['date'] >= start) & (df['date'] <= end)].reset_index(drop=True)
+        except Exception as e:
+            if raise_on_error:
+                raise DataFetchError(f"回放股票 {symbol} 日线数据失败: {e}") from e
+            print(f"回放股票 {symbol} 日线数据失败: {e}")
+            return pd.DataFrame()
+
+    def get_adj_factor(self, symbol: str, raise_on_error: bool = False) -> pd.DataFrame:
+        """回放复权因子"""
+        df = self._read('adj_factor', self._file(symbol))
+        if df.empty:
+            return pd.DataFrame(columns=['date', 'factor'])
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    def get_stock_realtime(self, symbol: str) -> pd.DataFrame:
+        """回放实时行情"""
+        return self.get_stock_realtime_many([symbol])
+
+    def get_stock_realtime_many(self, symbols: Iterable[str]) -> pd.DataFrame:
+        """按代码回放实时行情"""
+        df = self._read('realtime.csv')
+        if df.empty:
+            return df
+        codes = [symbol.split('.')[0] for symbol in symbols]
+        return df[df['code'].isin(codes)].reset_index(drop=True)
+
+    def get_market_snapshot(self, force_refresh: bool = False) -> pd.DataFrame:
+        """回放录制的全部实时行情"""
+        return self._read('realtime.csv')
+
+    def get_stock_financial(self, symbol: str) -> pd.DataFrame:
+        """回放财务数据"""
+        return self._read('financial', self._file(symbol))
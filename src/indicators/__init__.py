@@ -1,6 +1,17 @@
 from .base import TechnicalIndicator
 from .ma import MovingAverage
-from .rsi import RSI
+from .rsi import RSI, WilderRSI
 from .macd import MACD
+from .bollinger import BollingerBands
+from .atr import ATR
+from .kdj import KDJ
+from .obv import OBV
+from .incremental import IncrementalMovingAverage, IncrementalRSI, IncrementalMACD
+from .sweep import sma_sweep, ema_sweep, crossover_sweep
+from .registry import register_indicator, get_indicator, create_indicator, registered_indicators
 
-__all__ = ['TechnicalIndicator', 'MovingAverage', 'RSI', 'MACD'] 
\ No newline at end of file
+__all__ = ['TechnicalIndicator', 'MovingAverage', 'RSI', 'MACD',
+           'WilderRSI', 'BollingerBands', 'ATR', 'KDJ', 'OBV',
+           'IncrementalMovingAverage', 'IncrementalRSI', 'IncrementalMACD',
+           'sma_sweep', 'ema_sweep', 'crossover_sweep',
+           'register_indicator', 'get_indicator', 'create_indicator', 'registered_indicators']
\ No newline at end of file
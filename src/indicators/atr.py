@@ -0,0 +1,32 @@
+import pandas as pd
+import numpy as np
+from .base import TechnicalIndicator
+from .panel import wilder
+
+class ATR(TechnicalIndicator):
+    """平均真实波幅(ATR)
+    
+    真实波幅为 最高价-最低价、|最高价-昨收|、|最低价-昨收| 中的最大值，第一个交易日
+    没有昨收，取 最高价-最低价。ATR 为真实波幅的 Wilder 平滑：第 period 个交易日的值为
+    前 period 个真实波幅的均值，之后 ATR = ATR + (TR - ATR) / period，之前为NaN。
+    """
+    
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period: ATR计算周期
+        """
+        super().__init__('ATR', {'period': period})
+        self.period = period
+        
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        return self._calculate_vectorized(data, ['high', 'low', 'close'])
+        
+    def _calculate_compressed(self, fields, counts):
+        high, low, close = fields['high'], fields['low'], fields['close']
+        prev_close = np.full(close.shape, np.nan)
+        prev_close[1:] = close[:-1]
+        # fmax 忽略NaN：第一个交易日只有 最高价-最低价 有效
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        true_range[np.isnan(high - low)] = np.nan
+        return wilder(true_range, self.period)
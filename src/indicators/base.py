@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+from .panel import compress, compress_like, scatter, panel_fields
+from ..utils.dtypes import compact_values
 
 class TechnicalIndicator:
     """技术指标基类"""
@@ -19,5 +22,98 @@ class TechnicalIndicator:
         """
         raise NotImplementedError("子类必须实现calculate方法")
         
+    def calculate_panel(self, panel: Union[pd.DataFrame, np.ndarray], compact: bool = False):
+        """对 (日期 × 股票) 面板的所有股票一次性计算指标
+        
+        停牌日（收盘价为NaN）不参与计算，结果中保持NaN；每只股票的结果与只用该股票
+        交易日的数据调用 calculate 一致。
+        
+        Args:
+            panel: 列为股票代码的收盘价面板、列为 (字段, 股票代码) 的多字段面板，
+                或 (日期 × 股票) 的收盘价二维数组；float32面板按float64计算
+            compact: 结果转换为float32，内存减半，相对误差不超过 2**-24（见 utils.dtypes）
+                
+        Returns:
+            与输入形状相同的指标面板；多输出指标（如MACD）返回列为 (输出, 股票代码) 的面板，
+            输入为数组时返回 {输出: 数组}
+        """
+        fields, index, columns = panel_fields(panel)
+        compressed, layout = compress(fields['close'])
+        counts = layout[0]
+        fields = {name: compressed if name == 'close' else compress_like(values, layout)
+                  for name, values in fields.items()}
+        # 子类只覆盖了 calculate 时，父类的向量化实现与之不符，按逐只股票计算
+        calculate_owner = next(c for c in type(self).__mro__ if 'calculate' in c.__dict__)
+        kernel_owner = next(c for c in type(self).__mro__ if '_calculate_compressed' in c.__dict__)
+        kernel = (type(self) if issubclass(kernel_owner, calculate_owner)
+                  else TechnicalIndicator)._calculate_compressed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = kernel(self, fields, counts)
+        if compact:
+            result = compact_values(result)
+            
+        if isinstance(result, dict):
+            result = {name: scatter(values, layout) for name, values in result.items()}
+            if index is None:
+                return result
+            return pd.concat({name: pd.DataFrame(values, index=index, columns=columns)
+                              for name, values in result.items()}, axis=1)
+        result = scatter(result, layout)
+        if index is None:
+            return result
+        return pd.DataFrame(result, index=index, columns=columns)
+        
+    def _calculate_compressed(self, fields: Dict[str, np.ndarray], counts: np.ndarray):
+        """在压缩后的面板上计算指标
+        
+        Args:
+            fields: {字段: (行 × 股票) 数组}，第 i 行是各股票的第 i 个有效观测，
+                第 counts[j] 行之后为NaN
+            counts: 每只股票的有效观测数
+            
+        Returns:
+            (行 × 股票) 数组，多输出指标返回 {输出: 数组}。
+            默认实现逐只股票调用 calculate，子类可覆盖为向量化实现
+        """
+        names = list(fields)
+        shape = fields['close'].shape
+        result = None
+        for j, n in enumerate(counts):
+            if n == 0:
+                continue
+            data = pd.DataFrame({name: fields[name][:n, j] for name in names})
+            values = self.calculate(data)
+            if result is None:
+                if isinstance(values, pd.DataFrame):
+                    result = {name: np.full(shape, np.nan) for name in values.columns}
+                else:
+                    result = np.full(shape, np.nan)
+            if isinstance(values, pd.DataFrame):
+                for name in values.columns:
+                    result[name][:n, j] = values[name].to_numpy(dtype='float64')
+            else:
+                result[:n, j] = np.asarray(values, dtype='float64')
+        return np.full(shape, np.nan) if result is None else result
+        
+    def _calculate_vectorized(self, data: pd.DataFrame, fields):
+        """把单只股票的数据当作一列的面板，用 _calculate_compressed 计算
+        
+        供只用NumPy实现的子类的 calculate 使用，单只股票与面板计算的结果完全一致。
+        data 应只包含交易日（与面板压缩后的数据相同）。
+        
+        Args:
+            data: 单只股票的数据
+            fields: 计算用到的字段
+            
+        Returns:
+            与 calculate 相同：单输出为Series，多输出为DataFrame
+        """
+        arrays = {name: data[name].to_numpy(dtype='float64').reshape(-1, 1) for name in fields}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = self._calculate_compressed(arrays, np.array([len(data)]))
+        if isinstance(result, dict):
+            return pd.DataFrame({name: values[:, 0] for name, values in result.items()}, index=data.index)
+        return pd.Series(result[:, 0], index=data.index)
+        
     def __str__(self) -> str:
-        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})" 
\ No newline at end of file
+        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})"
@@ -0,0 +1,38 @@
+import pandas as pd
+import numpy as np
+from .base import TechnicalIndicator
+from .panel import rolling_mean, rolling_std
+
+class BollingerBands(TechnicalIndicator):
+    """布林带
+    
+    中轨为 window 日收盘价均值，上下轨为中轨加减 num_std 倍的 window 日标准差
+    （样本标准差，与 rolling(window).std() 一致）。前 window-1 个交易日及窗口内
+    有NaN时各输出为NaN。
+    """
+    
+    def __init__(self, window: int = 20, num_std: float = 2, ddof: int = 1):
+        """
+        Args:
+            window: 计算周期
+            num_std: 上下轨的标准差倍数
+            ddof: 标准差的自由度修正，1为样本标准差，0为总体标准差
+        """
+        super().__init__('BOLL', {'window': window, 'num_std': num_std, 'ddof': ddof})
+        self.window = window
+        self.num_std = num_std
+        self.ddof = ddof
+        
+    def calculate(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self._calculate_vectorized(data, ['close'])
+        
+    def _calculate_compressed(self, fields, counts):
+        close = fields['close']
+        middle = rolling_mean(close, self.window)
+        std = rolling_std(close, self.window, self.ddof)
+        return {
+            'middle_band': middle,
+            'upper_band': middle + self.num_std * std,
+            'lower_band': middle - self.num_std * std,
+            'std': std
+        }
@@ -0,0 +1,239 @@
+"""
+增量指标
+
+实时监控时每次只新增一根K线，批量指标的 calculate 每次都要重算全部历史。
+这里的增量版本保存计算所需的最小状态，先用历史数据初始化，之后每根新K线
+以常数时间更新，结果与对全部数据调用 calculate 的最后一个值一致：
+    IncrementalMovingAverage  SMA 保存窗口内的收盘价和滚动和，EMA 保存上一个均值
+    IncrementalRSI            保存窗口内的涨幅、跌幅和滚动和
+    IncrementalMACD           保存快线、慢线和信号线三个EMA的状态
+停牌日没有K线，不调用 update 即可。
+"""
+import math
+from collections import deque
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+class IncrementalIndicator:
+    """增量指标基类"""
+
+    def __init__(self, name: str, params: Dict):
+        self.name = name
+        self.params = params
+        self.value = np.nan
+
+    def reset(self):
+        """清空状态"""
+        raise NotImplementedError("子类必须实现reset方法")
+
+    def initialize(self, data: pd.DataFrame) -> 'IncrementalIndicator':
+        """清空状态后用历史K线初始化，之后 value 等于 calculate(data) 的最后一个值
+
+        Args:
+            data: 包含close列、按时间排序的历史数据
+        """
+        self.reset()
+        for close in data['close'].to_numpy(dtype='float64'):
+            self.update(close)
+        return self
+
+    def update(self, close: float):
+        """加入一根新K线的收盘价，返回最新的指标值"""
+        raise NotImplementedError("子类必须实现update方法")
+
+    def __str__(self) -> str:
+        return f"{self.name}({', '.join(f'{k}={v}' for k, v in self.params.items())})"
+
+class _RollingSum:
+    """定长窗口的滚动和
+
+    逐次加减会累积浮点误差，每经过一个窗口长度的更新按窗口内的值重新求和一次，
+    均摊仍为常数时间；窗口内全为0时和精确为0。
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.nonzero = 0
+        self._since_resync = 0
+
+    def push(self, x: float):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            self.total -= old
+            self.nonzero -= old != 0
+        self.values.append(x)
+        self.total += x
+        self.nonzero += x != 0
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self.total = math.fsum(self.values)
+            self._since_resync = 0
+        if self.nonzero == 0:
+            self.total = 0.0
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.window
+
+class _EMAState:
+    """与 pandas ewm(span=span, adjust=False) 一致的递推状态"""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2.0 / (span + 1)
+        self.value = np.nan
+
+    def push(self, x: float) -> float:
+        if np.isnan(self.value):
+            self.value = x
+        else:
+            self.value = self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def initialize(self, values: pd.Series):
+        """用历史序列设置状态，等价于逐个 push"""
+        self.value = (values.ewm(span=self.span, adjust=False).mean().iloc[-1]
+                      if len(values) else np.nan)
+
+class IncrementalMovingAverage(IncrementalIndicator):
+    """移动平均线的增量版本，对应 MovingAverage"""
+
+    def __init__(self, window: int = 20, ma_type: str = 'SMA'):
+        """
+        Args:
+            window: 计算周期
+            ma_type: 移动平均类型，可选 'SMA'(简单移动平均), 'EMA'(指数移动平均)
+        """
+        if ma_type not in ('SMA', 'EMA'):
+            raise ValueError(f"不支持的移动平均类型: {ma_type}")
+        super().__init__('MA', {'window': window, 'type': ma_type})
+        self.window = window
+        self.ma_type = ma_type
+        self.reset()
+
+    def reset(self):
+        self._sum = _RollingSum(self.window)
+        self._ema = _EMAState(self.window)
+        self.value = np.nan
+
+    def initialize(self, data: pd.DataFrame) -> 'IncrementalMovingAverage':
+        self.reset()
+        close = data['close'].astype('float64')
+        if self.ma_type == 'EMA':
+            self._ema.initialize(close)
+            self.value = self._ema.value
+        else:
+            for x in close.iloc[-self.window:]:
+                self._sum.push(x)
+            self.value = self._sum.total / self.window if self._sum.full else np.nan
+        return self
+
+    def update(self, close: float) -> float:
+        if self.ma_type == 'EMA':
+            self.value = self._ema.push(close)
+        else:
+            self._sum.push(close)
+            self.value = self._sum.total / self.window if self._sum.full else np.nan
+        return self.value
+
+class IncrementalRSI(IncrementalIndicator):
+    """相对强弱指标的增量版本，对应 RSI"""
+
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period: RSI计算周期
+        """
+        super().__init__('RSI', {'period': period})
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self._gain = _RollingSum(self.period)
+        self._loss = _RollingSum(self.period)
+        self._last_close = np.nan
+        self.value = np.nan
+
+    def initialize(self, data: pd.DataFrame) -> 'IncrementalRSI':
+        self.reset()
+        close = data['close'].astype('float64')
+        if close.empty:
+            return self
+        # 与 RSI.calculate 一致：第一根K线的差分为NaN，按涨跌幅均为0计入窗口
+        delta = close.diff().iloc[-self.period:]
+        for d in delta:
+            self._push(d)
+        self._last_close = close.iloc[-1]
+        return self
+
+    def _push(self, delta: float):
+        self._gain.push(delta if delta > 0 else 0.0)
+        self._loss.push(-delta if delta < 0 else 0.0)
+        if not self._gain.full:
+            self.value = np.nan
+        elif self._loss.total == 0:
+            # 与 pandas 的除法一致：只涨不跌时为100，窗口内无涨跌时为NaN
+            self.value = 100.0 if self._gain.total > 0 else np.nan
+        else:
+            self.value = 100 - 100 / (1 + self._gain.total / self._loss.total)
+
+    def update(self, close: float) -> float:
+        self._push(close - self._last_close)
+        self._last_close = close
+        return self.value
+
+class IncrementalMACD(IncrementalIndicator):
+    """MACD的增量版本，对应 MACD"""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9):
+        """
+        Args:
+            fast_period: 快线周期
+            slow_period: 慢线周期
+            signal_period: 信号线周期
+        """
+        super().__init__('MACD', {
+            'fast_period': fast_period,
+            'slow_period': slow_period,
+            'signal_period': signal_period
+        })
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self.signal_period = signal_period
+        self.reset()
+
+    def reset(self):
+        self._fast = _EMAState(self.fast_period)
+        self._slow = _EMAState(self.slow_period)
+        self._signal = _EMAState(self.signal_period)
+        self.value = {'macd_line': np.nan, 'signal_line': np.nan, 'histogram': np.nan}
+
+    def _result(self) -> Dict[str, float]:
+        macd_line = self._fast.value - self._slow.value
+        self.value = {
+            'macd_line': macd_line,
+            'signal_line': self._signal.value,
+            'histogram': macd_line - self._signal.value
+        }
+        return self.value
+
+    def initialize(self, data: pd.DataFrame) -> 'IncrementalMACD':
+        self.reset()
+        close = data['close'].astype('float64')
+        if close.empty:
+            return self
+        fast = close.ewm(span=self.fast_period, adjust=False).mean()
+        slow = close.ewm(span=self.slow_period, adjust=False).mean()
+        self._fast.value = fast.iloc[-1]
+        self._slow.value = slow.iloc[-1]
+        self._signal.initialize(fast - slow)
+        self._result()
+        return self
+
+    def update(self, close: float) -> Dict[str, float]:
+        macd_line = self._fast.push(close) - self._slow.push(close)
+        self._signal.push(macd_line)
+        return self._result()
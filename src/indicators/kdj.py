@@ -0,0 +1,51 @@
+import pandas as pd
+import numpy as np
+from .base import TechnicalIndicator
+from .panel import ema, rolling_max, rolling_min
+
+class KDJ(TechnicalIndicator):
+    """随机指标(KDJ)
+    
+    RSV = (收盘价 - n日最低价) / (n日最高价 - n日最低价) × 100，n日内最高价等于最低价时
+    RSV 取50。K、D 分别为 RSV、K 的平滑（K = K昨 × (m1-1)/m1 + RSV / m1，D 同理），
+    初值均为50，J = 3K - 2D。前 n-1 个交易日各输出为NaN。
+    """
+    
+    def __init__(self, n: int = 9, m1: int = 3, m2: int = 3):
+        """
+        Args:
+            n: RSV计算周期
+            m1: K值平滑周期
+            m2: D值平滑周期
+        """
+        super().__init__('KDJ', {'n': n, 'm1': m1, 'm2': m2})
+        self.n = n
+        self.m1 = m1
+        self.m2 = m2
+        
+    def calculate(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self._calculate_vectorized(data, ['high', 'low', 'close'])
+        
+    def _smooth(self, values: np.ndarray, period: int) -> np.ndarray:
+        """以50为初值、平滑系数 1/period 的递推，从第 n-1 行开始"""
+        start = self.n - 1
+        if start >= values.shape[0]:
+            return np.full(values.shape, np.nan)
+        seeded = np.full((values.shape[0] + 1,) + values.shape[1:], np.nan)
+        seeded[start + 1:] = values[start:]
+        # 在第一个有效值之前放入初值50，递推从初值开始
+        seeded[start] = 50.0
+        out = ema(seeded, 2 * period - 1)[1:]
+        out[:start] = np.nan
+        return out
+        
+    def _calculate_compressed(self, fields, counts):
+        high, low, close = fields['high'], fields['low'], fields['close']
+        lowest = rolling_min(low, self.n)
+        highest = rolling_max(high, self.n)
+        span = highest - lowest
+        rsv = np.where(span > 0, (close - lowest) / span * 100, 50.0)
+        rsv[np.isnan(span) | np.isnan(close)] = np.nan
+        k = self._smooth(rsv, self.m1)
+        d = self._smooth(k, self.m2)
+        return {'k': k, 'd': d, 'j': 3 * k - 2 * d}
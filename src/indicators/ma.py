@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base import TechnicalIndicator
+from .panel import rolling_mean, ema
 
 class MovingAverage(TechnicalIndicator):
     """移动平均线指标"""
@@ -21,4 +22,13 @@ class MovingAverage(TechnicalIndicator):
         elif self.ma_type == 'EMA':
             return data['close'].ewm(span=self.window, adjust=False).mean()
         else:
-            raise ValueError(f"不支持的移动平均类型: {self.ma_type}") 
\ No newline at end of file
+            raise ValueError(f"不支持的移动平均类型: {self.ma_type}")
+        
+    def _calculate_compressed(self, fields, counts):
+        close = fields['close']
+        if self.ma_type == 'SMA':
+            return rolling_mean(close, self.window)
+        elif self.ma_type == 'EMA':
+            return ema(close, self.window)
+        else:
+            raise ValueError(f"不支持的移动平均类型: {self.ma_type}")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base import TechnicalIndicator
+from .panel import ema
 
 class MACD(TechnicalIndicator):
     """移动平均收敛散度指标(MACD)"""
@@ -40,4 +41,14 @@ class MACD(TechnicalIndicator):
             'macd_line': macd_line,
             'signal_line': signal_line,
             'histogram': histogram
-        }) 
\ No newline at end of file
+        })
+        
+    def _calculate_compressed(self, fields, counts):
+        close = fields['close']
+        macd_line = ema(close, self.fast_period) - ema(close, self.slow_period)
+        signal_line = ema(macd_line, self.signal_period)
+        return {
+            'macd_line': macd_line,
+            'signal_line': signal_line,
+            'histogram': macd_line - signal_line
+        }
\ No newline at end of file
@@ -0,0 +1,23 @@
+import pandas as pd
+import numpy as np
+from .base import TechnicalIndicator
+
+class OBV(TechnicalIndicator):
+    """能量潮指标(OBV)
+    
+    收盘价上涨的交易日加上当日成交量，下跌的交易日减去当日成交量，平盘不变。
+    第一个交易日为0；收盘价或成交量为NaN的交易日不改变累计值。
+    """
+    
+    def __init__(self):
+        super().__init__('OBV', {})
+        
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        return self._calculate_vectorized(data, ['close', 'volume'])
+        
+    def _calculate_compressed(self, fields, counts):
+        close, volume = fields['close'], fields['volume']
+        flow = np.zeros(close.shape)
+        flow[1:] = np.sign(close[1:] - close[:-1]) * volume[1:]
+        np.nan_to_num(flow, copy=False, nan=0.0)
+        return np.cumsum(flow, axis=0)
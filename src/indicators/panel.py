@@ -0,0 +1,168 @@
+"""
+面板指标计算
+
+面板是以日期为行、股票代码为列的二维数据（如 get_stock_daily_panel(layout='wide') 的结果）。
+停牌日在面板中为NaN。逐只股票计算时停牌日不在数据中，指标按该股票自己的交易日计算；
+面板计算保持同样的语义：先把每列的有效值稳定地移到顶部（压缩），
+在压缩后的矩阵上对所有列一次性计算，再把结果写回原来的行，停牌日保持NaN。
+"""
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+def compress(values: np.ndarray) -> Tuple[np.ndarray, tuple]:
+    """把每列的非NaN值按时间顺序移到顶部
+
+    Args:
+        values: (时间 × 股票) 数组
+
+    Returns:
+        (压缩后的数组, 布局)；压缩后第 i 行是各股票的第 i 个有效观测，有效值之后为NaN。
+        布局为 (每列的有效值个数, 有效值掩码, 每个元素在压缩后数组中的扁平下标)，
+        供 compress_like 和 scatter 使用
+    """
+    n, m = values.shape
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=0)
+    if counts.min(initial=n) == n:
+        return values, (counts, None, None)
+    # 有效值按出现顺序编号；NaN统一放到最后一行，该行对含NaN的列一定在有效值之后
+    pos = np.cumsum(valid, axis=0, dtype=np.int64)
+    pos -= 1
+    pos[~valid] = n - 1
+    pos *= m
+    pos += np.arange(m)
+    layout = (counts, valid, pos.ravel())
+    return compress_like(values, layout), layout
+
+def compress_like(values: np.ndarray, layout: tuple) -> np.ndarray:
+    """按 compress 得到的布局移动另一个字段（如最高价），与收盘价的行保持对应"""
+    counts, valid, flat = layout
+    if flat is None:
+        return values
+    compressed = np.full(values.shape, np.nan)
+    # 停牌日的元素都写到各列最后一行，值统一为NaN，重复写入不影响结果
+    compressed.ravel()[flat] = np.where(valid, values, np.nan).ravel()
+    return compressed
+
+def scatter(result: np.ndarray, layout: tuple) -> np.ndarray:
+    """把压缩矩阵上的计算结果写回原来的行，停牌日为NaN"""
+    counts, valid, flat = layout
+    if flat is None:
+        return result
+    out = np.take(result.ravel(), flat).reshape(result.shape)
+    out[~valid] = np.nan
+    return out
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """按列的滚动均值，与 pandas rolling(window).mean() 一致：窗口内有NaN时结果为NaN"""
+    n = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if window > n:
+        return out
+    nan = np.isnan(values)
+    cumsum = np.where(nan, 0.0, values)
+    np.cumsum(cumsum, axis=0, out=cumsum)
+    cumnan = np.cumsum(nan, axis=0, dtype=np.int32)
+    total = out[window - 1:]
+    total[:] = cumsum[window - 1:]
+    total[1:] -= cumsum[:n - window]
+    missing = cumnan[window - 1:]
+    missing[1:] -= cumnan[:n - window]
+    total /= window
+    total[missing > 0] = np.nan
+    return out
+
+def rolling_std(values: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """按列的滚动标准差，与 pandas rolling(window).std(ddof=ddof) 一致
+
+    由去掉每列第一个值后的滚动一阶矩、二阶矩计算，窗口内有NaN时为NaN，
+    相对误差在 1e-10 量级；窗口内值全部相同时为0。
+    """
+    shift = np.where(np.isnan(values[:1]), 0.0, values[:1])
+    centered = values - shift
+    mean = rolling_mean(centered, window)
+    var = rolling_mean(centered * centered, window) - mean * mean
+    var *= window / (window - ddof) if window > ddof else np.nan
+    np.maximum(var, 0.0, out=var, where=~np.isnan(var))
+    return np.sqrt(var)
+
+def _rolling_reduce(values: np.ndarray, window: int, reduce) -> np.ndarray:
+    out = np.full(values.shape, np.nan)
+    if window > values.shape[0]:
+        return out
+    # 窗口视图不复制数据；窗口内有NaN时结果为NaN，与 pandas 的 min_periods=window 一致
+    out[window - 1:] = reduce(np.lib.stride_tricks.sliding_window_view(values, window, axis=0), axis=-1)
+    return out
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """按列的滚动最大值，与 pandas rolling(window).max() 一致"""
+    return _rolling_reduce(values, window, np.max)
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """按列的滚动最小值，与 pandas rolling(window).min() 一致"""
+    return _rolling_reduce(values, window, np.min)
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """按列的指数移动平均，与 pandas ewm(span=span, adjust=False).mean() 一致
+
+    每列从第一个有效值开始计算；NaN只应出现在每列的开头或末尾（压缩后的面板满足该条件），
+    末尾的NaN位置沿用前一个值。span 也可以是数组，按最后一维广播（见 sweep.ema_sweep）。
+    """
+    if np.ndim(span) == 0 and values.ndim <= 2 and values[:1].size <= 16:
+        # 列很少（如单只股票）时逐行递推的开销全在Python循环上，改用 pandas 的实现，
+        # ignore_na=True 与这里的NaN语义一致；列多时按行递推更快
+        frame = pd.DataFrame(values.reshape(values.shape[0], -1))
+        return frame.ewm(span=span, adjust=False, ignore_na=True).mean().to_numpy().reshape(values.shape)
+    alpha = 2.0 / (span + 1)
+    out = np.empty(values.shape)
+    prev = values[0].astype('float64')
+    out[0] = prev
+    for t in range(1, values.shape[0]):
+        x = values[t]
+        prev = np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, prev + alpha * (x - prev)))
+        out[t] = prev
+    return out
+
+def wilder(values: np.ndarray, period: int, start: int = 0) -> np.ndarray:
+    """按列的 Wilder 平滑（平滑系数 1/period 的递推平均）
+
+    第 start+period-1 行的值为第 start 行起 period 个值的简单平均，之后按
+    avg = avg + (x - avg) / period 递推，之前为NaN。
+    """
+    first = start + period - 1
+    if first >= values.shape[0]:
+        return np.full(values.shape, np.nan)
+    seeded = np.array(values, dtype='float64')
+    seeded[:first] = np.nan
+    seeded[first] = values[start:first + 1].mean(axis=0)
+    # 2/(span+1) = 1/period
+    return ema(seeded, 2 * period - 1)
+
+def diff(values: np.ndarray) -> np.ndarray:
+    """按列的一阶差分，第一行为NaN"""
+    out = np.empty(values.shape)
+    out[:1] = np.nan
+    out[1:] = values[1:] - values[:-1]
+    return out
+
+def panel_fields(panel) -> Tuple[Dict[str, np.ndarray], object, object]:
+    """把面板统一为 {字段: (时间 × 股票) 数组}
+
+    Args:
+        panel: 列为股票代码的收盘价面板、列为 (字段, 股票代码) 的多字段面板，
+            或 (时间 × 股票) 的收盘价二维数组
+
+    Returns:
+        (字段数组, 行索引, 列索引)，输入为数组时索引为None
+    """
+    if isinstance(panel, np.ndarray):
+        if panel.ndim != 2:
+            raise ValueError("面板必须是二维数组")
+        return {'close': panel.astype('float64')}, None, None
+    if isinstance(panel.columns, pd.MultiIndex):
+        fields = panel.columns.get_level_values(0).unique()
+        codes = panel['close'].columns
+        return ({field: panel[field].reindex(columns=codes).to_numpy(dtype='float64')
+                 for field in fields}, panel.index, codes)
+    return {'close': panel.to_numpy(dtype='float64')}, panel.index, panel.columns
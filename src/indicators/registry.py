@@ -0,0 +1,129 @@
+"""
+指标注册表
+
+策略配置按名称引用指标（如 indicator: ma），名称对应一个 TechnicalIndicator 子类，
+同时登记它读取的字段和输出：
+    inputs   calculate 读取的列，策略配置可以把这些字段映射到其他列
+    outputs  单输出指标（calculate 返回Series）为 ('value',)，
+             多输出指标（返回DataFrame）为各列名
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+import pandas as pd
+from .base import TechnicalIndicator
+from .ma import MovingAverage
+from .rsi import RSI, WilderRSI
+from .macd import MACD
+from .bollinger import BollingerBands
+from .atr import ATR
+from .kdj import KDJ
+from .obv import OBV
+
+_REGISTRY: Dict[str, Tuple[Type[TechnicalIndicator], Tuple[str, ...], Tuple[str, ...]]] = {}
+
+def register_indicator(name: str,
+                       cls: Optional[Type[TechnicalIndicator]] = None,
+                       inputs: Sequence[str] = ('close',),
+                       outputs: Sequence[str] = ('value',)):
+    """注册指标，也可以作为类装饰器使用
+
+    Args:
+        name: 策略配置中引用的名称
+        cls: 指标类，构造参数即策略配置中的 params
+        inputs: calculate 读取的字段
+        outputs: 输出名
+    """
+    def decorator(cls):
+        _REGISTRY[name] = (cls, tuple(inputs), tuple(outputs))
+        return cls
+    return decorator if cls is None else decorator(cls)
+
+def get_indicator(name: str) -> Tuple[Type[TechnicalIndicator], Tuple[str, ...], Tuple[str, ...]]:
+    """返回 (指标类, 输入字段, 输出名)"""
+    if name not in _REGISTRY:
+        raise ValueError(f"未注册的指标: {name}")
+    return _REGISTRY[name]
+
+def create_indicator(name: str, params: Optional[Dict[str, Any]] = None) -> TechnicalIndicator:
+    """按名称和参数创建指标"""
+    cls = get_indicator(name)[0]
+    return cls(**(params or {}))
+
+def registered_indicators() -> List[str]:
+    """已注册的指标名称"""
+    return sorted(_REGISTRY)
+
+def indicator_inputs(config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """策略配置中一个指标节点的输入，返回 [(指标字段, 数据列)]
+
+    未在 inputs 中映射的字段读取同名列。
+    """
+    fields = get_indicator(config['indicator'])[1]
+    mapping = dict(config.get('inputs') or {})
+    unknown = set(mapping) - set(fields)
+    if unknown:
+        raise ValueError(f"指标 {config['indicator']} 没有输入字段: {', '.join(sorted(unknown))}")
+    return [(field, mapping.get(field, field)) for field in fields]
+
+def indicator_outputs(config: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """策略配置中一个指标节点的输出，返回 [(指标输出名, 写入的列名)]
+
+    outputs 可以是一个列名（单输出指标）、按输出顺序排列的列名列表，
+    或 {指标输出名: 列名}，未列出的输出不写入。
+    """
+    names = get_indicator(config['indicator'])[2]
+    outputs = config.get('outputs')
+    if not outputs:
+        raise ValueError(f"指标 {config['indicator']} 未指定 outputs")
+    if isinstance(outputs, str):
+        outputs = [outputs]
+    if isinstance(outputs, dict):
+        unknown = set(outputs) - set(names)
+        if unknown:
+            raise ValueError(f"指标 {config['indicator']} 没有输出: {', '.join(sorted(unknown))}")
+        return list(outputs.items())
+    if len(outputs) > len(names):
+        raise ValueError(f"指标 {config['indicator']} 只有 {len(names)} 个输出")
+    return list(zip(names, outputs))
+
+def calculate_outputs(name: str, params: Optional[Dict[str, Any]], data: pd.DataFrame) -> Dict[str, pd.Series]:
+    """计算指标的全部输出
+
+    Args:
+        name: 指标名称
+        params: 构造参数
+        data: 以指标字段为列名的数据
+
+    Returns:
+        {输出名: Series}
+    """
+    result = create_indicator(name, params).calculate(data)
+    if isinstance(result, pd.Series):
+        result = result.to_frame('value')
+    return {output: result[output] for output in get_indicator(name)[2]}
+
+def apply_indicator(data: pd.DataFrame, config: Dict[str, Any]) -> pd.DataFrame:
+    """按策略配置中的一个指标节点计算，并把输出写入 data
+
+    Args:
+        data: 历史数据，原地写入输出列
+        config: 指标节点配置，包含 indicator、params、inputs（可选）和 outputs
+
+    Returns:
+        写入输出列后的数据
+    """
+    outputs = indicator_outputs(config)
+    frame = pd.DataFrame({field: data[column] for field, column in indicator_inputs(config)},
+                         index=data.index)
+    values = calculate_outputs(config['indicator'], config.get('params'), frame)
+    for output, column in outputs:
+        data[column] = values[output]
+    return data
+
+register_indicator('ma', MovingAverage)
+register_indicator('rsi', RSI)
+register_indicator('macd', MACD, outputs=('macd_line', 'signal_line', 'histogram'))
+register_indicator('wilder_rsi', WilderRSI)
+register_indicator('bollinger', BollingerBands, outputs=('middle_band', 'upper_band', 'lower_band', 'std'))
+register_indicator('atr', ATR, inputs=('high', 'low', 'close'))
+register_indicator('kdj', KDJ, inputs=('high', 'low', 'close'), outputs=('k', 'd', 'j'))
+register_indicator('obv', OBV, inputs=('close', 'volume'))
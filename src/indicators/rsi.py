@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
 from .base import TechnicalIndicator
+from .panel import rolling_mean, diff, wilder
 
 class RSI(TechnicalIndicator):
     """相对强弱指标(RSI)"""
@@ -31,4 +32,43 @@ class RSI(TechnicalIndicator):
         # 计算RSI
         rsi = 100 - (100 / (1 + rs))
         
-        return rsi 
\ No newline at end of file
+        return rsi
+        
+    def _calculate_compressed(self, fields, counts):
+        delta = diff(fields['close'])
+        # 与 Series.where 一致：差分为NaN的位置按0计
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        rs = rolling_mean(gain, self.period) / rolling_mean(loss, self.period)
+        return 100 - (100 / (1 + rs))
+
+class WilderRSI(TechnicalIndicator):
+    """Wilder 平滑的相对强弱指标
+    
+    与 RSI 的简单平均不同，平均涨幅、跌幅用 Wilder 平滑：第 period 个价格变化处的值为
+    前 period 个涨跌幅的均值，之后 avg = avg + (x - avg) / period。前 period 个交易日为NaN；
+    平均跌幅为0时，平均涨幅大于0为100，否则（无涨跌）为50。
+    """
+    
+    def __init__(self, period: int = 14):
+        """
+        Args:
+            period: RSI计算周期
+        """
+        super().__init__('WilderRSI', {'period': period})
+        self.period = period
+        
+    def calculate(self, data: pd.DataFrame) -> pd.Series:
+        return self._calculate_vectorized(data, ['close'])
+        
+    def _calculate_compressed(self, fields, counts):
+        delta = diff(fields['close'])
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        # 第一行没有价格变化，从第二行开始平滑
+        avg_gain = wilder(gain, self.period, start=1)
+        avg_loss = wilder(loss, self.period, start=1)
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+        rsi = np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, 50.0), rsi)
+        rsi[np.isnan(avg_gain) | np.isnan(avg_loss)] = np.nan
+        return rsi
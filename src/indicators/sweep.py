@@ -0,0 +1,146 @@
+"""
+多周期均线扫描
+
+参数扫描（如在上百组 (短周期, 长周期) 上研究均线交叉）时，逐个周期调用
+MovingAverage(window).calculate 每次都要重新扫描一遍数据。这里对每条序列只做
+一次累计和，任意周期的简单移动平均都是两个前缀和之差，一次得到 (时间 × 周期) 矩阵：
+    sma_sweep        多个周期的简单移动平均，每个周期只需一次前缀和相减
+    ema_sweep        多个周期的指数移动平均，按时间递推，每一步同时更新所有周期
+    crossover_sweep  所有 (短周期, 长周期) 组合的均线交叉信号
+结果与 MovingAverage.calculate 一致：SMA 窗口内有NaN时为NaN；EMA 从第一个有效值开始，
+与逐只股票计算时一样，序列中间不应有NaN（停牌日先去掉）。
+"""
+from typing import Sequence, Union
+import numpy as np
+import pandas as pd
+from .panel import ema
+
+def _windows(windows: Sequence[int]) -> np.ndarray:
+    windows = np.asarray(windows, dtype=np.int64).ravel()
+    if windows.size == 0 or windows.min() < 1:
+        raise ValueError("周期必须是正整数")
+    return windows
+
+def _wrap(result: np.ndarray, close, columns):
+    """输入为Series时返回以周期为列的DataFrame，数组输入返回数组"""
+    if isinstance(close, pd.Series):
+        return pd.DataFrame(result, index=close.index, columns=columns)
+    return result
+
+def sma_sweep(close: Union[pd.Series, np.ndarray], windows: Sequence[int]):
+    """一次计算多个周期的简单移动平均
+
+    Args:
+        close: 收盘价序列，或 (时间 × 股票) 数组
+        windows: 周期列表，如 range(2, 251)
+
+    Returns:
+        (时间 × 周期) 矩阵；输入为Series时返回以周期为列的DataFrame，
+        输入为二维数组时返回 (时间 × 股票 × 周期) 数组
+    """
+    windows = _windows(windows)
+    values = np.asarray(close, dtype='float64')
+    n = values.shape[0]
+    # 按 (周期 × 时间 ...) 存放，每个周期写入连续内存，返回时把周期移到最后一维
+    out = np.full((windows.size,) + values.shape, np.nan)
+    if n:
+        nan = np.isnan(values)
+        has_nan = nan.any()
+        # 减去每条序列的第一个有效值再累加，降低长序列前缀和相减时的舍入误差
+        shift = np.take_along_axis(values, np.expand_dims(np.argmax(~nan, axis=0), 0), axis=0)[0]
+        shift = np.where(np.isnan(shift), 0.0, shift)
+        cumsum = np.zeros((n + 1,) + values.shape[1:])
+        np.cumsum(np.where(nan, 0.0, values - shift), axis=0, out=cumsum[1:])
+        cumnan = np.zeros((n + 1,) + values.shape[1:], dtype=np.int64)
+        np.cumsum(nan, axis=0, out=cumnan[1:])
+        for j, w in enumerate(windows):
+            if w > n:
+                continue
+            # 第 t 行的窗口为 (t-w, t]，即前缀和下标 t+1 与 t+1-w 之差
+            total = out[j, w - 1:]
+            np.subtract(cumsum[w:], cumsum[:n + 1 - w], out=total)
+            total /= w
+            if has_nan:
+                total[cumnan[w:] - cumnan[:n + 1 - w] > 0] = np.nan
+        out += shift
+    return _wrap(np.moveaxis(out, 0, -1), close, windows)
+
+def ema_sweep(close: Union[pd.Series, np.ndarray], windows: Sequence[int]):
+    """一次计算多个周期的指数移动平均，与 ewm(span=周期, adjust=False).mean() 一致
+
+    Args:
+        close: 收盘价序列，或 (时间 × 股票) 数组
+        windows: 周期列表
+
+    Returns:
+        与 sma_sweep 形状相同的矩阵
+    """
+    windows = _windows(windows)
+    values = np.asarray(close, dtype='float64')
+    n = values.shape[0]
+    shape = values.shape + (windows.size,)
+    if n == 0:
+        return _wrap(np.empty(shape), close, windows)
+    # 平滑系数按最后一维广播，每一步对所有周期（和股票）同时递推
+    alpha = 2.0 / (windows + 1)
+    rows_valid = (~np.isnan(values)).reshape(n, -1).all(axis=1)
+    begin = int(np.argmax(rows_valid)) if rows_valid.any() else n
+    if begin == n or not rows_valid[begin:].all():
+        # 中间有NaN时按 panel.ema 的语义逐步判断
+        return _wrap(ema(np.broadcast_to(values[..., None], shape), windows), close, windows)
+
+    out = np.empty(shape)
+    # 各序列开始的位置不同，开头部分按 panel.ema 处理
+    head = values[:begin + 1]
+    out[:begin + 1] = ema(np.broadcast_to(head[..., None], head.shape + (windows.size,)), windows)
+    prev = out[begin].copy()
+    step = np.empty_like(prev)
+    for t in range(begin + 1, n):
+        # prev += alpha * (x - prev)，原地运算避免每步分配数组
+        np.subtract(values[t][..., None], prev, out=step)
+        step *= alpha
+        prev += step
+        out[t] = prev
+    return _wrap(out, close, windows)
+
+def crossover_sweep(close: Union[pd.Series, np.ndarray],
+                    fast_windows: Sequence[int],
+                    slow_windows: Sequence[int],
+                    ma_type: str = 'SMA'):
+    """计算所有 短周期 < 长周期 组合的均线交叉信号
+
+    与 strategies/ma_crossover.yaml 的条件一致：短均线上穿长均线当天为1，
+    下穿当天为-1，其他为0。
+
+    Args:
+        close: 收盘价序列或一维数组
+        fast_windows: 短周期列表
+        slow_windows: 长周期列表
+        ma_type: 'SMA' 或 'EMA'
+
+    Returns:
+        (时间 × 组合) 的int8矩阵；输入为Series时返回列为 (短周期, 长周期) 的DataFrame
+    """
+    if ma_type not in ('SMA', 'EMA'):
+        raise ValueError(f"不支持的移动平均类型: {ma_type}")
+    fast_windows, slow_windows = _windows(fast_windows), _windows(slow_windows)
+    pairs = [(int(f), int(s)) for f in fast_windows for s in slow_windows if f < s]
+    if not pairs:
+        raise ValueError("没有短周期小于长周期的组合")
+    windows = np.unique(np.concatenate([fast_windows, slow_windows]))
+    sweep = sma_sweep if ma_type == 'SMA' else ema_sweep
+    averages = np.asarray(sweep(np.asarray(close, dtype='float64').ravel(), windows))
+    column = {w: i for i, w in enumerate(windows)}
+    fast = averages[:, [column[f] for f, _ in pairs]]
+    slow = averages[:, [column[s] for _, s in pairs]]
+
+    gap = fast - slow
+    prev = np.full(gap.shape, np.nan)
+    prev[1:] = gap[:-1]
+    # 与 pandas 的比较一致：任一均线为NaN时条件不成立
+    signal = ((gap > 0) & (prev <= 0)).astype(np.int8)
+    signal[(gap < 0) & (prev >= 0)] = -1
+    if isinstance(close, pd.Series):
+        return pd.DataFrame(signal, index=close.index,
+                            columns=pd.MultiIndex.from_tuples(pairs, names=['fast', 'slow']))
+    return signal
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 import pandas as pd
 from typing import Dict, Any
+from ..indicators.registry import apply_indicator
+from ..backtest.vectorized import positions_from_signals, strategy_returns
 
 class BaseStrategy(ABC):
     def __init__(self, config: Dict[str, Any], strategy_name: str = None):
@@ -42,11 +44,14 @@ class BaseStrategy(ABC):
         Returns:
             pd.DataFrame: 包含技术指标的数据
         """
-        # 动态执行指标计算代码
         for indicator in self.indicators:
+            # 按名称引用的指标
+            if 'indicator' in indicator:
+                data = apply_indicator(data, indicator)
+                continue
             # 准备参数
             params = indicator['params']
-            # 执行指标计算代码
+            # 动态执行指标计算代码
             exec(indicator['code'], {'data': data, 'params': params})
         return data
         
@@ -86,6 +91,8 @@ class BaseStrategy(ABC):
         # 筛选时间范围
         mask = (data.index >= start_date) & (data.index <= end_date)
         data = data[mask].copy()
+        if data.empty:
+            raise ValueError(f"{start_date} 至 {end_date} 之间没有数据")
         
         # 计算指标
         data = self.calculate_indicators(data)
@@ -117,8 +124,11 @@ class BaseStrategy(ABC):
         positions = pd.DataFrame(index=signals.index)
         
         if self.position_sizing['type'] == 'fixed':
-            position_size = self.position_sizing['value']
-            positions['position'] = signals['signal'] * position_size
+            # carry为True时持仓保持到下一个信号（卖出后空仓，allow_short为True时做空），
+            # 否则只有信号当天有仓位
+            positions['position'] = positions_from_signals(signals['signal'], self.position_sizing['value'],
+                                                           self.position_sizing.get('carry', False),
+                                                           self.position_sizing.get('allow_short', False))
             
         return positions
         
@@ -132,13 +142,5 @@ class BaseStrategy(ABC):
         Returns:
             pd.Series: 收益序列
         """
-        returns = pd.Series(index=data.index)
-        returns.iloc[0] = 0
-        
-        for i in range(1, len(data)):
-            # 计算每日收益
-            daily_return = (data['close'].iloc[i] / data['close'].iloc[i-1] - 1)
-            # 考虑仓位后的收益
-            returns.iloc[i] = daily_return * positions['position'].iloc[i-1]
-            
-        return returns 
\ No newline at end of file
+        # 每日涨跌幅乘以前一天的仓位，第一天为0
+        return strategy_returns(data['close'], positions['position']) 
\ No newline at end of file
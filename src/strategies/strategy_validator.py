@@ -4,6 +4,7 @@ import plotly.graph_objects as go
 import akshare as ak
 from typing import Dict, Tuple
 from .base_strategy import BaseStrategy
+from ..indicators.registry import indicator_inputs, indicator_outputs
 
 class StrategyValidator:
     """策略验证器，用于验证策略配置和执行回测"""
@@ -44,7 +45,16 @@ class StrategyValidator:
             for indicator in self.strategy.config['indicators']:
                 if not isinstance(indicator, dict):
                     return False, "指标配置项必须是字典格式"
-                if not all(key in indicator for key in ['name', 'code', 'params']):
+                if 'indicator' in indicator:
+                    # 按名称引用的指标，检查名称、输入和输出
+                    if 'name' not in indicator:
+                        return False, "指标配置不完整"
+                    try:
+                        indicator_inputs(indicator)
+                        indicator_outputs(indicator)
+                    except ValueError as e:
+                        return False, str(e)
+                elif not all(key in indicator for key in ['name', 'code', 'params']):
                     return False, "指标配置不完整"
             
             # 检查信号配置
@@ -70,6 +80,10 @@ class StrategyValidator:
                     return False, "仓位值必须是数字"
                 if not 0 < value <= 1:
                     return False, "仓位值必须在 0 到 1 之间"
+                if not isinstance(self.strategy.config['position_sizing'].get('carry', False), bool):
+                    return False, "carry 必须是布尔值"
+                if not isinstance(self.strategy.config['position_sizing'].get('allow_short', False), bool):
+                    return False, "allow_short 必须是布尔值"
             
             return True, "策略配置验证通过"
             
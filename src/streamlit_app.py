@@ -186,7 +186,8 @@ if data is not None:
             results = engine.backtest(
                 data,
                 start_date=start_date.strftime("%Y-%m-%d"),
-                end_date=end_date.strftime("%Y-%m-%d")
+                end_date=end_date.strftime("%Y-%m-%d"),
+                strategies=[strategy.split(' ')[0] for strategy in selected_strategy_names]
             )
             
             # 创建标签页
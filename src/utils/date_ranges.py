@@ -0,0 +1,51 @@
+"""
+日期区间工具
+
+区间均为按天计的闭区间 (start, end)，相邻区间（前一个的end与后一个的start相差一天）视为连续。
+"""
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+DateRange = Tuple[datetime, datetime]
+
+ONE_DAY = timedelta(days=1)
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """合并重叠或相邻的区间，返回按开始日期排序的结果"""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + ONE_DAY:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def missing_ranges(start: datetime, end: datetime, covered: List[DateRange]) -> List[DateRange]:
+    """计算 [start, end] 中未被 covered 覆盖的区间
+
+    Args:
+        start: 开始日期
+        end: 结束日期
+        covered: 已覆盖的区间列表
+
+    Returns:
+        缺失区间列表（可能包含头部、尾部和中间空洞）
+    """
+    missing: List[DateRange] = []
+    cursor = start
+    for cov_start, cov_end in merge_ranges(covered):
+        if cov_end < cursor:
+            continue
+        if cov_start > end:
+            break
+        if cov_start > cursor:
+            missing.append((cursor, cov_start - ONE_DAY))
+        cursor = cov_end + ONE_DAY
+        if cursor > end:
+            return missing
+    if cursor <= end:
+        missing.append((cursor, end))
+    return missing
@@ -0,0 +1,107 @@
+"""
+紧凑数据类型
+
+全市场面板（数千只股票 × 多年交易日）按默认的 float64 价格、字符串代码保存时占用数GB内存。
+紧凑模式把数据转换为：
+    价格、指标    float32
+    成交量        int64（长表中全部为整数时；宽面板有停牌NaN，为float32）
+    股票代码      category
+    日期          int64，自1970-01-01起的纳秒数，pd.to_datetime 可直接还原
+
+与 float64 结果相比的误差：
+    float32 的有效位为24位，每个值的舍入相对误差不超过 2**-24（约6e-8）。价格低于
+    80000元时，紧凑价格四舍五入到0.01元可还原原始的两位小数价格。
+    指标在 float64 下计算后再转换（TechnicalIndicator.calculate_panel(compact=True)），
+    误差只有这一次舍入，相对误差同样不超过 2**-24。
+    用紧凑价格计算指标时还要加上输入的舍入误差：均线、布林带、ATR等线性指标的绝对误差
+    不超过 2**-24 乘以窗口内价格的最大绝对值（数量级1e-6元）；RSI、KDJ等由价格差的比值
+    得到的指标在价格变动很小时误差会放大，模拟行情下在1e-4到3e-4之间（0到100的刻度）。
+    需要逐位复现 float64 回测结果时不要使用紧凑模式。
+"""
+from typing import Dict, Iterable
+import numpy as np
+import pandas as pd
+
+# 按 float32 保存的价格列
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'amount')
+
+# float32 的舍入相对误差上限
+FLOAT32_RELATIVE_ERROR = 2.0 ** -24
+
+def compact_volume(volume: pd.Series) -> pd.Series:
+    """成交量全部为整数时转换为int64，有NaN或小数时为float32"""
+    values = volume.to_numpy(dtype='float64')
+    if not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+        return pd.Series(values.astype(np.int64), index=volume.index, name=volume.name)
+    return volume.astype(np.float32)
+
+def compact_bars(df: pd.DataFrame, price_columns: Iterable[str] = PRICE_COLUMNS) -> pd.DataFrame:
+    """把长表格式的日线数据转换为紧凑类型，返回新的DataFrame
+
+    Args:
+        df: 包含 date、价格列，可选 code、volume 列的日线数据
+        price_columns: 转换为float32的列
+    """
+    if df.empty:
+        return df
+    df = df.copy()
+    for column in price_columns:
+        if column in df.columns:
+            df[column] = df[column].astype(np.float32)
+    if 'volume' in df.columns:
+        df['volume'] = compact_volume(df['volume'])
+    if 'code' in df.columns:
+        df['code'] = df['code'].astype('category')
+    if 'date' in df.columns:
+        df['date'] = to_epoch(df['date'])
+    return df
+
+def to_epoch(dates) -> np.ndarray:
+    """日期转换为int64纳秒时间戳"""
+    return pd.to_datetime(dates).to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+def from_epoch(values) -> pd.DatetimeIndex:
+    """int64纳秒时间戳还原为日期"""
+    return pd.DatetimeIndex(np.asarray(values, dtype=np.int64).view('datetime64[ns]'))
+
+def compact_values(values):
+    """把指标结果（Series、DataFrame、数组或 {输出: 数组}）中的浮点数转换为float32"""
+    if isinstance(values, dict):
+        return {name: compact_values(v) for name, v in values.items()}
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float32) if values.dtype.kind == 'f' else values
+    if isinstance(values, pd.DataFrame):
+        floats = values.select_dtypes('floating').columns
+        if len(floats) == len(values.columns):
+            return pd.DataFrame(values.to_numpy(dtype=np.float32), index=values.index, columns=values.columns)
+        return values.astype({column: np.float32 for column in floats})
+    if isinstance(values, pd.Series) and values.dtype.kind == 'f':
+        return values.astype(np.float32)
+    return values
+
+def memory_usage(obj) -> int:
+    """DataFrame、Series、数组或其字典占用的字节数，包括字符串对象和索引"""
+    if isinstance(obj, dict):
+        return sum(memory_usage(v) for v in obj.values())
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    return int(np.asarray(obj).nbytes)
+
+def memory_report(pairs: Dict[str, tuple]) -> pd.DataFrame:
+    """对比默认类型与紧凑类型的内存占用
+
+    Args:
+        pairs: {名称: (默认类型的数据, 紧凑类型的数据)}
+
+    Returns:
+        以名称为索引的DataFrame，列为 original_mb、compact_mb、ratio（紧凑 / 默认）
+    """
+    rows = {}
+    for name, (original, compact) in pairs.items():
+        original_bytes, compact_bytes = memory_usage(original), memory_usage(compact)
+        rows[name] = {'original_mb': original_bytes / 2 ** 20,
+                      'compact_mb': compact_bytes / 2 ** 20,
+                      'ratio': compact_bytes / original_bytes if original_bytes else np.nan}
+    return pd.DataFrame.from_dict(rows, orient='index')
@@ -0,0 +1,50 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.adjust import apply_adj_factor
+
+@pytest.fixture
+def bars():
+    """两只股票的不复权日线，顺序打乱"""
+    dates = pd.to_datetime(['2024-01-02', '2024-01-03', '2024-01-04', '2024-01-05'])
+    df = pd.DataFrame({
+        'code': ['000001'] * 4 + ['000002'] * 4,
+        'date': list(dates) * 2,
+        'open': 10.0, 'high': 11.0, 'low': 9.0, 'close': 10.0,
+        'volume': 100.0
+    })
+    return df.iloc[[3, 0, 6, 1, 5, 2, 7, 4]].reset_index(drop=True)
+
+@pytest.fixture
+def factors():
+    """000001 在 2024-01-04 除权，因子从1.0变为2.0；000002 没有因子"""
+    return pd.DataFrame({
+        'code': ['000001', '000001'],
+        'date': pd.to_datetime(['2023-01-01', '2024-01-04']),
+        'factor': [1.0, 2.0]
+    })
+
+def test_hfq_and_qfq(bars, factors):
+    """测试后复权乘以当日因子，前复权再除以最新因子"""
+    hfq = apply_adj_factor(bars, factors, 'hfq')
+    qfq = apply_adj_factor(bars, factors, 'qfq')
+    first = bars['code'] == '000001'
+    after = bars['date'] >= '2024-01-04'
+
+    np.testing.assert_allclose(hfq.loc[first & after, 'close'], 20.0)
+    np.testing.assert_allclose(hfq.loc[first & ~after, 'close'], 10.0)
+    np.testing.assert_allclose(qfq.loc[first & after, 'close'], 10.0)
+    np.testing.assert_allclose(qfq.loc[first & ~after, 'open'], 5.0)
+    # 没有因子的股票和成交量不变
+    pd.testing.assert_frame_equal(qfq[~first], bars[~first])
+    pd.testing.assert_series_equal(qfq['volume'], bars['volume'])
+
+def test_no_adjust(bars, factors):
+    """测试不复权返回原始数据，不支持的复权方式报错"""
+    assert apply_adj_factor(bars, factors, '') is bars
+    with pytest.raises(ValueError):
+        apply_adj_factor(bars, factors, 'xfq')
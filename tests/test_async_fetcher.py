@@ -0,0 +1,81 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import threading
+import time
+import pandas as pd
+import pytest
+from src.data.fetcher import StockDataFetcherBase, DataFetchError
+from src.data.async_fetcher import AsyncAkshareStockDataFetcher
+
+class SlowFetcher(StockDataFetcherBase):
+    """每次请求耗时固定的同步桩数据源，记录最大并发数"""
+    
+    def __init__(self, delay):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        
+    def get_stock_list(self):
+        return pd.DataFrame()
+        
+    def get_stock_daily(self, symbol, start_date=None, end_date=None, raise_on_error=False):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return pd.DataFrame({'date': [pd.Timestamp(start_date)], 'close': [1.0]})
+        
+    def get_stock_realtime(self, symbol):
+        return pd.DataFrame()
+        
+    def get_stock_financial(self, symbol):
+        return pd.DataFrame()
+
+def test_async_daily_many_concurrency():
+    """测试并发执行且不超过并发上限"""
+    sync_fetcher = SlowFetcher(delay=0.1)
+    fetcher = AsyncAkshareStockDataFetcher(sync_fetcher, max_concurrency=4)
+    symbols = [f'{i:06d}' for i in range(8)]
+    
+    async def run():
+        return [item async for item in fetcher.get_stock_daily_many(symbols, '2024-01-02', '2024-01-31')]
+    
+    start = time.monotonic()
+    results = asyncio.run(run())
+    elapsed = time.monotonic() - start
+    fetcher.close()
+    
+    assert sorted(symbol for symbol, _, _ in results) == symbols
+    assert all(error is None for _, _, error in results)
+    assert sync_fetcher.max_active == 4
+    assert elapsed < 0.1 * len(symbols)
+
+def test_async_fetcher_reused_across_event_loops():
+    """测试同一个实例在多次 asyncio.run() 中复用，信号量不跨事件循环"""
+    fetcher = AsyncAkshareStockDataFetcher(SlowFetcher(delay=0.02), max_concurrency=1)
+    symbols = ['000001', '000002', '000003']
+    
+    async def run():
+        return [item async for item in fetcher.get_stock_daily_many(symbols, '2024-01-02', '2024-01-31')]
+    
+    for _ in range(2):
+        results = asyncio.run(run())
+        assert all(error is None for _, _, error in results)
+    fetcher.close()
+
+def test_async_daily_timeout():
+    """测试超时后返回空数据或抛出 DataFetchError"""
+    fetcher = AsyncAkshareStockDataFetcher(SlowFetcher(delay=0.5), timeout=0.05)
+    
+    df = asyncio.run(fetcher.get_stock_daily('000001', '2024-01-02', '2024-01-31'))
+    assert df.empty
+    with pytest.raises(DataFetchError):
+        asyncio.run(fetcher.get_stock_daily('000001', '2024-01-02', '2024-01-31',
+                                            raise_on_error=True))
+    fetcher.close()
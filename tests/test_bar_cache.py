@@ -0,0 +1,96 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.bar_cache import MmapBarCache
+
+@pytest.fixture
+def daily_data():
+    """生成测试用的日线数据"""
+    dates = pd.date_range('2024-01-01', periods=20, freq='B')
+    prices = np.linspace(10, 12, len(dates))
+    return pd.DataFrame({
+        'date': dates,
+        'open': prices,
+        'high': prices * 1.01,
+        'low': prices * 0.99,
+        'close': prices,
+        'volume': np.arange(len(dates)) * 100.0
+    })
+
+def test_refresh_and_load(tmp_path, daily_data):
+    """测试缓存写入后按日期范围读取"""
+    cache = MmapBarCache(str(tmp_path))
+    cache.refresh('000001', daily_data)
+
+    df = cache.load('000001', '2024-01-08', '2024-01-12')
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume']
+    assert df.index[0] == pd.Timestamp('2024-01-08')
+    assert df.index[-1] == pd.Timestamp('2024-01-12')
+    expected = daily_data.set_index('date').loc['2024-01-08':'2024-01-12', 'close']
+    np.testing.assert_array_equal(df['close'].to_numpy(), expected.to_numpy())
+
+def test_load_is_zero_copy(tmp_path, daily_data):
+    """测试读取结果直接引用只读的映射内存"""
+    cache = MmapBarCache(str(tmp_path))
+    cache.refresh('000001', daily_data)
+
+    df = cache.load('000001')
+    assert len(df) == len(daily_data)
+    assert not df['close'].to_numpy().flags.writeable
+    with pytest.raises(ValueError):
+        df['close'].to_numpy()[0] = 0
+
+def test_invalidate(tmp_path, daily_data):
+    """测试删除缓存"""
+    cache = MmapBarCache(str(tmp_path))
+    cache.refresh('000001', daily_data)
+    cache.invalidate('000001')
+    assert not cache.exists('000001')
+    assert cache.load('000001').empty
+
+def test_concurrent_refresh(tmp_path, daily_data):
+    """测试多个线程同时刷新同一股票时缓存文件完整，不残留临时文件"""
+    cache = MmapBarCache(str(tmp_path))
+    versions = [daily_data.iloc[:n] for n in (5, 10, 20)]
+    errors = []
+    
+    def refresh(df):
+        try:
+            for _ in range(50):
+                cache.refresh('000001', df)
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=refresh, args=(df,)) for df in versions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert os.listdir(str(tmp_path)) == ['000001.npy']
+    df = cache.load('000001')
+    assert len(df) in (5, 10, 20)
+    np.testing.assert_array_equal(df['close'].to_numpy(), daily_data['close'].to_numpy()[:len(df)])
+
+def test_failed_refresh_removes_tmp(tmp_path, daily_data, monkeypatch):
+    """测试写入失败时删除临时文件，保留原有缓存"""
+    cache = MmapBarCache(str(tmp_path))
+    cache.refresh('000001', daily_data)
+    
+    def fail(path, matrix):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise OSError('disk full')
+    
+    monkeypatch.setattr(np, 'save', fail)
+    with pytest.raises(OSError):
+        cache.refresh('000001', daily_data.iloc[:5])
+    assert os.listdir(str(tmp_path)) == ['000001.npy']
+    assert len(cache.load('000001')) == len(daily_data)
+
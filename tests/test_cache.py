@@ -0,0 +1,54 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from datetime import datetime, timedelta
+from src.data.cache import LRUCache, estimate_size
+
+def test_lru_eviction_by_entries():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1  # a变为最近使用
+    cache.put('c', 3)
+    
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+def test_lru_eviction_by_bytes():
+    df = pd.DataFrame({'close': range(100)})
+    size = estimate_size(df)
+    cache = LRUCache(max_bytes=int(size * 2.5))
+    for key in 'abc':
+        cache.put(key, df)
+    
+    stats = cache.stats()
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= cache.max_bytes
+    assert cache.get('a') is None
+
+def test_lru_expiration():
+    cache = LRUCache()
+    cache.put('old', 1, expires_at=datetime.now() - timedelta(seconds=1))
+    cache.put('new', 2, expires_at=datetime.now() + timedelta(minutes=5))
+    
+    assert cache.get('old') is None
+    assert cache.get('new') == 2
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['expirations'] == 1
+
+def test_lru_invalidate_where():
+    cache = LRUCache()
+    cache.put(('daily', '000001', '2024-01-01'), 1)
+    cache.put(('daily', '000001', '2024-02-01'), 2)
+    cache.put(('daily', '000002', '2024-01-01'), 3)
+    
+    assert cache.invalidate_where(lambda key: key[1] == '000001') == 2
+    assert len(cache) == 1
+    assert cache.get(('daily', '000002', '2024-01-01')) == 3
+
@@ -4,8 +4,78 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 from src.data.manager import StockDataManager
+from src.data.models import init_db, create_db_engine
+from src.data.db_manager import DatabaseManager
+from src.data.bar_store import ParquetBarStore
+from src.data.fetcher import StockDataFetcherBase, DataFetchError
+
+class StubFetcher(StockDataFetcherBase):
+    """本地桩数据源：按工作日生成日线数据，并记录每次请求的日期区间"""
+    
+    def __init__(self):
+        self.daily_calls = []
+        self.realtime_calls = 0
+        self.fail = False
+        self.factors = pd.DataFrame(columns=['date', 'factor'])
+        
+    def get_stock_list(self):
+        return pd.DataFrame({'code': ['000001'], 'name': ['平安银行']})
+        
+    def get_stock_daily(self, symbol, start_date=None, end_date=None, raise_on_error=False):
+        self.daily_calls.append((start_date, end_date))
+        if self.fail:
+            if raise_on_error:
+                raise DataFetchError('stub failure')
+            return pd.DataFrame()
+        dates = pd.date_range(start_date, end_date, freq='B')
+        return pd.DataFrame({
+            'date': dates,
+            'open': 10.0, 'high': 11.0, 'low': 9.0, 'close': 10.5, 'volume': 1000.0
+        })
+        
+    def get_adj_factor(self, symbol, raise_on_error=False):
+        return self.factors
+        
+    def get_stock_realtime(self, symbol):
+        self.realtime_calls += 1
+        return pd.DataFrame([{'code': symbol.split('.')[0], 'name': '平安银行',
+                              'price': 10.0, 'change': 0.5, 'volume': 1000.0}])
+        
+    def get_stock_financial(self, symbol):
+        return pd.DataFrame()
+
+@pytest.fixture
+def stub_manager(tmp_path):
+    """使用桩数据源和临时数据库的数据管理器"""
+    engine = create_db_engine(str(tmp_path / 'test.db'))
+    return StockDataManager(bar_cache_dir=str(tmp_path / 'bar_cache'),
+                            fetcher=StubFetcher(),
+                            db=DatabaseManager(engine))
+
+@pytest.fixture(params=['sqlite', 'parquet'])
+def bar_store(request, tmp_path):
+    """分别使用SQLite和Parquet日线存储后端"""
+    if request.param == 'sqlite':
+        engine = create_db_engine(str(tmp_path / 'test.db'))
+        init_db(engine)
+        return DatabaseManager(engine)
+    return ParquetBarStore(str(tmp_path / 'parquet'))
+
+@pytest.fixture
+def daily_data():
+    """生成测试用的日线数据"""
+    dates = pd.date_range('2023-12-25', '2024-01-10', freq='B')
+    return pd.DataFrame({
+        'date': dates,
+        'open': range(len(dates)),
+        'high': range(1, len(dates) + 1),
+        'low': range(len(dates)),
+        'close': [float(i) + 0.5 for i in range(len(dates))],
+        'volume': [1000.0] * len(dates)
+    })
 
 def test_stock_list():
     """测试获取股票列表功能"""
@@ -20,9 +90,10 @@ def test_stock_list():
     required_columns = ['code', 'name']
     assert all(col in stock_list.columns for col in required_columns)
 
-def test_stock_daily():
+@pytest.mark.parametrize('backend', ['sqlite', 'parquet'])
+def test_stock_daily(backend):
     """测试获取日线数据功能"""
-    manager = StockDataManager()
+    manager = StockDataManager(bar_backend=backend)
     
     # 设置测试时间范围
     end_date = datetime.now().strftime('%Y-%m-%d')
@@ -66,4 +137,241 @@ def test_stock_financial():
     assert not financial.empty
     # 验证包含必要的列
     required_columns = ['code', 'name', 'report_date']
-    assert all(col in financial.columns for col in required_columns) 
\ No newline at end of file
+    assert all(col in financial.columns for col in required_columns) 
+
+def test_bar_store_daily(bar_store, daily_data):
+    """测试日线存储的日期过滤、列投影和覆盖写入"""
+    bar_store.save_stock_daily('000001', daily_data)
+    
+    df = bar_store.get_stock_daily('000001', '2024-01-01', '2024-01-31')
+    assert list(df.columns) == ['date', 'open', 'high', 'low', 'close', 'volume']
+    assert df['date'].min() == pd.Timestamp('2024-01-01')
+    assert len(df) == (daily_data['date'] >= '2024-01-01').sum()
+    assert pd.api.types.is_datetime64_any_dtype(df['date'])
+    
+    # 列投影
+    df = bar_store.get_stock_daily('000001', '2024-01-01', '2024-01-31', columns=['close'])
+    assert list(df.columns) == ['date', 'close']
+    
+    # 重复保存同一日期时覆盖而不是追加
+    updated = daily_data.tail(1).assign(close=99.0)
+    bar_store.save_stock_daily('000001', updated)
+    df = bar_store.get_stock_daily('000001', '2023-01-01', '2024-12-31')
+    assert len(df) == len(daily_data)
+    assert df['close'].iloc[-1] == 99.0
+
+def test_bar_store_compact(bar_store, daily_data):
+    """测试各存储后端的紧凑读取结果一致"""
+    bar_store.save_stock_daily('000001', daily_data)
+    df = bar_store.get_stock_daily('000001', '2024-01-01', '2024-01-31', compact=True)
+    assert df['close'].dtype == np.float32 and df['date'].dtype == np.int64
+    assert df['volume'].dtype == np.int64
+    full = bar_store.get_stock_daily('000001', '2024-01-01', '2024-01-31')
+    pd.testing.assert_series_equal(pd.to_datetime(df['date']), full['date'])
+
+def test_parquet_ignores_leftover_tmp(tmp_path, daily_data):
+    """测试写入中断残留的临时文件不会被批量读取扫描到"""
+    store = ParquetBarStore(str(tmp_path / 'parquet'))
+    store.save_stock_daily('000001', daily_data)
+    partition = os.path.dirname(store._path('000001'))
+    assert os.listdir(partition) == ['bars.parquet']
+    # 模拟写入一半时进程退出
+    with open(os.path.join(partition, '.bars.1.1.tmp'), 'wb') as f:
+        f.write(b'PAR1 partial')
+    df = store.get_stock_daily_panel(None, '2023-01-01', '2024-12-31')
+    assert len(df) == len(daily_data)
+
+def test_bar_store_panel(bar_store, daily_data):
+    """测试多只股票批量读取"""
+    bar_store.save_stock_daily('000001', daily_data)
+    bar_store.save_stock_daily('000002', daily_data.assign(close=daily_data['close'] * 2))
+    bar_store.save_stock_daily('000003', daily_data)
+    
+    df = bar_store.get_stock_daily_panel(['000001', '000002'], '2024-01-01', '2024-01-31',
+                                         columns=['close'])
+    assert set(df['code']) == {'000001', '000002'}
+    assert {'code', 'date', 'close'} <= set(df.columns)
+    assert len(df) == 2 * (daily_data['date'] >= '2024-01-01').sum()
+
+def test_bar_store_panel_wide(bar_store, daily_data):
+    """测试 (date × 股票代码) 面板格式，缺失日期为NaN"""
+    bar_store.save_stock_daily('000001', daily_data)
+    bar_store.save_stock_daily('000002', daily_data.iloc[1:].assign(close=daily_data['close'] * 2))
+    
+    panel = bar_store.get_stock_daily_panel(None, '2023-12-01', '2024-01-31',
+                                            columns=['close'], layout='wide')
+    assert list(panel.columns) == ['000001', '000002']
+    assert len(panel) == len(daily_data)
+    assert np.isnan(panel['000002'].iloc[0])
+    np.testing.assert_allclose(panel['000002'].iloc[1:], daily_data['close'].iloc[1:] * 2)
+    
+    panel = bar_store.get_stock_daily_panel(['000001'], '2023-12-01', '2024-01-31',
+                                            columns=['open', 'close'], layout='wide')
+    assert list(panel.columns) == [('open', '000001'), ('close', '000001')]
+    np.testing.assert_allclose(panel['close']['000001'], daily_data['close'])
+
+def test_stock_daily_fetches_only_gaps(stub_manager):
+    """测试只拉取本地缺失的日期区间"""
+    fetcher = stub_manager.fetcher
+    
+    df = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-20')
+    assert fetcher.daily_calls == [('2024-01-10', '2024-01-20')]
+    assert len(df) == len(pd.date_range('2024-01-10', '2024-01-20', freq='B'))
+    
+    # 完全覆盖的区间不再请求
+    stub_manager.get_stock_daily('000001', '2024-01-12', '2024-01-18')
+    assert len(fetcher.daily_calls) == 1
+    
+    # 头部和尾部分别补齐
+    fetcher.daily_calls.clear()
+    df = stub_manager.get_stock_daily('000001', '2024-01-01', '2024-01-31')
+    assert fetcher.daily_calls == [('2024-01-01', '2024-01-09'), ('2024-01-21', '2024-01-31')]
+    assert len(df) == len(pd.date_range('2024-01-01', '2024-01-31', freq='B'))
+
+def test_coverage_per_bar_backend(tmp_path, monkeypatch):
+    """测试同步区间按存储后端分别记录，切换后端时重新获取数据"""
+    from src.config import settings
+    monkeypatch.setattr(settings, 'PARQUET_DIR', str(tmp_path / 'parquet'))
+    db = DatabaseManager(create_db_engine(str(tmp_path / 'test.db')))
+    managers = {backend: StockDataManager(bar_backend=backend, bar_cache_dir=str(tmp_path / 'bar_cache'),
+                                          fetcher=StubFetcher(), db=db)
+                for backend in ('sqlite', 'parquet')}
+    
+    sqlite_df = managers['sqlite'].get_stock_daily('000001', '2024-01-10', '2024-01-19', adjust='')
+    assert len(sqlite_df) == 8
+    parquet_df = managers['parquet'].get_stock_daily('000001', '2024-01-10', '2024-01-19', adjust='')
+    assert managers['parquet'].fetcher.daily_calls == [('2024-01-10', '2024-01-19')]
+    pd.testing.assert_frame_equal(parquet_df, sqlite_df)
+    
+    # 各后端已同步的区间不再重复获取
+    managers['sqlite'].memory_cache.clear()
+    managers['sqlite'].get_stock_daily('000001', '2024-01-10', '2024-01-19', adjust='')
+    assert len(managers['sqlite'].fetcher.daily_calls) == 1
+    assert db.get_daily_coverage('000001') == db.get_daily_coverage(
+        '000001', managers['parquet'].bar_store.coverage_key)
+
+def test_load_daily_bars_extends_cache(stub_manager):
+    """测试内存映射缓存在请求更晚的结束日期时补齐数据并重建"""
+    fetcher = stub_manager.fetcher
+    bars = stub_manager.load_daily_bars('000001', '2024-01-01', '2024-01-12')
+    assert bars.index[-1] == pd.Timestamp('2024-01-12')
+    
+    bars = stub_manager.load_daily_bars('000001', '2024-01-01', '2024-01-31')
+    assert fetcher.daily_calls[-1] == ('2024-01-13', '2024-01-31')
+    assert len(bars) == len(pd.date_range('2024-01-01', '2024-01-31', freq='B'))
+    
+    # 已覆盖的区间直接读取缓存
+    stub_manager.load_daily_bars('000001', '2024-01-05', '2024-01-20')
+    assert len(fetcher.daily_calls) == 2
+
+def test_stock_daily_adjust_on_read(stub_manager):
+    """测试本地保存不复权数据，复权价格按因子在读取时计算，因子变化不重新拉取日线"""
+    fetcher = stub_manager.fetcher
+    fetcher.factors = pd.DataFrame({'date': pd.to_datetime(['2024-01-01', '2024-01-15']),
+                                    'factor': [1.0, 2.0]})
+    
+    raw = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-19', adjust='')
+    qfq = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-19')
+    hfq = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-19', adjust='hfq')
+    assert (raw['close'] == 10.5).all()
+    before = qfq['date'] < '2024-01-15'
+    assert (qfq.loc[before, 'close'] == 5.25).all() and (qfq.loc[~before, 'close'] == 10.5).all()
+    assert (hfq.loc[~before, 'close'] == 21.0).all()
+    
+    # 新的除权只更新因子
+    fetcher.factors = pd.DataFrame({'date': pd.to_datetime(['2024-01-01', '2024-01-15', '2024-01-18']),
+                                    'factor': [1.0, 2.0, 4.0]})
+    stub_manager.cache_time['adj_factor'] = timedelta(0)
+    stub_manager.memory_cache.clear()
+    qfq = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-19')
+    assert len(fetcher.daily_calls) == 1
+    assert qfq['close'].tolist() == [2.625] * 3 + [5.25] * 3 + [10.5] * 2
+    
+    panel = stub_manager.get_stock_daily_panel(['000001'], '2024-01-10', '2024-01-19',
+                                               columns=['close'], layout='wide')
+    assert panel['000001'].tolist() == qfq['close'].tolist()
+
+def test_period_bars_incremental(stub_manager):
+    """测试周线由日线合成、增量更新，前复权按最新因子换算"""
+    fetcher = stub_manager.fetcher
+    fetcher.factors = pd.DataFrame({'date': pd.to_datetime(['2024-01-01', '2024-01-15']),
+                                    'factor': [1.0, 2.0]})
+    
+    weekly = stub_manager.get_stock_period_bars('000001', 'W', '2024-01-01', '2024-01-26')
+    assert weekly['date'].dt.strftime('%m-%d').tolist() == ['01-05', '01-12', '01-19', '01-26']
+    assert weekly['close'].tolist() == [5.25, 5.25, 10.5, 10.5]
+    assert weekly['volume'].tolist() == [5000.0] * 4
+    hfq = stub_manager.get_stock_period_bars('000001', 'W', '2024-01-01', '2024-01-26', adjust='hfq')
+    assert hfq['close'].tolist() == [10.5, 10.5, 21.0, 21.0]
+    
+    # 新的日线只补齐缺失区间，已合成的周线保留
+    fetcher.daily_calls.clear()
+    weekly = stub_manager.get_stock_period_bars('000001', 'W', '2024-01-01', '2024-02-09')
+    assert fetcher.daily_calls == [('2024-01-27', '2024-02-09')]
+    assert len(weekly) == 6
+    
+    data = stub_manager.get_multi_timeframe_bars('000001', '2024-01-10', '2024-02-09', periods=['W'])
+    assert data.index[0] == pd.Timestamp('2024-01-10')
+    # 区间内第一周尚未结束时使用上一周的数据
+    assert data.loc['2024-01-10', 'close_w'] == 5.25
+    assert data.loc['2024-02-09', 'close_w'] == 10.5
+
+def test_period_bars_partial_period_replaced(stub_manager):
+    """测试未结束的周期补齐后替换原来的部分K线，每个周期只有一根K线"""
+    weekly = stub_manager.get_stock_period_bars('000001', 'W', '2024-01-15', '2024-01-24')
+    assert weekly['date'].dt.strftime('%m-%d').tolist() == ['01-19', '01-24']
+    assert weekly['volume'].iloc[-1] == 3000.0
+    
+    weekly = stub_manager.get_stock_period_bars('000001', 'W', '2024-01-15', '2024-01-26')
+    assert weekly['date'].dt.strftime('%m-%d').tolist() == ['01-19', '01-26']
+    assert weekly['volume'].tolist() == [5000.0, 5000.0]
+    
+    stored = stub_manager.db.get_period_bars('000001', 'W')
+    assert stored['date'].dt.strftime('%m-%d').tolist() == ['01-19', '01-26']
+    
+    data = stub_manager.get_multi_timeframe_bars('000001', '2024-01-22', '2024-01-26', periods=['W'])
+    assert data['volume_w'].tolist() == [5000.0] * 5
+
+def test_stock_daily_failed_gap_is_retried(stub_manager):
+    """测试请求失败的区间不记为已同步"""
+    fetcher = stub_manager.fetcher
+    fetcher.fail = True
+    assert stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-20').empty
+    
+    fetcher.fail = False
+    df = stub_manager.get_stock_daily('000001', '2024-01-10', '2024-01-20')
+    assert len(fetcher.daily_calls) == 2
+    assert not df.empty
+
+def test_realtime_memory_cache(stub_manager):
+    """测试实时行情命中内存缓存，不再访问数据库和API"""
+    fetcher = stub_manager.fetcher
+    df = stub_manager.get_stock_realtime('000001.SZ')
+    assert fetcher.realtime_calls == 1
+    
+    df.loc[0, 'price'] = 0  # 修改返回值不影响缓存
+    again = stub_manager.get_stock_realtime('000001.SZ')
+    assert fetcher.realtime_calls == 1
+    assert again.loc[0, 'price'] == 10.0
+    assert stub_manager.cache_stats()['hits'] == 1
+
+def test_realtime_ttl_expired(stub_manager):
+    """测试数据库中过期的实时行情会重新获取"""
+    fetcher = stub_manager.fetcher
+    stub_manager.get_stock_realtime('000001.SZ')
+    stub_manager.memory_cache.clear()
+    
+    # 数据库中的行情仍在有效期内，直接使用
+    stub_manager.get_stock_realtime('000001.SZ')
+    assert fetcher.realtime_calls == 1
+    
+    stub_manager.memory_cache.clear()
+    stub_manager.cache_time['realtime'] = timedelta(0)
+    stub_manager.get_stock_realtime('000001.SZ')
+    assert fetcher.realtime_calls == 2
+
+def test_refresh_snapshot_default_fetcher(stub_manager):
+    """测试数据源未实现全市场快照时按股票列表逐只获取"""
+    df = stub_manager.refresh_realtime_snapshot()
+    assert df['code'].tolist() == ['000001']
+    assert stub_manager.fetcher.realtime_calls == 1
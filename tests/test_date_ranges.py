@@ -0,0 +1,24 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime
+from src.utils.date_ranges import merge_ranges, missing_ranges
+
+def d(day):
+    return datetime(2024, 1, day)
+
+def test_merge_ranges():
+    # 重叠和相邻的区间合并
+    assert merge_ranges([(d(5), d(8)), (d(1), d(3)), (d(4), d(4)), (d(10), d(12))]) == \
+        [(d(1), d(8)), (d(10), d(12))]
+
+def test_missing_ranges():
+    covered = [(d(5), d(10)), (d(15), d(20))]
+    # 头部、中间空洞和尾部
+    assert missing_ranges(d(1), d(25), covered) == \
+        [(d(1), d(4)), (d(11), d(14)), (d(21), d(25))]
+    # 完全覆盖
+    assert missing_ranges(d(6), d(9), covered) == []
+    # 没有任何覆盖
+    assert missing_ranges(d(1), d(3), []) == [(d(1), d(3))]
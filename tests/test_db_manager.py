@@ -0,0 +1,189 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from sqlalchemy import create_engine, text
+from src.data.models import init_db, create_db_engine
+from src.data.migrations import SCHEMA_VERSION
+from src.data.db_manager import DatabaseManager
+
+@pytest.fixture
+def engine(tmp_path):
+    """使用临时数据库，避免修改 data/stock_data.db"""
+    engine = create_db_engine(str(tmp_path / 'test.db'))
+    init_db(engine)
+    return engine
+
+@pytest.fixture
+def daily_data():
+    """生成测试用的日线数据"""
+    dates = pd.date_range('2024-01-01', periods=5, freq='B')
+    return pd.DataFrame({
+        'date': dates,
+        'open': [10.0, 10.1, 10.2, 10.3, 10.4],
+        'high': [10.5, 10.6, 10.7, 10.8, 10.9],
+        'low': [9.5, 9.6, 9.7, 9.8, 9.9],
+        'close': [10.2, 10.3, 10.4, 10.5, 10.6],
+        'volume': [1000, 1100, 1200, 1300, 1400]
+    })
+
+def test_save_stock_daily_upsert(engine, daily_data):
+    """测试重复保存日线数据不产生重复行，且会更新已有行"""
+    db = DatabaseManager(engine)
+    db.save_stock_daily('000001', daily_data)
+
+    updated = daily_data.copy()
+    updated.loc[4, 'close'] = 11.0
+    db.save_stock_daily('000001', updated)
+
+    df = db.get_stock_daily('000001', '2024-01-01', '2024-01-31')
+    assert len(df) == len(daily_data)
+    assert df['close'].iloc[-1] == 11.0
+
+def test_save_stock_list_upsert(engine):
+    """测试股票列表按代码更新"""
+    db = DatabaseManager(engine)
+    db.save_stock_list(pd.DataFrame({'code': ['000001', '000002'], 'name': ['平安银行', '万科A']}))
+    db.save_stock_list(pd.DataFrame({'code': ['000002'], 'name': ['万科Ａ']}))
+
+    df = db.get_stock_list()
+    assert len(df) == 2
+    assert df.set_index('code').loc['000002', 'name'] == '万科Ａ'
+
+def test_migration_dedups_legacy_db(tmp_path):
+    """测试旧库升级时补建唯一索引，旧的前复权日线被删除"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE stock_daily (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+            "code VARCHAR(10) NOT NULL, date DATETIME NOT NULL, open FLOAT, high FLOAT, "
+            "low FLOAT, close FLOAT, volume FLOAT, update_time DATETIME)"
+        ))
+        for close in (1.0, 2.0):
+            conn.execute(text(
+                "INSERT INTO stock_daily (code, date, close) "
+                "VALUES ('000001', '2024-01-02 00:00:00.000000', :close)"
+            ), {'close': close})
+
+    init_db(engine)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT close FROM stock_daily")).fetchall()
+        version = conn.execute(text("PRAGMA user_version")).scalar()
+        coverage = conn.execute(text("SELECT COUNT(*) FROM stock_daily_coverage")).scalar()
+        indexes = [row[1] for row in conn.execute(text("PRAGMA index_list(stock_daily)"))]
+    assert 'ux_stock_daily_code_date' in indexes
+    assert version == SCHEMA_VERSION
+    # 旧库中是前复权数据，删除后不记为已同步，读取时重新获取不复权数据
+    assert rows == []
+    assert coverage == 0
+
+def test_migration_drops_qfq_daily(tmp_path):
+    """测试升级到v3时删除旧的前复权日线和周期K线，重新获取后不会重复复权"""
+    engine = create_db_engine(str(tmp_path / 'v2.db'))
+    init_db(engine)
+    db = DatabaseManager(engine)
+    db.save_stock_daily('000001', pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=3, freq='B'),
+        'open': 5.0, 'high': 5.0, 'low': 5.0, 'close': 5.0, 'volume': 100.0}))
+    db.add_daily_coverage('000001', datetime(2024, 1, 1), datetime(2024, 1, 3))
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO stock_period_bar (code, period, date, close) "
+            "VALUES ('000001', 'W', '2024-01-05 00:00:00.000000', 5.0)"))
+        conn.execute(text("PRAGMA user_version = 2"))
+
+    init_db(engine)
+
+    with engine.connect() as conn:
+        counts = [conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+                  for table in ('stock_daily', 'stock_period_bar', 'stock_daily_coverage')]
+    assert counts == [0, 0, 0]
+
+def test_wal_mode(engine):
+    """测试连接启用WAL模式"""
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+
+def test_concurrent_reads_during_bulk_writes(engine, capsys):
+    """测试批量写入日线数据时并发读取不被阻塞，且只能看到完整提交的批次"""
+    db = DatabaseManager(engine)
+    batch_size = 2000
+    batches = 10
+    dates = pd.date_range('1990-01-01', periods=batch_size * batches, freq='D')
+    frame = pd.DataFrame({
+        'date': dates,
+        'open': np.random.rand(len(dates)),
+        'high': np.random.rand(len(dates)),
+        'low': np.random.rand(len(dates)),
+        'close': np.random.rand(len(dates)),
+        'volume': np.random.rand(len(dates))
+    })
+    
+    writing = threading.Event()
+    done = threading.Event()
+    errors = []
+    read_latencies = []
+    read_counts = []
+    
+    def writer():
+        try:
+            writing.set()
+            for i in range(batches):
+                db.save_stock_daily('000001', frame.iloc[i * batch_size:(i + 1) * batch_size])
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+    
+    def reader():
+        writing.wait()
+        try:
+            while not done.is_set():
+                start = time.monotonic()
+                df = db.get_stock_daily('000001', '1990-01-01', '2099-12-31', columns=['close'])
+                read_latencies.append(time.monotonic() - start)
+                read_counts.append(len(df))
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=120)
+    
+    assert not errors
+    # DatabaseManager 出错时只打印日志，这里确认没有 "database is locked" 等错误
+    assert '失败' not in capsys.readouterr().out
+    assert len(read_counts) > batches
+    # 读到的数据总是完整批次，不会看到未提交的部分写入
+    assert all(count % batch_size == 0 for count in read_counts)
+    assert max(read_latencies) < 5
+    assert len(db.get_stock_daily('000001', '1990-01-01', '2099-12-31')) == len(frame)
+
+def test_load_compact(engine, daily_data):
+    """测试紧凑模式的类型，还原后与默认读取的结果一致"""
+    db = DatabaseManager(engine)
+    db.save_stock_daily('000001', daily_data)
+    db.save_stock_daily('000002', daily_data)
+    full = db.get_stock_daily_panel(None, '2024-01-01', '2024-01-31')
+    compact = db.get_stock_daily_panel(None, '2024-01-01', '2024-01-31', compact=True)
+    assert compact['close'].dtype == np.float32
+    assert compact['volume'].dtype == np.int64
+    assert compact['code'].dtype == 'category'
+    assert compact['date'].dtype == np.int64
+    pd.testing.assert_series_equal(pd.to_datetime(compact['date']), full['date'])
+    np.testing.assert_array_equal(compact['close'].astype('float64').round(2), full['close'])
+
+    wide = db.get_stock_daily_panel(['000001'], '2024-01-01', '2024-01-31', ['close'],
+                                    layout='wide', compact=True)
+    assert (wide.dtypes == np.float32).all()
+    single = db.get_stock_daily('000001', '2024-01-01', '2024-01-31', compact=True)
+    assert 'code' not in single.columns and single['open'].dtype == np.float32
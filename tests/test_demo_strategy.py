@@ -31,7 +31,17 @@ def sample_data():
 @pytest.fixture
 def strategy_engine():
     """初始化策略引擎"""
-    return StrategyEngine('src/strategies/demo.yml')
+    return StrategyEngine('strategies/default_demo.yml')
+
+def calculate_indicators(engine, data):
+    """按回测时的方式（指标依赖图）计算示例策略的指标"""
+    graph = engine.build_graph(['demo_strategy'])
+    assert 'demo_strategy' in graph.strategies
+    return graph.assign('demo_strategy', data, graph.evaluate(data))
+
+def signal_code(signal):
+    """信号可以是表达式字符串，也可以是 {'code': 表达式}"""
+    return signal['code'] if isinstance(signal, dict) else signal
 
 def test_strategy_loading(strategy_engine):
     """测试策略加载"""
@@ -51,15 +61,7 @@ def test_indicator_calculation(sample_data, strategy_engine):
     strategy_config = strategy_engine.config['strategies']['demo_strategy']
     
     # 计算指标
-    data = sample_data.copy()
-    for indicator in strategy_config['indicators']:
-        local_vars = {
-            'data': data,
-            'params': indicator['params'],
-            'result': None
-        }
-        strategy_engine._execute_code(indicator['code'], local_vars)
-        data = local_vars['data']
+    data = calculate_indicators(strategy_engine, sample_data)
     
     # 检查指标是否正确计算
     assert 'ma_fast' in data.columns
@@ -78,15 +80,7 @@ def test_signal_generation(sample_data, strategy_engine):
     strategy_config = strategy_engine.config['strategies']['demo_strategy']
     
     # 计算指标
-    data = sample_data.copy()
-    for indicator in strategy_config['indicators']:
-        local_vars = {
-            'data': data,
-            'params': indicator['params'],
-            'result': None
-        }
-        strategy_engine._execute_code(indicator['code'], local_vars)
-        data = local_vars['data']
+    data = calculate_indicators(strategy_engine, sample_data)
     
     # 生成买入信号
     local_vars = {
@@ -95,7 +89,7 @@ def test_signal_generation(sample_data, strategy_engine):
         'result': None
     }
     buy_condition = strategy_engine._execute_code(
-        f"result = {strategy_config['signals']['buy']['code']}",
+        f"result = {signal_code(strategy_config['signals']['buy'])}",
         local_vars
     )
     
@@ -106,7 +100,7 @@ def test_signal_generation(sample_data, strategy_engine):
         'result': None
     }
     sell_condition = strategy_engine._execute_code(
-        f"result = {strategy_config['signals']['sell']['code']}",
+        f"result = {signal_code(strategy_config['signals']['sell'])}",
         local_vars
     )
     
@@ -122,15 +116,7 @@ def test_position_sizing(sample_data, strategy_engine):
     strategy_config = strategy_engine.config['strategies']['demo_strategy']
     
     # 计算指标和信号
-    data = sample_data.copy()
-    for indicator in strategy_config['indicators']:
-        local_vars = {
-            'data': data,
-            'params': indicator['params'],
-            'result': None
-        }
-        strategy_engine._execute_code(indicator['code'], local_vars)
-        data = local_vars['data']
+    data = calculate_indicators(strategy_engine, sample_data)
     
     # 生成信号
     signals = pd.DataFrame(index=data.index)
@@ -143,7 +129,7 @@ def test_position_sizing(sample_data, strategy_engine):
         'result': None
     }
     buy_condition = strategy_engine._execute_code(
-        f"result = {strategy_config['signals']['buy']['code']}",
+        f"result = {signal_code(strategy_config['signals']['buy'])}",
         local_vars
     )
     signals.loc[buy_condition, 'signal'] = 1
@@ -155,7 +141,7 @@ def test_position_sizing(sample_data, strategy_engine):
         'result': None
     }
     sell_condition = strategy_engine._execute_code(
-        f"result = {strategy_config['signals']['sell']['code']}",
+        f"result = {signal_code(strategy_config['signals']['sell'])}",
         local_vars
     )
     signals.loc[sell_condition, 'signal'] = -1
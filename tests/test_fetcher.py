@@ -0,0 +1,134 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pytest
+import pandas as pd
+from src.data import fetcher as fetcher_module
+from src.data.fetcher import AkshareStockDataFetcher
+from src.utils.rate_limit import TokenBucket
+
+@pytest.fixture
+def stub_akshare(monkeypatch):
+    """用本地桩函数替换 ak.stock_zh_a_hist，000002 首次请求失败"""
+    calls = []
+    lock = threading.Lock()
+    
+    def stock_zh_a_hist(symbol, start_date, end_date, adjust):
+        with lock:
+            calls.append(symbol)
+            attempt = calls.count(symbol)
+        if symbol == '000002' and attempt == 1:
+            raise ConnectionError('timeout')
+        if symbol == '000003':
+            raise ConnectionError('always fails')
+        dates = pd.date_range(start_date, end_date, freq='B')
+        return pd.DataFrame({
+            '日期': dates.strftime('%Y-%m-%d'), '开盘': 10.0, '收盘': 10.5,
+            '最高': 11.0, '最低': 9.0, '成交量': 1000, '成交额': 1e4
+        })
+    
+    monkeypatch.setattr(fetcher_module.ak, 'stock_zh_a_hist', stock_zh_a_hist)
+    return calls
+
+def test_get_stock_daily_many(stub_akshare):
+    """测试并发获取、失败重试和逐个返回结果"""
+    fetcher = AkshareStockDataFetcher(rate_limit=1000)
+    results = {
+        symbol: (df, error)
+        for symbol, df, error in fetcher.get_stock_daily_many(
+            ['000001', '000002', '000003'], '2024-01-01', '2024-01-31',
+            max_workers=3, max_retries=2, backoff=0)
+    }
+    
+    assert set(results) == {'000001', '000002', '000003'}
+    df, error = results['000002']
+    assert error is None
+    assert list(df.columns) == ['date', 'open', 'close', 'high', 'low', 'volume']
+    assert stub_akshare.count('000002') == 2
+    
+    df, error = results['000003']
+    assert df.empty
+    assert error is not None
+    assert stub_akshare.count('000003') == 3
+
+def test_token_bucket_rate():
+    """测试令牌桶限制请求速率"""
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(11):
+        bucket.acquire()
+    # 首个令牌立即可用，其余10个按每秒50个补充
+    assert time.monotonic() - start >= 0.18
+
+@pytest.fixture
+def stub_spot(monkeypatch):
+    """用本地桩函数替换全市场行情接口，记录下载次数"""
+    calls = []
+    
+    def stock_zh_a_spot():
+        calls.append(1)
+        return pd.DataFrame({
+            '代码': ['sz000001', 'sz000002', 'sh600000'],
+            '名称': ['平安银行', '万科A', '浦发银行'],
+            '最新价': [10.0, 8.0, 7.0],
+            '涨跌额': [0.1, -0.1, 0.0],
+            '涨跌幅': [1.0, -1.2, 0.0],
+            '成交量': [1000, 2000, 3000]
+        })
+    
+    monkeypatch.setattr(fetcher_module.ak, 'stock_zh_a_spot', stock_zh_a_spot)
+    return calls
+
+def test_realtime_shared_snapshot(stub_spot):
+    """测试多次实时行情查询只下载一次全市场数据"""
+    fetcher = AkshareStockDataFetcher()
+    
+    df = fetcher.get_stock_realtime('000001.SZ')
+    assert list(df.columns) == ['code', 'name', 'price', 'change', 'volume']
+    assert df['code'].tolist() == ['000001']
+    
+    df = fetcher.get_stock_realtime_many(['600000', '000002.SZ', '999999'])
+    assert df['code'].tolist() == ['600000', '000002']
+    assert len(stub_spot) == 1
+    
+    assert len(fetcher.get_market_snapshot(force_refresh=True)) == 3
+    assert len(stub_spot) == 2
+
+def test_snapshot_keeps_stale_table_on_failure(stub_spot, monkeypatch):
+    """测试刷新失败时继续使用上一次的快照，之后的调用重新下载"""
+    fetcher = AkshareStockDataFetcher()
+    assert fetcher.get_stock_realtime('600000')['price'].tolist() == [7.0]
+    loaded_at = fetcher._snapshot.loaded_at
+    
+    def fail():
+        raise ConnectionError('timeout')
+    monkeypatch.setattr(fetcher_module.ak, 'stock_zh_a_spot', fail)
+    monkeypatch.setattr(fetcher_module.ak, 'stock_zh_a_spot_em', fail)
+    assert len(fetcher.get_market_snapshot(force_refresh=True)) == 3
+    assert fetcher._snapshot.loaded_at == loaded_at
+    assert fetcher.get_stock_realtime('600000')['price'].tolist() == [7.0]
+
+def test_financial_indicators_start_year(monkeypatch):
+    """测试起始年份早于上市时逐年向后尝试，不返回空"""
+    calls = []
+    
+    def stock_financial_analysis_indicator(symbol, start_year):
+        calls.append(start_year)
+        # 数据源只有2021年及以后的报告，其他起始年份返回空
+        if int(start_year) < 2021:
+            return pd.DataFrame()
+        return pd.DataFrame({'日期': [f'{start_year}-12-31'], '摊薄每股收益(元)': ['0.5']})
+    
+    monkeypatch.setattr(fetcher_module.ak, 'stock_financial_analysis_indicator',
+                        stock_financial_analysis_indicator)
+    fetcher = AkshareStockDataFetcher(rate_limit=1000)
+    df = fetcher.get_financial_indicators('000001.SZ', start_year=2018)
+    assert calls == ['2018', '2019', '2020', '2021']
+    assert df['report_date'].tolist() == ['2021-12-31']
+    
+    calls.clear()
+    fetcher.get_financial_indicators('000001', start_year=2022)
+    assert calls == ['2022']
@@ -0,0 +1,67 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.fundamentals import FundamentalsStore, statutory_announce_date
+
+@pytest.fixture
+def store(tmp_path):
+    store = FundamentalsStore(str(tmp_path))
+    store.save('000001', pd.DataFrame({
+        'report_date': ['2023-09-30', '2023-12-31', '2024-03-31'],
+        '净资产收益率(%)': [8.0, 10.0, '--'],
+        '摊薄每股收益(元)': [1.0, 1.5, 0.4]
+    }))
+    store.save('000002', pd.DataFrame({
+        'report_date': ['2023-12-31'],
+        'announce_date': ['2024-03-15'],
+        '净资产收益率(%)': [5.0]
+    }))
+    return store
+
+def test_statutory_announce_date():
+    """测试按法定披露期限估计公告日"""
+    dates = statutory_announce_date(pd.Series(['2023-03-31', '2023-06-30', '2023-09-30', '2023-12-31']))
+    assert dates.dt.strftime('%Y-%m-%d').tolist() == ['2023-04-30', '2023-08-31', '2023-10-31', '2024-04-30']
+
+def test_load_wide_table(store):
+    """测试一次读取多只股票，缺少的指标列为NaN"""
+    df = store.load()
+    assert set(df['code']) == {'000001', '000002'}
+    assert np.isnan(df.loc[df['code'] == '000002', '摊薄每股收益(元)']).all()
+    assert np.isnan(df.loc[df['report_date'] == '2024-03-31', '净资产收益率(%)']).all()
+    assert len(store.load(['000001'], as_of='2024-04-30')) == 3
+    assert len(store.load(['000001'], as_of='2024-04-29')) == 1
+
+def test_asof_join_uses_announce_date(store):
+    """测试按公告日连接，公告前看不到对应的财报"""
+    dates = pd.to_datetime(['2024-03-14', '2024-03-15', '2024-04-29', '2024-04-30'])
+    bars = pd.DataFrame({
+        'code': ['000001'] * 4 + ['000002'] * 4,
+        'date': list(dates) * 2,
+        'close': 1.0
+    }).iloc[::-1]
+    joined = store.asof_join(bars, columns=['净资产收益率(%)'])
+    assert joined.index.equals(bars.index)
+
+    first = joined[joined['code'] == '000001'].set_index('date').sort_index()
+    assert (first.loc[:'2024-04-29', '净资产收益率(%)'] == 8.0).all()
+    # 年报和一季报同一天公告时取最新报告期
+    assert first.loc['2024-04-30', 'report_date'] == pd.Timestamp('2024-03-31')
+
+    second = joined[joined['code'] == '000002'].set_index('date').sort_index()
+    assert np.isnan(second.loc['2024-03-14', '净资产收益率(%)'])
+    assert (second.loc['2024-03-15':, '净资产收益率(%)'] == 5.0).all()
+
+def test_load_ignores_leftover_tmp(store):
+    """测试写入中断残留的临时文件不影响读取"""
+    partition = os.path.dirname(store._path('000001'))
+    # 模拟写入一半时进程退出
+    with open(os.path.join(partition, '.data.1.1.tmp'), 'wb') as f:
+        f.write(b'PAR1 partial')
+    store.save('000001', pd.DataFrame({'report_date': ['2024-06-30'], '摊薄每股收益(元)': [0.8]}))
+    assert sorted(os.listdir(partition)) == ['.data.1.1.tmp', 'data.parquet']
+    assert len(store.load(['000001'])) == 4
@@ -0,0 +1,99 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.indicator_cache import IndicatorCache, fingerprint, normalize
+
+@pytest.fixture
+def data():
+    dates = pd.date_range('2024-01-01', periods=60)
+    close = 10 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, len(dates)))
+    return pd.DataFrame({'close': close, 'volume': 1000.0}, index=dates)
+
+class Runner:
+    """按策略引擎的方式执行指标代码，记录实际执行的次数"""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.executed = 0
+
+    def __call__(self, data, code, params, digests=None):
+        digests = fingerprint(data) if digests is None else digests
+
+        def execute(data):
+            self.executed += 1
+            exec(code, {}, {'data': data, 'params': params})
+            return data
+        return self.cache.run(data, digests, code, params, execute)
+
+def test_normalize_ignores_names_and_comments():
+    """测试列名、参数名、注释不同但计算相同的指标规范化结果相同"""
+    a = normalize("data['short_ma'] = data['close'].rolling(window=params['short_window']).mean()",
+                  {'short_window': 5})
+    b = normalize("# 短期均线\ndata['ma_fast'] = data['close'].rolling(window=params['fast_period']).mean()",
+                  {'fast_period': 5})
+    c = normalize("data['ma_fast'] = data['close'].rolling(window=params['fast_period']).mean()",
+                  {'fast_period': 20})
+    assert a[0] == b[0] != c[0]
+    assert a[1:] == (['close'], ['short_ma'])
+    # 读写同一列时该列是输入
+    assert normalize("data['close'] = data['close'] * 2", {})[1] == ['close']
+    # 以其他方式使用 data 时无法确定输入输出，不缓存
+    assert normalize("data['x'] = data.loc[:, 'close']", {}) is None
+
+def test_cache_shared_across_names(data):
+    """测试相同计算的指标只执行一次，命中时写入各自的列名"""
+    runner = Runner(IndicatorCache())
+    first = runner(data.copy(), "data['short_ma'] = data['close'].rolling(params['w']).mean()", {'w': 5})
+    second = runner(data.copy(), "data['ma_fast'] = data['close'].rolling(params['n']).mean()", {'n': 5})
+    assert runner.executed == 1
+    pd.testing.assert_series_equal(first['short_ma'], second['ma_fast'], check_names=False)
+
+    # 数据不同时重新计算
+    changed = data.copy()
+    changed.iloc[-1, 0] += 1
+    runner(changed, "data['ma_fast'] = data['close'].rolling(params['n']).mean()", {'n': 5})
+    assert runner.executed == 2
+
+def test_derived_columns_chain(data):
+    """测试读取上一个指标输出列的指标也能命中缓存"""
+    runner = Runner(IndicatorCache())
+    codes = ["data['mid'] = data['close'].rolling(params['w']).mean()",
+             "data['upper'] = data['mid'] + params['k'] * data['close'].rolling(params['w']).std()"]
+    for _ in range(2):
+        frame = data.copy()
+        digests = fingerprint(frame)
+        for code in codes:
+            frame = runner(frame, code, {'w': 10, 'k': 2}, digests)
+    assert runner.executed == 2
+    expected = frame['close'].rolling(10).mean() + 2 * frame['close'].rolling(10).std()
+    pd.testing.assert_series_equal(frame['upper'], expected, check_names=False)
+
+def test_cache_evicts_by_entries(data):
+    """测试超过容量后按LRU淘汰"""
+    cache = IndicatorCache(max_entries=2)
+    runner = Runner(cache)
+    for window in [3, 4, 5]:
+        runner(data.copy(), "data['ma'] = data['close'].rolling(params['w']).mean()", {'w': window})
+    assert cache.stats()['entries'] == 2
+    assert cache.stats()['evictions'] == 1
+
+def test_cache_key_includes_index(data):
+    """测试不读取任何列的指标在索引不同的数据上不共用结果"""
+    runner = Runner(IndicatorCache())
+    code = "data['level'] = params['v'] * 1.0"
+    first = runner(data.copy(), code, {'v': 2})
+    assert runner.executed == 1
+    assert (first['level'] == 2.0).all()
+
+    other = data.iloc[10:30].copy()
+    other.index = other.index + pd.Timedelta(days=365)
+    second = runner(other, code, {'v': 2})
+    assert runner.executed == 2
+    assert (second['level'] == 2.0).all()
+
+    runner(data.copy(), code, {'v': 2})
+    assert runner.executed == 2
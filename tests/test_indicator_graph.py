@@ -0,0 +1,116 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.indicator_cache import IndicatorCache, fingerprint
+from src.backtest.indicator_graph import IndicatorGraph
+from src.backtest.strategy_engine import StrategyEngine
+from src.indicators import MACD, RSI
+
+@pytest.fixture
+def data():
+    dates = pd.date_range('2024-01-01', periods=80)
+    close = 10 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, len(dates)))
+    return pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close,
+                         'volume': 1000.0}, index=dates)
+
+def ma(column, window):
+    return {'name': column, 'indicator': 'ma', 'params': {'window': window}, 'outputs': column}
+
+def test_graph_dedups_across_strategies(data):
+    """测试不同策略中相同的计算只保留一个节点，按各自的列名写入"""
+    graph = IndicatorGraph()
+    graph.add_strategy('a', [ma('short_ma', 5), ma('long_ma', 20),
+                             {'name': 'diff', 'params': {},
+                              'code': "data['gap'] = data['short_ma'] - data['long_ma']"}])
+    graph.add_strategy('b', [ma('fast', 5), ma('slow', 20),
+                             {'name': 'diff', 'params': {},
+                              'code': "data['spread'] = data['fast'] - data['slow']"},
+                             {'name': 'rsi', 'indicator': 'rsi', 'params': {'period': 14},
+                              'outputs': 'rsi'}])
+    values = graph.evaluate(data)
+    assert graph.stats['nodes'] == 7
+    assert graph.stats['unique'] == 4
+    assert graph.stats['saved'] == 3
+    assert graph.stats['computed'] == 4
+
+    a = graph.assign('a', data, values)
+    b = graph.assign('b', data, values)
+    expected = data['close'].rolling(5).mean()
+    pd.testing.assert_series_equal(a['short_ma'], expected, check_names=False)
+    pd.testing.assert_series_equal(b['fast'], expected, check_names=False)
+    pd.testing.assert_series_equal(b['rsi'], RSI(14).calculate(data), check_names=False)
+    pd.testing.assert_series_equal(a['gap'], b['spread'], check_names=False)
+
+    # 输入来源不同的代码不合并
+    graph.add_strategy('c', [ma('fast', 10), ma('slow', 20),
+                             {'name': 'diff', 'params': {},
+                              'code': "data['spread'] = data['fast'] - data['slow']"}])
+    assert len(graph.nodes) == 6
+
+def test_graph_inputs_outputs_mapping(data):
+    """测试输入映射到前面指标的输出列，多输出指标按名称选择输出"""
+    graph = IndicatorGraph()
+    graph.add_strategy('s', [
+        {'name': 'MACD', 'indicator': 'macd', 'params': {'fast_period': 6, 'slow_period': 13},
+         'outputs': {'macd_line': 'dif', 'histogram': 'bar'}},
+        {'name': 'DIF均线', 'indicator': 'ma', 'inputs': {'close': 'dif'},
+         'params': {'window': 3, 'ma_type': 'EMA'}, 'outputs': 'dif_ema'},
+    ])
+    result = graph.assign('s', data, graph.evaluate(data))
+    expected = MACD(fast_period=6, slow_period=13).calculate(data)
+    pd.testing.assert_series_equal(result['dif'], expected['macd_line'], check_names=False)
+    pd.testing.assert_series_equal(result['bar'], expected['histogram'], check_names=False)
+    pd.testing.assert_series_equal(result['dif_ema'], expected['macd_line'].ewm(span=3, adjust=False).mean(),
+                                   check_names=False)
+    assert 'signal_line' not in result.columns
+
+    with pytest.raises(ValueError):
+        IndicatorGraph().add_strategy('bad', [{'name': 'x', 'indicator': 'ma', 'outputs': {'upper': 'u'}}])
+
+def test_graph_uses_content_cache(data):
+    """测试再次计算同一份数据时节点结果从缓存读取"""
+    cache = IndicatorCache()
+    graph = IndicatorGraph()
+    graph.add_strategy('s', [ma('m', 10)])
+    first = graph.evaluate(data, fingerprint(data), cache)
+    second = graph.evaluate(data, fingerprint(data), cache)
+    assert graph.stats['cached'] == 1 and graph.stats['computed'] == 0
+    pd.testing.assert_series_equal(graph.assign('s', data, first)['m'], graph.assign('s', data, second)['m'])
+
+def test_engine_graph_matches_legacy_code(data):
+    """测试引擎用依赖图计算的结果与逐个执行指标代码一致，无法分析的代码按原方式执行"""
+    signals = {'buy': "data['fast'] > data['slow']", 'sell': "data['fast'] < data['slow']"}
+    sizing = {'type': 'fixed', 'value': 0.1}
+    engine = StrategyEngine(indicator_cache=IndicatorCache())
+    engine.config = {'strategies': {
+        'declared': {'parameters': {}, 'signals': signals, 'position_sizing': sizing,
+                     'indicators': [ma('fast', 5), ma('slow', 20)]},
+        'legacy': {'parameters': {}, 'signals': signals, 'position_sizing': sizing,
+                   'indicators': [
+                       {'name': 'fast', 'params': {'w': 5},
+                        'code': "data['fast'] = data['close'].rolling(params['w']).mean()"},
+                       {'name': 'slow', 'params': {'w': 20},
+                        'code': "data.loc[:, 'slow'] = data['close'].rolling(params['w']).mean()"}]},
+    }}
+    results = engine.backtest(data, '2024-01-01', '2024-12-31')
+    assert engine.graph_stats['strategies'] == 1
+    pd.testing.assert_series_equal(results['declared']['returns'], results['legacy']['returns'])
+    assert results['declared']['positions']['position'].abs().sum() > 0
+
+    results = engine.backtest(data, '2024-01-01', '2024-12-31', strategies=['declared'])
+    assert list(results) == ['declared']
+
+def test_graph_cache_key_includes_index(data):
+    """测试没有输入列的代码节点按数据索引区分缓存"""
+    cache = IndicatorCache()
+    strategy = [{'name': 'level', 'params': {'v': 2}, 'code': "data['level'] = params['v'] * 1.0"}]
+    for frame in (data, data.iloc[:20]):
+        graph = IndicatorGraph()
+        graph.add_strategy('s', strategy)
+        values = graph.evaluate(frame, fingerprint(frame), cache)
+        assert graph.stats['computed'] == 1
+        assert (graph.assign('s', frame, values)['level'] == 2.0).all()
@@ -5,7 +5,9 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 import pytest
 import pandas as pd
 import numpy as np
-from src.indicators import MovingAverage, RSI, MACD
+from src.indicators import (MovingAverage, RSI, MACD, IncrementalMovingAverage,
+                            IncrementalRSI, IncrementalMACD, sma_sweep, ema_sweep, crossover_sweep,
+                            WilderRSI, BollingerBands, ATR, KDJ, OBV, create_indicator)
 
 def test_moving_average():
     # 创建测试数据
@@ -72,4 +74,192 @@ def test_custom_indicator():
     result = indicator.calculate(data)
     
     assert len(result) == len(data)
-    assert result[1] == 21  # (10+11)*2 
\ No newline at end of file
+    assert result[1] == 21  # (10+11)*2 
+
+@pytest.fixture
+def close_panel():
+    """含停牌日（NaN）和未上市区间的收盘价面板"""
+    rng = np.random.default_rng(0)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (120, 6)), axis=0))
+    close[rng.random((120, 6)) < 0.1] = np.nan
+    close[:30, 1] = np.nan
+    close[:, 2] = np.nan
+    return pd.DataFrame(close, index=pd.bdate_range('2024-01-01', periods=120),
+                        columns=['000001', '000002', '000003', '600000', '600001', '600002'])
+
+@pytest.mark.parametrize('indicator', [
+    MovingAverage(window=10), MovingAverage(window=10, ma_type='EMA'), RSI(period=14), MACD()
+], ids=str)
+def test_calculate_panel_matches_per_symbol(indicator, close_panel):
+    """测试面板计算与逐只股票（去掉停牌日）计算一致，停牌日保持NaN"""
+    result = indicator.calculate_panel(close_panel)
+    for code in close_panel.columns:
+        close = close_panel[code].dropna()
+        expected = indicator.calculate(pd.DataFrame({'close': close}))
+        got = result.xs(code, axis=1, level=1) if isinstance(expected, pd.DataFrame) else result[code]
+        assert got.drop(close.index).isna().all(axis=None)
+        np.testing.assert_allclose(got.loc[close.index].to_numpy(dtype=float),
+                                   expected.to_numpy(dtype=float), rtol=1e-9, equal_nan=True)
+
+def test_calculate_panel_default_and_array(close_panel):
+    """测试未实现向量化的指标按逐只股票回退计算，数组输入返回数组"""
+    class DoubleMA(MovingAverage):
+        def calculate(self, data):
+            return super().calculate(data) * 2
+
+    indicator = DoubleMA(window=5)
+    expected = MovingAverage(window=5).calculate_panel(close_panel) * 2
+    pd.testing.assert_frame_equal(indicator.calculate_panel(close_panel), expected)
+
+    result = MovingAverage(window=5).calculate_panel(close_panel.to_numpy())
+    np.testing.assert_allclose(result, expected.to_numpy() / 2, equal_nan=True)
+
+@pytest.fixture
+def close_history():
+    """随机游走收盘价，中间有一段连续不变的价格"""
+    rng = np.random.default_rng(1)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+    close[150:170] = close[150]
+    return pd.DataFrame({'close': close})
+
+@pytest.mark.parametrize('batch, incremental', [
+    (MovingAverage(window=20), IncrementalMovingAverage(window=20)),
+    (MovingAverage(window=20, ma_type='EMA'), IncrementalMovingAverage(window=20, ma_type='EMA')),
+    (RSI(period=14), IncrementalRSI(period=14)),
+    (MACD(), IncrementalMACD()),
+], ids=lambda x: str(x))
+@pytest.mark.parametrize('history', [0, 5, 100])
+def test_incremental_matches_batch(batch, incremental, history, close_history):
+    """测试用历史初始化后逐根更新，每一步都与对全部数据批量计算的结果一致"""
+    expected = batch.calculate(close_history)
+    incremental.initialize(close_history.iloc[:history])
+    values = [incremental.update(close) for close in close_history['close'].iloc[history:]]
+    if isinstance(expected, pd.DataFrame):
+        got = pd.DataFrame(values, index=expected.index[history:])[expected.columns]
+    else:
+        got = pd.Series(values, index=expected.index[history:])
+    np.testing.assert_allclose(got.to_numpy(dtype=float), expected.iloc[history:].to_numpy(dtype=float),
+                               rtol=1e-9, atol=1e-9, equal_nan=True)
+
+def test_incremental_initialize_matches_last_value(close_history):
+    """测试初始化后的当前值等于批量计算的最后一个值"""
+    indicator = IncrementalRSI(period=14).initialize(close_history)
+    assert indicator.value == pytest.approx(RSI(period=14).calculate(close_history).iloc[-1])
+
+@pytest.mark.parametrize('ma_type, sweep', [('SMA', sma_sweep), ('EMA', ema_sweep)])
+def test_sweep_matches_moving_average(ma_type, sweep, close_history):
+    """测试多周期扫描的每一列与对应周期的 MovingAverage 一致"""
+    close = close_history['close']
+    if ma_type == 'SMA':
+        close = close.copy()
+        close.iloc[40] = np.nan
+    windows = [1, 2, 5, 20, 250, 400]
+    result = sweep(close, windows)
+    assert list(result.columns) == windows
+    for window in windows:
+        expected = MovingAverage(window, ma_type).calculate(pd.DataFrame({'close': close}))
+        np.testing.assert_allclose(result[window], expected, rtol=1e-10, atol=1e-10, equal_nan=True)
+
+    # 二维数组按股票分别计算，周期在最后一维
+    panel = np.column_stack([close.to_numpy(), close.to_numpy() * 2])
+    result = sweep(panel, [5, 20])
+    assert result.shape == (len(close), 2, 2)
+    expected = MovingAverage(20, ma_type).calculate(pd.DataFrame({'close': close * 2}))
+    np.testing.assert_allclose(result[:, 1, 1], expected, rtol=1e-10, equal_nan=True)
+
+def test_crossover_sweep_matches_strategy_conditions(close_history):
+    """测试交叉信号与 ma_crossover 策略的买卖条件一致"""
+    close = close_history['close']
+    result = crossover_sweep(close, [3, 5], [5, 20])
+    assert list(result.columns) == [(3, 5), (3, 20), (5, 20)]
+    for fast, slow in result.columns:
+        s, l = close.rolling(fast).mean(), close.rolling(slow).mean()
+        expected = pd.Series(0, index=close.index)
+        expected[(s > l) & (s.shift(1) <= l.shift(1))] = 1
+        expected[(s < l) & (s.shift(1) >= l.shift(1))] = -1
+        np.testing.assert_array_equal(result[(fast, slow)], expected)
+
+@pytest.fixture
+def ohlcv_panel(close_panel):
+    """由收盘价面板生成的 (字段, 股票代码) 面板，停牌日各字段均为NaN"""
+    rng = np.random.default_rng(2)
+    noise = np.abs(rng.normal(0, 0.01, close_panel.shape))
+    volume = close_panel * 0 + rng.integers(1, 1000, close_panel.shape)
+    return pd.concat({'close': close_panel, 'high': close_panel * (1 + noise),
+                      'low': close_panel * (1 - noise), 'volume': volume}, axis=1)
+
+@pytest.mark.parametrize('indicator', [
+    WilderRSI(14), BollingerBands(10, 2), ATR(14), KDJ(), OBV()
+], ids=str)
+def test_vectorized_indicators_panel_matches_per_symbol(indicator, ohlcv_panel):
+    """测试新增指标的面板计算与逐只股票计算一致"""
+    result = indicator.calculate_panel(ohlcv_panel)
+    for code in ohlcv_panel['close'].columns:
+        data = ohlcv_panel.xs(code, axis=1, level=1).dropna()
+        expected = indicator.calculate(data)
+        got = result.xs(code, axis=1, level=1) if isinstance(expected, pd.DataFrame) else result[code]
+        np.testing.assert_allclose(got.loc[data.index].to_numpy(dtype=float),
+                                   expected.to_numpy(dtype=float), rtol=1e-12, equal_nan=True)
+
+def test_vectorized_indicators_reference(ohlcv_panel):
+    """测试新增指标与按定义逐行计算的结果一致，预热期为NaN"""
+    data = ohlcv_panel.xs('000001', axis=1, level=1).dropna()
+    close, high, low = data['close'], data['high'], data['low']
+
+    bands = BollingerBands(20, 2).calculate(data)
+    middle, std = close.rolling(20).mean(), close.rolling(20).std()
+    np.testing.assert_allclose(bands['upper_band'], middle + 2 * std, rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(bands['lower_band'], middle - 2 * std, rtol=1e-10, equal_nan=True)
+    assert bands['middle_band'].isna().sum() == 19
+
+    true_range = pd.concat([high - low, (high - close.shift()).abs(),
+                            (low - close.shift()).abs()], axis=1).max(axis=1)
+    atr = ATR(5).calculate(data)
+    assert atr.isna().sum() == 4
+    expected = true_range.iloc[:5].mean()
+    for i in range(5, len(data)):
+        expected += (true_range.iloc[i] - expected) / 5
+    assert atr.iloc[-1] == pytest.approx(expected)
+
+    rsi = WilderRSI(14).calculate(data)
+    assert rsi.isna().sum() == 14
+    assert ((rsi.dropna() >= 0) & (rsi.dropna() <= 100)).all()
+
+    obv = OBV().calculate(data)
+    np.testing.assert_allclose(obv, (np.sign(close.diff()).fillna(0) * data['volume']).cumsum())
+
+def test_vectorized_indicators_flat_prices():
+    """测试价格不变时的约定：KDJ 的 RSV 取50，Wilder RSI 为50，布林带宽度为0"""
+    data = pd.DataFrame({'close': 10.0, 'high': 10.0, 'low': 10.0, 'volume': 100.0}, index=range(30))
+    kdj = KDJ().calculate(data)
+    assert kdj.iloc[:8].isna().all(axis=None)
+    assert (kdj.iloc[8:] == 50).all(axis=None)
+    assert (WilderRSI(14).calculate(data).iloc[14:] == 50).all()
+    bands = BollingerBands(20).calculate(data)
+    assert (bands['std'].iloc[19:] == 0).all()
+    assert (OBV().calculate(data) == 0).all()
+
+def test_registered_indicators():
+    """测试按名称创建指标"""
+    assert isinstance(create_indicator('bollinger', {'window': 10}), BollingerBands)
+    assert isinstance(create_indicator('kdj'), KDJ)
+    with pytest.raises(ValueError):
+        create_indicator('unknown')
+
+def test_calculate_panel_compact():
+    """测试紧凑模式的指标结果为float32，相对float64结果的误差不超过 2**-24"""
+    from src.utils.dtypes import FLOAT32_RELATIVE_ERROR, memory_usage
+    rng = np.random.default_rng(3)
+    close = 20 * np.exp(np.cumsum(rng.normal(0, 0.02, (120, 4)), axis=0))
+    panel = pd.DataFrame(close, index=pd.bdate_range('2024-01-01', periods=120), columns=list('abcd'))
+    for indicator in [MovingAverage(10), MACD()]:
+        expected = indicator.calculate_panel(panel)
+        result = indicator.calculate_panel(panel, compact=True)
+        assert (result.dtypes == np.float32).all()
+        assert memory_usage(result) < memory_usage(expected)
+        np.testing.assert_allclose(result.to_numpy(dtype='float64'), expected.to_numpy(),
+                                   rtol=FLOAT32_RELATIVE_ERROR, atol=0)
+    # float32 的价格面板按float64计算
+    result = RSI(14).calculate_panel(panel.astype(np.float32))
+    assert result.dtypes.iloc[0] == np.float64
+    np.testing.assert_allclose(result.to_numpy(), RSI(14).calculate_panel(panel).to_numpy(), atol=1e-3)
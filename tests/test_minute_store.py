@@ -0,0 +1,70 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+import pytest
+from src.data.manager import StockDataManager
+from src.data.models import create_db_engine
+from src.data.db_manager import DatabaseManager
+from src.data.minute_store import MinuteBarStore
+from src.data.synthetic import SyntheticStockDataFetcher
+
+@pytest.fixture
+def fetcher():
+    return SyntheticStockDataFetcher(n_symbols=3)
+
+def _bars(fetcher, code, start, end):
+    return fetcher.get_stock_minute(code, start, end).assign(code=code)
+
+def test_append_partitions_by_day(tmp_path, fetcher):
+    """测试按交易日分区追加，区间读取只返回区间内的数据"""
+    store = MinuteBarStore(str(tmp_path))
+    store.append(pd.concat([_bars(fetcher, code, '2024-01-02', '2024-01-04 15:00')
+                            for code in fetcher.symbols]))
+    assert store.days() == ['2024-01-02', '2024-01-03', '2024-01-04']
+
+    df = store.read(['000001', '000002'], '2024-01-03', '2024-01-03')
+    assert set(df['code']) == {'000001', '000002'}
+    assert len(df) == 2 * 240
+    assert df['datetime'].dt.strftime('%Y-%m-%d').unique().tolist() == ['2024-01-03']
+
+    df = store.read(None, '2024-01-02 10:00', '2024-01-02 10:04', columns=['close'])
+    assert list(df.columns) == ['code', 'datetime', 'close']
+    assert len(df) == 3 * 5
+
+def test_duplicate_append_and_compact(tmp_path, fetcher):
+    """测试重复追加时读取去重，合并后只剩一个分片，后写入的数据优先"""
+    store = MinuteBarStore(str(tmp_path))
+    bars = _bars(fetcher, '000001', '2024-01-02', '2024-01-02 15:00')
+    store.append(bars)
+    store.append(bars.assign(close=bars['close'] + 1))
+    assert len(store.read(['000001'], '2024-01-02', '2024-01-02')) == 240
+
+    store.compact('2024-01-02')
+    assert len(store._parts('2024-01-02')) == 1
+    df = store.read(['000001'], '2024-01-02', '2024-01-02')
+    assert len(df) == 240
+    assert df['close'].tolist() == (bars['close'] + 1).tolist()
+
+def test_drop_day(tmp_path, fetcher):
+    """测试删除单个交易日"""
+    store = MinuteBarStore(str(tmp_path))
+    store.append(_bars(fetcher, '000001', '2024-01-02', '2024-01-03 15:00'))
+    store.drop_day('2024-01-02')
+    assert store.days() == ['2024-01-03']
+    assert store.read(['000001'], '2024-01-02', '2024-01-02').empty
+
+def test_manager_ingest(tmp_path, fetcher):
+    """测试数据管理器批量拉取分钟线后重复拉取不产生重复数据"""
+    engine = create_db_engine(str(tmp_path / 'test.db'))
+    manager = StockDataManager(bar_cache_dir=str(tmp_path / 'bar_cache'),
+                               fetcher=fetcher,
+                               db=DatabaseManager(engine),
+                               minute_dir=str(tmp_path))
+    for _ in range(2):
+        failed = manager.ingest_stock_minute(fetcher.symbols, '2024-01-02', '2024-01-03 15:00')
+        assert failed == {}
+    assert len(manager.minute_store._parts('2024-01-02')) == 1
+    df = manager.get_stock_minute(['000003'], '2024-01-02', '2024-01-03')
+    assert len(df) == 2 * 240
@@ -0,0 +1,56 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.data.quote_buffer import QuoteRingBuffer
+from src.data.manager import StockDataManager
+from src.data.models import create_db_engine
+from src.data.db_manager import DatabaseManager
+from src.data.synthetic import SyntheticStockDataFetcher
+
+def _snapshot(codes, price):
+    return pd.DataFrame({'code': codes, 'price': price, 'change': 0.0, 'volume': np.asarray(price) * 10})
+
+def test_ring_buffer_wraps():
+    """测试超过容量后覆盖最旧的快照，窗口按时间升序并左侧补NaN"""
+    buffer = QuoteRingBuffer(capacity=3)
+    start = datetime(2024, 1, 2, 9, 30)
+    for i in range(5):
+        buffer.append(_snapshot(['000001'], float(i)), start + timedelta(seconds=i))
+    buffer.append(_snapshot(['000002'], 100.0), start)
+
+    window = buffer.window(['000001', '000002', '999999'], 'price', 3)
+    assert window[0].tolist() == [2.0, 3.0, 4.0]
+    assert np.isnan(window[1, :2]).all() and window[1, 2] == 100.0
+    assert np.isnan(window[2]).all()
+
+    df = buffer.last(['000002', '000001'], 2)
+    assert df['code'].tolist() == ['000002', '000001', '000001']
+    assert df['price'].tolist() == [100.0, 3.0, 4.0]
+    assert df['time'].iloc[-1] == pd.Timestamp(start + timedelta(seconds=4))
+
+def test_skip_unchanged_and_drain():
+    """测试重复读取同一份快照不产生新数据，落盘队列取出后清空"""
+    buffer = QuoteRingBuffer(capacity=4)
+    assert buffer.append(_snapshot(['000001', '000002'], [1.0, 2.0])) == 2
+    assert buffer.append(_snapshot(['000001', '000002'], [1.0, 2.5])) == 1
+    assert buffer.pending_rows() == 3
+    assert len(buffer.drain()) == 3
+    assert buffer.pending_rows() == 0
+    assert buffer.window(['000002'], 'price', 4)[0, -2:].tolist() == [2.0, 2.5]
+
+def test_manager_flushes_quote_history(tmp_path):
+    """测试数据管理器记录行情快照并批量写入历史表"""
+    engine = create_db_engine(str(tmp_path / 'test.db'))
+    manager = StockDataManager(bar_cache_dir=str(tmp_path / 'bar_cache'),
+                               fetcher=SyntheticStockDataFetcher(n_symbols=20),
+                               db=DatabaseManager(engine))
+    manager.refresh_realtime_snapshot()
+    assert len(manager.get_recent_quotes(['000001.SZ', '000002'])) == 2
+    assert manager.flush_quote_history() == 20
+    history = manager.db.get_realtime_history(['000001'])
+    assert len(history) == 1
+    assert history['code'].tolist() == ['000001']
@@ -0,0 +1,49 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.data.resample import resample_bars, align_period_bars
+
+@pytest.fixture
+def daily():
+    """2024-01-01 至 2024-02-09 的工作日日线，close 为序号"""
+    dates = pd.bdate_range('2024-01-01', '2024-02-09')
+    n = len(dates)
+    return pd.DataFrame({
+        'date': dates,
+        'open': np.arange(n) + 0.5,
+        'high': np.arange(n) + 1.0,
+        'low': np.arange(n) - 1.0,
+        'close': np.arange(n, dtype=float),
+        'volume': 1.0
+    })
+
+def test_resample_weekly_and_monthly(daily):
+    """测试周线、月线的开高低收和成交量"""
+    weekly = resample_bars(daily, 'W')
+    assert len(weekly) == 6
+    first = weekly.iloc[0]
+    assert first['date'] == pd.Timestamp('2024-01-05')
+    assert (first['open'], first['high'], first['low'], first['close'], first['volume']) == \
+        (0.5, 5.0, -1.0, 4.0, 5.0)
+
+    monthly = resample_bars(daily, 'M')
+    assert monthly['date'].tolist() == [pd.Timestamp('2024-01-31'), pd.Timestamp('2024-02-09')]
+    assert monthly['volume'].tolist() == [23.0, 7.0]
+
+def test_align_has_no_lookahead(daily):
+    """测试每个交易日只看到已结束的周期"""
+    weekly = resample_bars(daily, 'W')
+    data = align_period_bars(daily.set_index('date'), weekly, 'w')
+
+    # 第一周结束前没有周线数据
+    assert data.loc['2024-01-01':'2024-01-04', 'close_w'].isna().all()
+    # 周五收盘时本周结束
+    assert data.loc['2024-01-05', 'close_w'] == 4.0
+    # 下一周的周一至周四仍是上一周的数据
+    assert (data.loc['2024-01-08':'2024-01-11', 'close_w'] == 4.0).all()
+    assert data.loc['2024-01-12', 'close_w'] == 9.0
+    assert {'open_w', 'high_w', 'low_w', 'volume_w'} <= set(data.columns)
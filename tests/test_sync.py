@@ -0,0 +1,123 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from datetime import datetime, timedelta
+import pandas as pd
+import pytest
+from src.data.manager import StockDataManager
+from src.data.db_manager import DatabaseManager
+from src.data.models import create_db_engine
+from src.data.fetcher import DataFetchError
+from src.data.synthetic import SyntheticStockDataFetcher
+from src.data.sync import DailySyncJob
+
+class RecordingFetcher(SyntheticStockDataFetcher):
+    """记录每次日线请求，failing 中的股票请求失败"""
+
+    def __init__(self):
+        super().__init__(n_symbols=5)
+        self.calls = []
+        self.factor_calls = []
+        self.failing = set()
+        # 数据源已发布的最后一天，之后的日线还没有数据
+        self.published_until = None
+
+    def get_stock_daily(self, symbol, start_date=None, end_date=None, raise_on_error=False):
+        self.calls.append((symbol, start_date, end_date))
+        if symbol in self.failing:
+            raise DataFetchError(f'{symbol} failed')
+        if self.published_until is not None:
+            end_date = min(end_date, self.published_until)
+        return super().get_stock_daily(symbol, start_date, end_date, raise_on_error)
+
+    def get_adj_factor(self, symbol, raise_on_error=False):
+        self.factor_calls.append(symbol)
+        return pd.DataFrame({'date': pd.to_datetime(['2024-01-02']), 'factor': [1.0]})
+
+@pytest.fixture
+def job(tmp_path):
+    manager = StockDataManager(bar_cache_dir=str(tmp_path / 'bar_cache'),
+                               fetcher=RecordingFetcher(),
+                               db=DatabaseManager(create_db_engine(str(tmp_path / 'test.db'))))
+    return DailySyncJob(manager,
+                        history_start='2024-01-01',
+                        checkpoint_path=str(tmp_path / 'checkpoint.json'),
+                        max_retries=0,
+                        backoff=0)
+
+def test_sync_fetches_only_new_bars(job):
+    """测试首次同步拉取全部历史，之后只拉取新增日期"""
+    fetcher = job.manager.fetcher
+    report = job.run(end_date='2024-03-29')
+    assert report['synced'] == 5 and not report['failed']
+    assert report['rows'] == 5 * 65
+    assert {(start, end) for _, start, end in fetcher.calls} == {('2024-01-01', '2024-03-29')}
+
+    fetcher.calls.clear()
+    assert job.run(end_date='2024-03-29')['skipped'] == 5
+    assert fetcher.calls == []
+
+    report = job.run(end_date='2024-04-05')
+    assert {(start, end) for _, start, end in fetcher.calls} == {('2024-03-30', '2024-04-05')}
+    assert report['rows'] == 5 * 5
+    df = job.manager.bar_store.get_stock_daily('000003', '2024-01-01', '2024-04-05')
+    assert len(df) == 70
+
+def test_sync_resumes_from_checkpoint(job):
+    """测试失败的股票保留在断点中，再次运行只重试失败的股票"""
+    fetcher = job.manager.fetcher
+    fetcher.failing = {'000002', '000004'}
+    report = job.run(end_date='2024-03-29')
+    assert set(report['failed']) == {'000002', '000004'}
+    with open(job.checkpoint_path) as f:
+        checkpoint = json.load(f)
+    assert not checkpoint['finished']
+    assert sorted(checkpoint['done']) == ['000001', '000003', '000005']
+
+    fetcher.failing = set()
+    fetcher.calls.clear()
+    report = job.run(end_date='2024-03-29')
+    assert sorted(symbol for symbol, _, _ in fetcher.calls) == ['000002', '000004']
+    assert report['synced'] == 2 and not report['failed']
+
+def test_sync_refreshes_adj_factor(job):
+    """测试同步时刷新复权因子，之后的查询不再请求数据源"""
+    fetcher = job.manager.fetcher
+    job.run(end_date='2024-03-29')
+    assert sorted(fetcher.factor_calls) == ['000001', '000002', '000003', '000004', '000005']
+    
+    fetcher.calls.clear()
+    fetcher.factor_calls.clear()
+    df = job.manager.get_stock_daily('000001', '2024-03-01', '2024-03-29')
+    assert len(df) == 21
+    assert fetcher.calls == [] and fetcher.factor_calls == []
+
+def test_sync_coverage_ends_at_last_returned_bar(job):
+    """测试数据源尚未发布当天日线时，当天不记为已同步"""
+    fetcher = job.manager.fetcher
+    today = datetime.now().strftime('%Y-%m-%d')
+    yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+    job.history_start = datetime.now() - timedelta(days=10)
+    fetcher.published_until = yesterday
+    job.run(['000001'], end_date=today)
+    
+    fetcher.published_until = None
+    fetcher.calls.clear()
+    job.run(['000001'], end_date=today)
+    assert fetcher.calls == [('000001', today, today)]
+
+def test_sync_invalidates_memory_cache(job):
+    """测试同步写入新日线后，内存缓存中的旧结果失效"""
+    fetcher = job.manager.fetcher
+    job.run(end_date='2024-03-29')
+    fetcher.failing = {'000001'}
+    assert len(job.manager.get_stock_daily('000001', '2024-03-25', '2024-04-05')) == 5
+    
+    fetcher.failing = set()
+    job.run(end_date='2024-04-05')
+    fetcher.calls.clear()
+    assert len(job.manager.get_stock_daily('000001', '2024-03-25', '2024-04-05')) == 10
+    assert fetcher.calls == []
+
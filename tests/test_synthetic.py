@@ -0,0 +1,53 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+from src.data.synthetic import SyntheticStockDataFetcher, ReplayStockDataFetcher
+
+def test_synthetic_daily_deterministic():
+    """测试模拟日线可复现，且分段获取与一次获取的结果一致"""
+    fetcher = SyntheticStockDataFetcher(n_symbols=10)
+    full = fetcher.get_stock_daily('000001', '2020-01-01', '2020-12-31')
+    assert list(full.columns) == ['date', 'open', 'close', 'high', 'low', 'volume']
+    assert len(full) == len(pd.bdate_range('2020-01-01', '2020-12-31'))
+    assert (full['high'] >= full[['open', 'close']].max(axis=1)).all()
+    assert (full['low'] <= full[['open', 'close']].min(axis=1)).all()
+
+    parts = pd.concat([
+        SyntheticStockDataFetcher(n_symbols=10).get_stock_daily('000001', '2020-01-01', '2020-06-30'),
+        fetcher.get_stock_daily('000001', '2020-07-01', '2020-12-31')
+    ], ignore_index=True)
+    pd.testing.assert_frame_equal(full, parts)
+
+    other = fetcher.get_stock_daily('000002', '2020-01-01', '2020-12-31')
+    assert not full['close'].equals(other['close'])
+
+def test_replay_round_trip(tmp_path):
+    """测试录制后回放得到相同的数据"""
+    source = SyntheticStockDataFetcher(n_symbols=3)
+    ReplayStockDataFetcher.record(source, str(tmp_path), ['000001', '000002'],
+                                  '2024-01-01', '2024-03-31')
+    replay = ReplayStockDataFetcher(str(tmp_path))
+
+    assert list(replay.get_stock_list()['code']) == ['000001', '000002', '000003']
+    pd.testing.assert_frame_equal(
+        replay.get_stock_daily('000002', '2024-02-01', '2024-02-29'),
+        source.get_stock_daily('000002', '2024-02-01', '2024-02-29')
+    )
+    assert list(replay.get_stock_realtime('000001')['code']) == ['000001']
+    assert replay.get_stock_daily('000003', '2024-01-01', '2024-03-31').empty
+
+def test_replay_round_trip_suffixed_symbol(tmp_path):
+    """测试带交易所后缀的代码录制后可以回放"""
+    source = SyntheticStockDataFetcher(n_symbols=3)
+    ReplayStockDataFetcher.record(source, str(tmp_path), ['000001.SZ'], '2024-01-01', '2024-03-31')
+    assert os.listdir(str(tmp_path / 'daily')) == ['000001.csv']
+    replay = ReplayStockDataFetcher(str(tmp_path))
+
+    for symbol in ('000001.SZ', '000001'):
+        pd.testing.assert_frame_equal(
+            replay.get_stock_daily(symbol, '2024-02-01', '2024-02-29'),
+            source.get_stock_daily('000001', '2024-02-01', '2024-02-29')
+        )
+    assert not replay.get_stock_financial('000001.SZ').empty
@@ -0,0 +1,74 @@
+import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.indicator_cache import IndicatorCache
+from src.backtest.strategy_engine import StrategyEngine
+from src.backtest.vectorized import carry_forward, positions_from_signals, strategy_returns
+
+def loop_returns(close: pd.Series, position: pd.Series) -> pd.Series:
+    """原有的逐行实现"""
+    returns = pd.Series(index=close.index)
+    returns.iloc[0] = 0
+    for i in range(1, len(close)):
+        returns.iloc[i] = (close.iloc[i] / close.iloc[i-1] - 1) * position.iloc[i-1]
+    return returns
+
+def test_returns_match_loop():
+    """测试向量化收益与逐行循环逐位一致，二维输入与逐列计算一致"""
+    rng = np.random.default_rng(1)
+    index = pd.date_range('2024-01-01', periods=60)
+    close = pd.DataFrame(10 * np.exp(np.cumsum(rng.normal(0, 0.02, (60, 3)), axis=0)), index=index)
+    signal = pd.DataFrame(rng.choice([-1, 0, 0, 0, 1], (60, 3)), index=index)
+    position = positions_from_signals(signal, 0.1)
+    result = strategy_returns(close, position)
+    for j in close.columns:
+        expected = loop_returns(close[j], signal[j] * 0.1)
+        pd.testing.assert_series_equal(strategy_returns(close[j], position[j]), expected)
+        np.testing.assert_array_equal(result[j].to_numpy(), expected.to_numpy())
+
+def test_carry_forward():
+    """测试持仓保持到下一个信号，第一个信号之前为0"""
+    signal = np.array([0, 1, 0, 0, -1, 0, 1, 0])
+    np.testing.assert_array_equal(carry_forward(signal), [0, 1, 1, 1, -1, -1, 1, 1])
+    np.testing.assert_array_equal(carry_forward(np.column_stack([signal, signal[::-1]]))[:, 1],
+                                  [0, 1, 1, -1, -1, -1, 1, 1])
+    assert carry_forward(np.array([], dtype=int)).size == 0
+    positions = positions_from_signals(pd.Series(signal), 0.5, carry=True)
+    assert positions.tolist() == [0, 0.5, 0.5, 0.5, 0, 0, 0.5, 0.5]
+    positions = positions_from_signals(pd.Series(signal), 0.5, carry=True, allow_short=True)
+    assert positions.tolist() == [0, 0.5, 0.5, 0.5, -0.5, -0.5, 0.5, 0.5]
+
+def test_engine_carry():
+    """测试引擎按 position_sizing.carry 保持持仓，默认只在信号当天有仓位"""
+    index = pd.date_range('2024-01-01', periods=6)
+    close = pd.Series([10.0, 10.0, 11.0, 12.0, 11.0, 10.0], index=index)
+    data = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close, 'volume': 1.0})
+    signals = {'buy': "data['close'] == 11", 'sell': "data['close'] == 10"}
+    engine = StrategyEngine(indicator_cache=IndicatorCache())
+    engine.config = {'strategies': {
+        name: {'parameters': {}, 'indicators': [], 'signals': signals,
+               'position_sizing': {'type': 'fixed', 'value': 1, 'carry': carry,
+                                   'allow_short': allow_short}}
+        for name, carry, allow_short in [('signal_day', False, False), ('carry', True, False),
+                                         ('short', True, True)]}}
+    results = engine.backtest(data, '2024-01-01', '2024-12-31')
+    assert results['signal_day']['positions']['position'].tolist() == [-1, -1, 1, 0, 1, -1]
+    # 只做多：卖出信号后空仓
+    assert results['carry']['positions']['position'].tolist() == [0, 0, 1, 1, 1, 0]
+    assert results['short']['positions']['position'].tolist() == [-1, -1, 1, 1, 1, -1]
+    np.testing.assert_allclose(results['signal_day']['returns'], [0, 0, -0.1, 1 / 11, 0, -1 / 11])
+    np.testing.assert_allclose(results['carry']['returns'], [0, 0, 0, 1 / 11, -1 / 12, -1 / 11])
+    np.testing.assert_allclose(results['short']['returns'], [0, 0, -0.1, 1 / 11, -1 / 12, -1 / 11])
+
+    # 买入后没有新信号时一直持有
+    signals['buy'] = "data.index == data.index[1]"
+    signals['sell'] = "data.index == data.index[-1]"
+    results = engine.backtest(data, '2024-01-01', '2024-12-31')
+    assert results['signal_day']['positions']['position'].tolist() == [0, 1, 0, 0, 0, -1]
+    assert results['carry']['positions']['position'].tolist() == [0, 1, 1, 1, 1, 0]
+    np.testing.assert_allclose(results['carry']['returns'].sum(), 0.1 + 1 / 11 - 1 / 12 - 1 / 11)
+    assert results['signal_day']['returns'].sum() == pytest.approx(0.1)